@@ -0,0 +1,65 @@
+"""Background tasks — long simulations without stalling the frame loop.
+
+``BackgroundTask`` drives one of the progress generators
+(``monte_carlo.iter_monte_carlo``, ``iter_difficulty_check``,
+``iter_suggest_scaling``) on a daemon thread.  The arcade view polls it
+from ``on_update``: ``latest`` is the newest partial result, ``result``
+the final one once ``finished``.  ``cancel()`` closes the generator at
+its next update, which also cancels any pool batches not yet run.
+
+The battles themselves hold the GIL, so a single-process task still
+steals frame time in ~5 ms slices.  Pass ``workers > 1`` to the
+generator to move the battles into worker processes, leaving this
+thread mostly waiting.
+"""
+
+import threading
+
+
+class BackgroundTask:
+    """Run a progress generator on a daemon thread; poll for its updates."""
+
+    def __init__(self, updates, start: bool = True):
+        self._updates = updates
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self.latest: dict | None = None
+        self.result = None
+        self.error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        if start:
+            self.start()
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        try:
+            for update in self._updates:
+                self.latest = update
+                if update.get("finished"):
+                    self.result = update.get("result")
+                if self._cancel.is_set():
+                    break
+        except BaseException as exc:  # surfaced to the polling thread
+            self.error = exc
+        finally:
+            self._updates.close()
+            self._done.set()
+
+    @property
+    def finished(self) -> bool:
+        """True once the task has stopped: completed, cancelled or failed."""
+        return self._done.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self):
+        """Stop at the next update.  Doesn't wait; see ``wait()``."""
+        self._cancel.set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until the task stops; False if *timeout* ran out first."""
+        return self._done.wait(timeout)
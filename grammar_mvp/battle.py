@@ -2,83 +2,112 @@
 
 import random
 
-from grammar_mvp.game_state import Character, GameState
-
-# Map ESENS stat codes → Character attribute names
-STAT_MAP = {
-    "H": "hp",
-    "S": "strength",
-    "D": "defense",
-}
-
-# Map ESENS target codes → GameState attribute names
-TARGET_MAP = {
-    "P": "hero",
-    "E": "enemy",
-}
-
-
-def resolve_turn(attacker: Character, defender: Character) -> str:
-    """One attack: attacker hits defender. Returns a log string."""
-    hit = random.randint(1, attacker.strength)
-    block = random.randint(0, defender.defense)
+from grammar_mvp.compiler import compile_effect
+from grammar_mvp.game_state import AttackEvent, Character, GameState
+
+
+def strike(
+    attacker: Character, defender: Character, rng=random, bus=None,
+) -> int:
+    """One attack with no logging at all.  Returns the damage dealt.
+
+    The no-log fast path for simulations; rolls the same dice as
+    resolve_attack() and fires the same triggers.
+    """
+    if bus is not None:
+        bus.emit(">A", attacker)
+        bus.emit("<D", defender)
+    damage = rng.randint(1, attacker.strength) - rng.randint(0, defender.defense)
+    if damage < 1:
+        damage = 1
+    alive = defender.hp > 0
+    defender.hp = max(0, defender.hp - damage)
+    if bus is not None and alive and defender.hp == 0:
+        bus.emit("K", attacker)
+    return damage
+
+
+def resolve_attack(
+    attacker: Character, defender: Character, rng=random, bus=None,
+) -> AttackEvent:
+    """One attack: attacker hits defender.  Returns an AttackEvent.
+
+    The event's log text is only built if something calls ``str()`` on it.
+    With a TriggerBus, ``>A``/``<D`` fire before the dice are rolled (so
+    they can change this attack) and ``K`` fires on a killing blow.
+    """
+    if bus is not None:
+        bus.emit(">A", attacker)
+        bus.emit("<D", defender)
+    hit = rng.randint(1, attacker.strength)
+    block = rng.randint(0, defender.defense)
     damage = max(1, hit - block)
+    alive = defender.hp > 0
     defender.hp = max(0, defender.hp - damage)
-    return (
-        f"{attacker.name} attacks! {hit} hit - {block} block = {damage} dmg. "
-        f"{defender.name}: {defender.hp}/{defender.max_hp}"
+    if bus is not None and alive and defender.hp == 0:
+        bus.emit("K", attacker)
+    return AttackEvent(
+        attacker.name, defender.name, hit, block, damage,
+        defender.hp, defender.max_hp,
     )
 
 
-def apply_potion(parsed_dict: dict, state: GameState) -> str:
+def resolve_turn(
+    attacker: Character, defender: Character, rng=random, bus=None,
+) -> str:
+    """One attack: attacker hits defender. Returns a log string.
+
+    *rng* is anything with ``randint`` — the ``random`` module by default,
+    or a seeded ``random.Random`` for reproducible simulations.
+    """
+    return str(resolve_attack(attacker, defender, rng, bus))
+
+
+def begin_turn(character: Character, bus) -> int:
+    """Fire *character*'s turn-start (``^S``) triggers."""
+    return bus.emit("^S", character)
+
+
+def apply_potion(parsed_dict: dict, state: GameState, rng=random) -> str:
     """Apply a parsed ESENS effect to the game state. Returns a log string.
 
     ``parsed_dict`` is the ``result["dict"]`` from ``parse_esens``.
-    For now this does immediate stat mutation only.
+
+    HP changes are immediate (``%`` is of max HP, ``F`` is a full heal).
+    STR/DEF changes go through the target's modifier stack: flat ``+``/``-``
+    without a duration shift the base stat; percentages, ``=`` and ``*``
+    become modifiers, respecting the interaction tag.  Anything with a
+    turn duration (``3T``, ``1-3T``, ``A``) is scheduled on the effect
+    timeline and undone on expiry.  A triggered effect (``>A``, ``<D``,
+    ``^S``, ``vE``, ``K``, ``?N%``) is armed on ``state.triggers`` instead
+    and applies each time its event fires.
+
+    The effect is compiled once per distinct notation (see
+    ``grammar_mvp.compiler``); hot loops can hold on to
+    ``compile_effect(parsed_dict)`` and call it directly.
     """
-    target_code = parsed_dict.get("target", "P")
-    effect_type = parsed_dict.get("effect_type", "+")
-    stat_code = parsed_dict.get("stat_affected", "H")
-    magnitude = 0
-    mag_info = parsed_dict.get("magnitude")
-    if mag_info:
-        magnitude = mag_info.get("value", 0)
-
-    attr = STAT_MAP.get(stat_code)
-    target_attr = TARGET_MAP.get(target_code)
-    if not attr or not target_attr:
-        return "Potion fizzles…"
-
-    character: Character = getattr(state, target_attr)
-
-    if effect_type == "+":
-        old = getattr(character, attr)
-        new = old + magnitude
-        if attr == "hp":
-            new = min(new, character.max_hp)
-        setattr(character, attr, new)
-        return f"{character.name} +{magnitude} {attr.upper()}! ({old}→{new})"
-    elif effect_type == "-":
-        old = getattr(character, attr)
-        new = max(0, old - magnitude)
-        setattr(character, attr, new)
-        return f"{character.name} -{magnitude} {attr.upper()}! ({old}→{new})"
-    else:
-        return "Potion fizzles…"
-
-
-def tick_effects(character: Character):
-    """Decrement active effect durations, remove expired ones.
-
-    Placeholder for future duration-based effects.
+    return compile_effect(parsed_dict)(state, rng)
+
+
+def tick_effects(character: Character, bus=None) -> list[dict]:
+    """Advance *character*'s effect timeline one turn.
+
+    With a TriggerBus, *character*'s turn-end (``vE``) triggers fire
+    first.  Only effects expiring this turn are touched: each one's stat
+    modifier is removed from the stack and its trigger disarmed.  Returns
+    the expired effects.
     """
-    still_active = []
-    for effect in character.active_effects:
-        effect["remaining"] -= 1
-        if effect["remaining"] > 0:
-            still_active.append(effect)
-        # TODO: reverse stat change on expiry
-    character.active_effects = still_active
+    if bus is not None:
+        bus.emit("vE", character)
+    expired = character.active_effects.tick()
+    for effect in expired:
+        modifier = effect.get("modifier")
+        if modifier:
+            character.modifiers.remove(character, modifier)
+        subscription = effect.get("subscription")
+        if subscription:
+            subscription.cancel()
+    return expired
 
 
 def check_battle_end(state: GameState) -> str | None:
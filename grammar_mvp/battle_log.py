@@ -0,0 +1,113 @@
+"""Bounded battle log — fixed-size ring of records with optional disk spill.
+
+Entries are log strings or structured events (``AttackEvent``).  Only the
+newest ``capacity`` records stay in memory; with a ``spill_path`` every
+record is also appended to an NDJSON file so nothing is lost, however
+long the fight runs.
+"""
+
+import copy
+import json
+from dataclasses import asdict, is_dataclass
+from pathlib import Path
+
+DEFAULT_CAPACITY = 256
+
+
+class BattleLogBuffer:
+    """Ring buffer of ``(seq, turn, entry)`` records.
+
+    ``seq`` numbers every record ever appended, so ``range()`` can address
+    records absolutely even after older ones have rotated out.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, spill_path=None):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._ring = [None] * capacity
+        self.total = 0
+        self.spill_path = Path(spill_path) if spill_path else None
+        self._spill = None
+        self._shared = False  # ring also held by a fork: copy before writing
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def __iter__(self):
+        """Entries still in memory, oldest first."""
+        return iter(self.tail(len(self)))
+
+    def __getitem__(self, index):
+        """List-style access to retained entries (``log[-1]`` is newest)."""
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("battle log index out of range")
+        return self._ring[(self.total - n + index) % self.capacity][2]
+
+    def append(self, entry, turn=0):
+        """Add *entry*; the oldest in-memory record drops out when full."""
+        record = (self.total, turn, entry)
+        if self._shared:
+            self._ring = list(self._ring)
+            self._shared = False
+        self._ring[self.total % self.capacity] = record
+        self.total += 1
+        if self.spill_path:
+            self._write(record)
+
+    def tail(self, n):
+        """The newest *n* entries, oldest first."""
+        n = min(n, len(self))
+        start = self.total - n
+        return [self._ring[i % self.capacity][2] for i in range(start, self.total)]
+
+    def range(self, start, stop):
+        """Records with ``start <= seq < stop`` that are still in memory."""
+        start = max(start, self.total - len(self))
+        stop = min(stop, self.total)
+        return [self._ring[i % self.capacity] for i in range(start, stop)]
+
+    def fork(self):
+        """A detached copy of the in-memory records, without the spill file.
+
+        The ring is shared until either side appends, so forks that never
+        log cost nothing.
+        """
+        clone = copy.copy(self)
+        clone.spill_path = clone._spill = None
+        self._shared = clone._shared = True
+        return clone
+
+    def close(self):
+        """Flush and close the spill file, if any."""
+        if self._spill:
+            self._spill.close()
+            self._spill = None
+
+    def _write(self, record):
+        if self._spill is None:
+            self._spill = open(self.spill_path, "a", encoding="utf-8")
+        self._spill.write(json.dumps(encode_record(record)) + "\n")
+
+
+def encode_record(record):
+    """``(seq, turn, entry)`` → JSON-ready dict."""
+    seq, turn, entry = record
+    if is_dataclass(entry):
+        return {"seq": seq, "turn": turn, "kind": "attack", **asdict(entry)}
+    return {"seq": seq, "turn": turn, "kind": "text", "text": str(entry)}
+
+
+def read_spill(path):
+    """Yield ``(seq, turn, entry)`` records back from an NDJSON spill file."""
+    from grammar_mvp.game_state import AttackEvent  # game_state imports us
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            data = json.loads(line)
+            seq, turn, kind = data.pop("seq"), data.pop("turn"), data.pop("kind")
+            entry = AttackEvent(**data) if kind == "attack" else data["text"]
+            yield seq, turn, entry
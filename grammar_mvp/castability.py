@@ -0,0 +1,132 @@
+"""Exact castability odds — will the next draw spell a potion?
+
+A potion needs one card of each of ``simulator.POTION_ORDER`` — target,
+effect, stat and a numeric magnitude — docked within the slot budget,
+``min(mana, slot_count)``.  Every such combination parses, so "can cast
+a potion" is a question about how many cards of each category are in
+hand after the next refill, which draws ``hand_size - len(hand)`` cards
+uniformly from the shuffled deck.
+
+Rather than sampling shuffles, ``castability`` sums the multivariate
+hypergeometric distribution exactly: deck cards are grouped into kinds
+(a potion category, an on-draw curse that changes mana or slots, or
+anything else) and a DP convolves one kind at a time over ``(cards
+drawn, capped count per kind)``.  The state space depends on the number
+of kinds, not the deck size, so odds for a 200-card deck are as quick
+as for a 14-card one.
+
+A *potion class* narrows the tokens each category may use — ``"healing"``
+needs a self/ally target, ``+`` and ``H`` (see ``POTION_CLASSES``).  To
+show the odds a reward card would give, pass ``deck + [card]``.
+"""
+
+from collections import Counter
+from fractions import Fraction
+from math import comb
+
+from grammar_mvp.simulator import POTION_ORDER
+
+# Tokens each category may use, per potion class (missing = any)
+POTION_CLASSES: dict[str, dict[str, set[str]]] = {
+    "any": {},
+    "healing": {"target": {"P", "A"}, "effect": {"+"}, "stat": {"H"}},
+    "buff": {"target": {"P", "A"}, "effect": {"+"}, "stat": {"S", "D"}},
+    "damage": {"target": {"E", "X"}, "effect": {"-"}, "stat": {"H"}},
+    "debuff": {"target": {"E", "X"}, "effect": {"-"}, "stat": {"S", "D"}},
+}
+
+# Curse fields that change the slot budget when drawn
+_BUDGET_FIELDS = ("mana", "slot_count")
+
+
+def _kind(card: dict, allowed: dict[str, set[str]]):
+    """What *card* counts as: a potion category, a budget curse, or None."""
+    if card.get("type") == "curse":
+        args = card.get("on_draw_args") or {}
+        if card.get("on_draw") == "modify_state" and args.get("field") in _BUDGET_FIELDS:
+            return (args["field"], args["delta"])
+        return None
+    category = card.get("category")
+    if category not in POTION_ORDER:
+        return None
+    token = card.get("token")
+    if category == "magnitude" and token == "%":
+        return None  # a percent sign is a tail, not a magnitude
+    if category in allowed and token not in allowed[category]:
+        return None
+    return category
+
+
+def castability(
+    deck: list[dict],
+    hand: list[dict],
+    hand_size: int,
+    slot_count: int,
+    mana: int | None = None,
+    potion: str = "any",
+    exact: bool = False,
+) -> float | Fraction:
+    """P(the hand after the next refill can cast a *potion*-class potion).
+
+    *mana* defaults to unlimited (only slots bound the budget).  Curses
+    drawn on the refill fire before the build phase, so mana drain and
+    shattered slots count against the budget.  Returns a float, or a
+    ``Fraction`` with ``exact=True``.
+    """
+    if potion not in POTION_CLASSES:
+        raise ValueError(f"Unknown potion class: {potion!r}")
+    allowed = POTION_CLASSES[potion]
+    draws = max(0, min(hand_size - len(hand), len(deck)))
+    total = comb(len(deck), draws)
+
+    in_hand = Counter(_kind(card, allowed) for card in hand)
+    need = {c: max(0, 1 - in_hand[c]) for c in POTION_ORDER}
+    sizes = Counter(_kind(card, allowed) for card in deck)
+    curses = [k for k in sizes if isinstance(k, tuple)]
+    # Kinds whose drawn count matters; everything else is filler
+    tracked = [c for c in POTION_ORDER if need[c]] + curses
+    caps = [need[k] if k in need else draws for k in tracked]
+
+    # (cards drawn so far, capped count per tracked kind) → ways
+    states = {(0, (0,) * len(tracked)): 1}
+    for i, kind in enumerate(tracked):
+        size = sizes[kind]
+        step = {}
+        for (drawn, counts), ways in states.items():
+            for k in range(min(size, draws - drawn) + 1):
+                capped = counts[:i] + (min(k, caps[i]),) + counts[i + 1:]
+                key = (drawn + k, capped)
+                step[key] = step.get(key, 0) + ways * comb(size, k)
+        states = step
+
+    filler = len(deck) - sum(sizes[k] for k in tracked)
+    favourable = 0
+    for (drawn, counts), ways in states.items():
+        got = dict(zip(tracked, counts))
+        if any(got.get(c, 0) < need[c] for c in POTION_ORDER):
+            continue
+        slots, budget_mana = slot_count, mana
+        for kind in curses:
+            field, delta = kind
+            if field == "slot_count":
+                slots += delta * got[kind]
+            elif budget_mana is not None:
+                budget_mana += delta * got[kind]
+        budget = slots if budget_mana is None else min(slots, budget_mana)
+        if budget < len(POTION_ORDER):
+            continue
+        favourable += ways * comb(filler, draws - drawn)
+
+    odds = Fraction(favourable, total)
+    return odds if exact else float(odds)
+
+
+def castability_for_state(state, potion: str = "any", exact: bool = False):
+    """``castability`` of a GameState's deck, hand, hand size, slots and mana."""
+    return castability(state.deck, state.hand, state.hand_size,
+                       state.slot_count, state.mana, potion, exact)
+
+
+def castability_table(state) -> dict[str, float]:
+    """Odds for every class in ``POTION_CLASSES``, e.g. for a deck screen."""
+    return {name: castability_for_state(state, name) for name in POTION_CLASSES}
@@ -0,0 +1,152 @@
+"""Chain-effect resolver — bounded worklist for ``>Heal``/``>Expl``/``>Sprd``/``>Trig``.
+
+When an effect carrying a chain lands on a fighter, its follow-ups are
+queued rather than applied recursively.  The queue is processed in waves
+(one wave per chain depth):
+
+- ``>Trig``  the chain target effect applies normally (its own target).
+- ``>Heal``  the chain target applies; without one, the lead hero heals
+             by the parent's magnitude.
+- ``>Sprd``  the effect (or chain target) jumps to the next living member
+             of the struck fighter's side, carrying its chain onward.
+- ``>Expl``  the effect (or chain target) hits every other living member
+             of the struck fighter's side.
+
+Cost stays bounded: a follow-up that would revisit an (effect, fighter)
+pair already on its own path is a cycle and is dropped; identical
+follow-ups reaching the same fighter in one wave are merged into a single
+application (flat magnitudes are multiplied by the count); chains stop at
+``max_depth``; and at most ``budget`` applications happen per turn.
+"""
+
+import random
+
+from grammar_mvp.compiler import canonical_notation, compile_effect, owners_of
+
+CHAIN_KINDS = (">Heal", ">Expl", ">Sprd", ">Trig")
+
+DEFAULT_BUDGET = 64
+DEFAULT_MAX_DEPTH = 8
+
+
+def _without_chain(effect: dict) -> dict:
+    return {k: v for k, v in effect.items()
+            if k not in ("chain_effect", "chain_target")}
+
+
+def _scaled(effect: dict, count: int) -> dict:
+    """*effect* applied *count* times at once, where that is additive."""
+    mag = effect.get("magnitude") or {}
+    if (count == 1 or effect.get("effect_type") not in ("+", "-")
+            or mag.get("is_full") or mag.get("is_percentage")):
+        return effect
+    return {**effect, "magnitude": {**mag, "value": mag.get("value", 0) * count}}
+
+
+def _side_of(state, character) -> list:
+    for team in (state.heroes, state.enemies):
+        if any(member is character for member in team):
+            return team
+    return [character]
+
+
+class ChainResolver:
+    """Runs chain reactions for one GameState under a per-turn budget."""
+
+    def __init__(self, budget=DEFAULT_BUDGET, max_depth=DEFAULT_MAX_DEPTH):
+        self.budget = budget
+        self.max_depth = max_depth
+        self.spent = 0
+        self.fired: list[str] = []   # log lines not yet drained
+        self.stats = {"applied": 0, "merged": 0, "cycles": 0, "dropped": 0}
+
+    def next_turn(self):
+        """Refill the per-turn application budget."""
+        self.spent = 0
+
+    def drain(self) -> list[str]:
+        """Log lines from chain applications since the last drain."""
+        fired, self.fired = self.fired, []
+        return fired
+
+    def _follow_ups(self, effect, struck, state):
+        """``(follow-up effect, fighter)`` pairs for *effect* hitting *struck*."""
+        kind = effect.get("chain_effect")
+        chained = effect.get("chain_target")
+        if kind == ">Trig":
+            if not chained:
+                return []
+            return [(chained, c) for c in owners_of(chained.get("target", "P"))(state)]
+        if kind == ">Heal":
+            heal = chained or {
+                "target": "P", "effect_type": "+", "stat_affected": "H",
+                "magnitude": {**(effect.get("magnitude") or {})},
+            }
+            return [(heal, c) for c in owners_of(heal.get("target", "P"))(state)]
+        side = [c for c in _side_of(state, struck) if c.hp > 0 or c is struck]
+        others = [c for c in side if c is not struck]
+        if kind == ">Sprd":
+            if not others:
+                return []
+            i = next(i for i, c in enumerate(side) if c is struck)
+            neighbour = side[(i + 1) % len(side)]
+            return [(chained or effect, neighbour)]
+        if kind == ">Expl":
+            return [(chained or _without_chain(effect), c) for c in others]
+        return []
+
+    def resolve(self, effect: dict, struck: list, state, rng=random,
+                log=True) -> int:
+        """Run the chain of *effect*, which just landed on *struck*.
+
+        Returns the number of follow-up applications made.
+        """
+        stats = self.stats
+        # wave: (notation, fighter id) → [effect, fighter, count, path]
+        wave = {}
+        root = canonical_notation(effect)
+        for character in struck:
+            path = frozenset({(root, id(character))})
+            for item in self._follow_ups(effect, character, state):
+                self._enqueue(wave, item, path)
+        applied = 0
+        depth = 1
+        while wave:
+            if depth > self.max_depth:
+                stats["dropped"] += len(wave)
+                break
+            next_wave = {}
+            for key, (follow_up, character, count, path) in wave.items():
+                if self.spent >= self.budget:
+                    stats["dropped"] += 1
+                    continue
+                action = compile_effect(
+                    _scaled(_without_chain(follow_up), count)).action
+                if action is None:
+                    continue  # fizzles, or a trigger — nothing lands now
+                self.spent += 1
+                applied += 1
+                text = action(character, rng, log)
+                if text:
+                    self.fired.append(text)
+                if follow_up.get("chain_effect"):
+                    for item in self._follow_ups(follow_up, character, state):
+                        self._enqueue(next_wave, item, path | {key})
+            wave = next_wave
+            depth += 1
+        stats["applied"] += applied
+        return applied
+
+    def _enqueue(self, wave, item, path):
+        follow_up, character = item
+        key = (canonical_notation(follow_up), id(character))
+        if key in path:
+            self.stats["cycles"] += 1
+            return
+        entry = wave.get(key)
+        if entry:
+            entry[2] += 1
+            entry[3] = entry[3] | path
+            self.stats["merged"] += 1
+        else:
+            wave[key] = [follow_up, character, 1, path]
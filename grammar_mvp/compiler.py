@@ -0,0 +1,502 @@
+"""Effect compiler — turn a parsed ESENS effect into a reusable program.
+
+``compile_effect`` reads a ``parse_esens`` dict (or a ``StatusEffect``)
+once, resolves the target, stat, magnitude and modifier kind up front,
+and returns a closure specialised for that effect.  Programs are cached
+by canonical notation, so casting the same potion thousands of times in a
+simulation costs one function call instead of a dict walk:
+
+    program = compile_effect(parsed["dict"])
+    log = program(state)              # same text apply_potion returns
+    program(state, rng, log=False)    # skip building the log string
+"""
+
+import itertools
+import random
+from collections import OrderedDict
+from operator import attrgetter
+
+from grammar_mvp.modifiers import Modifier
+from grammar_mvp.triggers import parse_condition
+
+# Map ESENS stat codes → Character attribute names
+STAT_MAP = {
+    "H": "hp",
+    "S": "strength",
+    "D": "defense",
+}
+
+# Map ESENS target codes → GameState attribute names
+TARGET_MAP = {
+    "P": "hero",
+    "E": "enemy",
+}
+
+# Map ESENS area targets → GameState team lists
+TEAM_MAP = {
+    "A": ("heroes",),
+    "X": ("enemies",),
+    "G": ("heroes", "enemies"),
+}
+
+TEAM_NAMES = {
+    "A": "All allies",
+    "X": "All enemies",
+    "G": "Everyone",
+}
+
+# How a trigger event reads in the log
+EVENT_TEXT = {
+    ">A": "on attack",
+    "<D": "on defend",
+    "^S": "at turn start",
+    "vE": "at turn end",
+    "K": "on kill",
+}
+
+FIZZLE = "Potion fizzles…"
+
+# Compiled programs by canonical notation, least recently used first.
+# Bounded: chain-scaled magnitudes mint a new notation each.
+MAX_PROGRAMS = 512
+_PROGRAMS: OrderedDict[str, callable] = OrderedDict()
+
+# Source ids for armed triggers (plain ints so forked states share them)
+_SOURCES = itertools.count()
+
+
+def _duration_turns(duration: dict | None, rng) -> int | None:
+    """Turns a parsed ESENS duration lasts; None means it never ticks out.
+
+    ``3T`` → 3, ``1-3T`` → rolled in range, ``A`` (single action) → 1,
+    ``C`` (combat) / ``P`` (permanent) / no duration → None.
+    """
+    if not duration:
+        return None
+    kind = duration.get("type")
+    if kind == "A":
+        return 1
+    if kind != "T":
+        return None
+    if duration.get("range_start") is not None:
+        return rng.randint(duration["range_start"], duration["range_end"])
+    return duration.get("value")
+
+
+def _is_timed(duration: dict | None) -> bool:
+    """True if ``_duration_turns`` gives a turn count — without rolling."""
+    if not duration:
+        return False
+    kind = duration.get("type")
+    if kind == "A":
+        return True
+    return kind == "T" and (duration.get("range_start") is not None
+                            or duration.get("value") is not None)
+
+
+# ── Canonical notation ──────────────────────────────────────────────
+
+
+def _as_dict(effect) -> dict:
+    return effect.to_dict() if hasattr(effect, "to_dict") else effect
+
+
+def _magnitude_text(mag: dict) -> str:
+    if not mag:
+        return ""
+    if mag.get("is_full"):
+        return "F"
+    if mag.get("is_percentage"):
+        return f"{mag.get('value', 0)}%"
+    return f"{mag.get('value', 0)}"
+
+
+def _duration_text(duration: dict | None) -> str:
+    if not duration:
+        return ""
+    kind = duration.get("type")
+    if kind != "T":
+        return kind or ""
+    if duration.get("range_start") is not None:
+        return f"{duration['range_start']}-{duration['range_end']}T"
+    return f"{duration.get('value')}T"
+
+
+def _trigger_text(trigger: dict | None) -> str:
+    if not trigger:
+        return ""
+    if trigger.get("type"):
+        return trigger["type"]
+    if trigger.get("chance"):
+        return f"?{trigger['chance']}%"
+    if trigger.get("condition"):
+        return f"?{trigger['condition']}"
+    return ""
+
+
+def canonical_notation(effect) -> str:
+    """One normalised notation string per distinct effect.
+
+    Components are space-separated so ``10`` + ``3T`` can never collide
+    with ``103`` + ``T``.  Extended components follow as ``.``-tags in a
+    fixed order; a chain target is nested in parentheses.
+    """
+    d = _as_dict(effect)
+    core = " ".join((
+        d.get("target", "P") + d.get("effect_type", "+") + d.get("stat_affected", "H"),
+        _magnitude_text(d.get("magnitude") or {}),
+        _duration_text(d.get("duration")),
+        _trigger_text(d.get("trigger")),
+        "".join(d.get("element") or ()),
+    ))
+    tags = list(d.get("special_flags") or ())
+    for key in ("removability", "source_dependency", "visibility",
+                "interaction_tag", "meta_effect"):
+        if d.get(key):
+            tags.append(d[key])
+    for key in ("stacking_behavior", "resource_connection"):
+        if d.get(key):
+            info = d[key]
+            amount = info.get("value", info.get("amount"))
+            tags.append(f"{info['type']}{'' if amount is None else amount}")
+    tags.extend(d.get("conditions") or ())
+    if d.get("chain_effect"):
+        chain = d["chain_effect"]
+        if d.get("chain_target"):
+            chain += f"({canonical_notation(d['chain_target'])})"
+        tags.append(chain)
+    return core + "".join(f".{tag}" for tag in tags)
+
+
+# ── Compilation ─────────────────────────────────────────────────────
+
+
+def _fizzle(state, rng=random, log=True):
+    return FIZZLE if log else None
+
+
+_fizzle.action = None
+
+
+def _compile_duration(duration: dict | None):
+    """Duration dict → ``rng -> turns`` (fixed values resolved now)."""
+    if duration and duration.get("type") == "T" and duration.get("range_start") is not None:
+        lo, hi = duration["range_start"], duration["range_end"]
+        return lambda rng: rng.randint(lo, hi)
+    turns = _duration_turns(duration, None)
+    return lambda rng: turns
+
+
+def _hp_mutator(effect_type: str, mag: dict):
+    """``(character, turns, source)`` mutator for an immediate HP change, or None."""
+    magnitude = mag.get("value", 0)
+    if mag.get("is_full"):
+        amount = attrgetter("max_hp")
+    elif mag.get("is_percentage"):
+        def amount(c):
+            return round(c.max_hp * magnitude / 100)
+    else:
+        def amount(c):
+            return magnitude
+
+    if effect_type == "+":
+        def mutate(c, turns, source):
+            c.hp = min(c.hp + amount(c), c.max_hp)
+    elif effect_type == "-":
+        def mutate(c, turns, source):
+            c.hp = max(0, c.hp - amount(c))
+    elif effect_type == "=":
+        def mutate(c, turns, source):
+            c.hp = max(0, min(amount(c), c.max_hp))
+    else:
+        return None
+    return mutate
+
+
+def _stat_mutator(attr: str, stat_code: str, effect_type: str, parsed: dict,
+                  timed: bool):
+    """``(character, turns, source)`` mutator for a STR/DEF change, or None.
+
+    The mutator returns the stack count for stacking effects.
+    """
+    mag = parsed.get("magnitude") or {}
+    magnitude = mag.get("value", 0)
+    tag = parsed.get("interaction_tag")
+    sign = -1 if effect_type == "-" else 1
+
+    if effect_type in ("+", "-") and mag.get("is_percentage"):
+        kind, value = "pct", sign * magnitude
+    elif effect_type in ("+", "-") and timed:
+        kind, value = "add", sign * magnitude
+    elif effect_type in ("+", "-"):
+        delta = sign * magnitude
+
+        def mutate(c, turns, source):
+            c.modifiers.shift_base(c, attr, delta)
+        return mutate
+    elif effect_type == "=":
+        kind, value = "set", magnitude
+    elif effect_type == "*":
+        kind, value = "mul", magnitude
+    else:
+        return None
+
+    stacking = _stacking_rule(parsed)
+    if stacking is None:
+        def mutate(c, turns, source):
+            modifier = Modifier(attr, kind, value, tag)
+            c.modifiers.add(c, modifier)
+            if turns is not None:
+                c.active_effects.add({"stat": stat_code, "modifier": modifier}, turns)
+        return mutate
+    return _stacking_mutator(attr, stat_code, kind, value, tag,
+                             canonical_notation(parsed), *stacking)
+
+
+def _stacking_rule(parsed: dict):
+    """``(behaviour, max stacks)`` for a stacking effect, else None."""
+    info = parsed.get("stacking_behavior")
+    if info:
+        return info["type"], info.get("value") if info["type"] == "S" else None
+    if "ST" in (parsed.get("special_flags") or ()):
+        return "ST", None
+    return None
+
+
+def _stacking_mutator(attr, stat_code, kind, value, tag, notation, behaviour, cap):
+    """Merge re-applications into one counted record per effect.
+
+    ``ST`` adds a stack each time (``S<n>`` caps it at n) and keeps the
+    longer of the remaining and new durations; ``S*`` doubles the effect
+    per stack; ``S+`` adds the new duration instead of a stack; ``SU``
+    keeps one record per source, so only different sources stack.  The
+    record's single modifier is updated in place, so ticks and stat
+    refreshes cost O(distinct effects) however often it is reapplied.
+    """
+    def total(stacks):
+        if kind == "set":
+            return value
+        if kind == "mul":
+            return value ** stacks
+        if behaviour == "S*":
+            return value * 2 ** (stacks - 1)
+        return value * stacks
+
+    def mutate(c, turns, source):
+        timeline = c.active_effects
+        key = (notation, source) if behaviour == "SU" else notation
+        record = timeline.find(key)
+        if record is None:
+            modifier = c.modifiers.add(c, Modifier(attr, kind, value, tag))
+            timeline.add({"stat": stat_code, "modifier": modifier, "stacks": 1},
+                         turns, key=key)
+            return 1
+        remaining = timeline.remaining(record)
+        if behaviour == "S+":
+            if turns is not None and remaining is not None:
+                timeline.reschedule(record, remaining + turns)
+            return record["stacks"]
+        if behaviour != "SU" and (cap is None or record["stacks"] < cap):
+            record["stacks"] += 1
+            c.modifiers.update(c, record["modifier"], total(record["stacks"]))
+        if turns is not None and remaining is not None and turns > remaining:
+            timeline.reschedule(record, turns)
+        return record["stacks"]
+    return mutate
+
+
+def _build(parsed: dict, notation: str):
+    effect_type = parsed.get("effect_type", "+")
+    stat_code = parsed.get("stat_affected", "H")
+    mag = parsed.get("magnitude") or {}
+    magnitude = mag.get("value", 0)
+
+    target_code = parsed.get("target", "P")
+    attr = STAT_MAP.get(stat_code)
+    if not attr or target_code not in TARGET_MAP and target_code not in TEAM_MAP:
+        return _fizzle
+    if parsed.get("trigger"):
+        return _trigger_program(parsed, notation, target_code)
+    if attr == "hp":
+        turns_for = _compile_duration(None)  # HP changes are immediate
+        mutate = _hp_mutator(effect_type, mag)
+    else:
+        duration = parsed.get("duration")
+        turns_for = _compile_duration(duration)
+        timed = _is_timed(duration)
+        mutate = _stat_mutator(attr, stat_code, effect_type, parsed, timed)
+    if mutate is None:
+        return _fizzle
+
+    if mag.get("is_full"):
+        label = "F"
+    elif mag.get("is_percentage"):
+        label = f"{magnitude}%"
+    else:
+        label = f"{magnitude}"
+    attr_name = attr.upper()
+    if effect_type in ("+", "-"):
+        head = f" {effect_type}{label} {attr_name}! "
+    elif effect_type == "=":
+        head = f" {attr_name} set to {label}! "
+    else:
+        head = f" {attr_name} x{label}! "
+
+    value_of = attrgetter(attr)
+    if target_code in TEAM_MAP:
+        program = _team_program(target_code, mutate, turns_for, value_of, head)
+    else:
+        target_of = attrgetter(TARGET_MAP[target_code])
+
+        def program(state, rng=random, log=True):
+            return action(target_of(state), rng, log)
+
+    def action(character, rng=random, log=True, source=None):
+        old = value_of(character)
+        turns = turns_for(rng)
+        stacks = mutate(character, turns, source)
+        if not log:
+            return None
+        text = f"{character.name}{head}({old}→{value_of(character)})"
+        if turns is not None:
+            text += f" for {turns} turns"
+        if stacks and stacks > 1:
+            text += f" [x{stacks}]"
+        return text
+
+    if parsed.get("chain_effect"):
+        program = _chain_program(program, parsed, target_code)
+    program.notation = notation
+    program.action = action
+    program.head = head
+    return program
+
+
+def _chain_program(base, parsed, target_code):
+    """Apply *base*, then hand the chain to ``state.chains``."""
+    struck_by = owners_of(target_code)
+
+    def program(state, rng=random, log=True):
+        struck = struck_by(state)
+        text = base(state, rng, log)
+        state.chains.resolve(parsed, struck, state, rng, log)
+        return text
+
+    return program
+
+
+def _team_program(target_code, mutate, turns_for, value_of, head):
+    """Area version: one duration roll, applied to every living member."""
+    teams_of = attrgetter(*TEAM_MAP[target_code])
+    single_side = len(TEAM_MAP[target_code]) == 1
+    who = TEAM_NAMES[target_code]
+
+    def program(state, rng=random, log=True):
+        turns = turns_for(rng)
+        sides = (teams_of(state),) if single_side else teams_of(state)
+        changes = []
+        for members in sides:
+            for character in members:
+                if character.hp <= 0:
+                    continue  # the fallen are out of the fight
+                old = value_of(character)
+                mutate(character, turns, None)
+                if log:
+                    changes.append(f"{character.name} {old}→{value_of(character)}")
+        if not log:
+            return None
+        text = f"{who}{head}({', '.join(changes) or 'no one left'})"
+        if turns is not None:
+            text += f" for {turns} turns"
+        return text
+
+    return program
+
+
+def owners_of(target_code):
+    """``state -> characters`` an effect aimed at *target_code* lands on."""
+    if target_code in TARGET_MAP:
+        target_of = attrgetter(TARGET_MAP[target_code])
+        return lambda state: [target_of(state)]
+    names = TEAM_MAP[target_code]
+    return lambda state: [c for name in names for c in getattr(state, name)
+                          if c.hp > 0]
+
+
+def _trigger_program(parsed, notation, target_code):
+    """Arm the effect on ``state.triggers`` instead of applying it.
+
+    The duration is how long the trigger stays armed; each firing applies
+    the bare effect to the owner immediately.  Chance- or condition-only
+    triggers listen at turn start.
+    """
+    trigger = parsed["trigger"]
+    event = trigger.get("type") or "^S"
+    bare = {k: v for k, v in parsed.items() if k not in ("trigger", "duration")}
+    fire = compile_effect(bare)
+    if fire.action is None:
+        return _fizzle
+    chance = trigger.get("chance")
+    condition = parse_condition(trigger.get("condition"))
+    lifetime = _compile_duration(parsed.get("duration"))
+    arm_on = owners_of(target_code)
+    when = EVENT_TEXT[event]
+    if chance is not None:
+        when += f" ({chance}% chance)"
+
+    chained = bool(bare.get("chain_effect"))
+
+    def armed(state, source):
+        # Each arming is its own source, for per-source stacking (SU).
+        def action(character, rng=random, log=True):
+            text = fire.action(character, rng, log, source)
+            if chained:
+                state.chains.resolve(bare, [character], state, rng, log)
+            return text
+        action.rebind = lambda new_state: armed(new_state, source)
+        return action
+
+    def program(state, rng=random, log=True):
+        turns = lifetime(rng)
+        owners = arm_on(state)
+        for character in owners:
+            sub = state.triggers.subscribe(
+                character, event, armed(state, next(_SOURCES)), chance, condition,
+            )
+            if turns is not None:
+                character.active_effects.add({"subscription": sub}, turns)
+        if not log:
+            return None
+        names = ", ".join(c.name for c in owners) or "No one"
+        text = f"{names}{fire.head.rstrip()} primed {when}"
+        if turns is not None:
+            text += f" for {turns} turns"
+        return text
+
+    program.notation = notation
+    program.action = None
+    return program
+
+
+def compile_effect(effect):
+    """Compiled program for a parsed ESENS dict or ``StatusEffect``.
+
+    The program is ``program(state, rng=random, log=True)`` and returns the
+    log string (or None with ``log=False``).  Identical effects share one
+    cached program (the ``MAX_PROGRAMS`` most recently used are kept).
+    """
+    parsed = _as_dict(effect)
+    notation = canonical_notation(parsed)
+    program = _PROGRAMS.get(notation)
+    if program is None:
+        program = _PROGRAMS[notation] = _build(parsed, notation)
+        if len(_PROGRAMS) > MAX_PROGRAMS:
+            _PROGRAMS.popitem(last=False)
+    else:
+        _PROGRAMS.move_to_end(notation)
+    return program
+
+
+def clear_cache():
+    """Drop every cached program."""
+    _PROGRAMS.clear()
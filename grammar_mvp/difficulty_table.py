@@ -0,0 +1,274 @@
+"""Precomputed difficulty tables — ``difficulty_check`` without the battles.
+
+``difficulty_check`` runs 500 battles every time the game asks about an
+encounter.  The roster is fixed, so the battles can run offline instead:
+
+- **Build** (offline): for each encounter in ``encounters.ENCOUNTERS``,
+  sweep a grid of stat vectors around its stats — hero and enemy HP,
+  STR and DEF, each ±*spread* in *points* steps — and store the win rate
+  of every cell.  This is a ``sweep.sweep`` run, so 1v1 cells are solved
+  exactly and the rest use common-random-number Monte Carlo.
+- **Lookup** (runtime): ``DifficultyTable.lookup`` interpolates the win
+  rate multilinearly between the (up to 2^6) grid cells around the
+  query, in tens of microseconds.
+
+Win rate is monotone in every stat (more hero HP/STR/DEF never hurts,
+more enemy stats never helps), so the true rate at a point lies between
+the lowest and highest of its surrounding cells.  The lookup's ``error``
+is that spread plus the widest 95% Wilson half-width among those cells
+(0 for exact cells) — a conservative bound, and 0 + sampling error on a
+grid point.
+
+A matchup outside the table's hull — a stat beyond the grid, a different
+team size or turn order, fighters carrying effects or a mixed team — has
+no table answer; ``difficulty_check(..., table=...)`` then falls back to
+live simulation.
+
+Usage:
+
+  python -m grammar_mvp.difficulty_table -o difficulty.json --points 5
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from grammar_mvp.encounters import ENCOUNTERS
+from grammar_mvp.monte_carlo import wilson_interval
+from grammar_mvp.sweep import sweep
+
+# Interpolated stat axes, in sweep.AXES order
+STAT_AXES = ("hero_hp", "hero_str", "hero_def",
+             "enemy_hp", "enemy_str", "enemy_def")
+
+# Odd, so each encounter's own stats are grid points
+DEFAULT_POINTS = 5
+DEFAULT_SPREAD = 0.3
+
+FORMAT_VERSION = 1
+
+
+def axis_values(value: int, points: int, spread: float, minimum: int = 1) -> list[int]:
+    """*points* integers from ``value * (1 - spread)`` to ``value * (1 + spread)``."""
+    if points < 2:
+        return [value]
+    lo, hi = value * (1 - spread), value * (1 + spread)
+    step = (hi - lo) / (points - 1)
+    return sorted({max(minimum, round(lo + i * step)) for i in range(points)})
+
+
+def _team_vector(team) -> tuple[int, int, int] | None:
+    """``(hp, str, def)`` shared by every fighter, or None if they differ."""
+    stats = {(c.hp, c.strength, c.defense) for c in team}
+    if len(stats) != 1 or any(c.active_effects or c.modifiers for c in team):
+        return None
+    return stats.pop()
+
+
+class DifficultyTable:
+    """Win rates over a regular grid of stat vectors for one team shape."""
+
+    def __init__(self, axes: dict[str, list[int]], hero_count: int,
+                 enemy_count: int, hero_first: bool,
+                 win_rates: list[float], runs: list[int]):
+        self.axes = {name: list(axes[name]) for name in STAT_AXES}
+        self.hero_count = hero_count
+        self.enemy_count = enemy_count
+        self.hero_first = hero_first
+        self.win_rates = list(win_rates)
+        self.runs = list(runs)
+        # Row-major strides over STAT_AXES (the sweep's grid order)
+        self._strides = []
+        stride = 1
+        for name in reversed(STAT_AXES):
+            self._strides.insert(0, stride)
+            stride *= len(self.axes[name])
+        if stride != len(self.win_rates):
+            raise ValueError("win_rates doesn't match the grid size")
+        self._errors = [
+            0.0 if n == 0 else _half_width(rate, n)
+            for rate, n in zip(self.win_rates, self.runs)
+        ]
+
+    def __len__(self):
+        return len(self.win_rates)
+
+    def vector(self, heroes, enemies, hero_first=True) -> tuple | None:
+        """The query's stat vector, or None if the table can't answer it."""
+        if (len(heroes) != self.hero_count or len(enemies) != self.enemy_count
+                or bool(hero_first) != self.hero_first):
+            return None
+        hero, enemy = _team_vector(heroes), _team_vector(enemies)
+        if hero is None or enemy is None:
+            return None
+        point = hero + enemy
+        for x, name in zip(point, STAT_AXES):
+            values = self.axes[name]
+            if not values[0] <= x <= values[-1]:
+                return None
+        return point
+
+    def lookup(self, heroes, enemies, hero_first=True) -> dict | None:
+        """Interpolated ``{"win_rate", "error"}``, or None outside the hull."""
+        point = self.vector(heroes, enemies, hero_first)
+        if point is None:
+            return None
+        # Grow the (flat index, weight) corners one axis at a time, so an
+        # axis the point sits on doesn't double them
+        corners = [(0, 1.0)]
+        for x, name, stride in zip(point, STAT_AXES, self._strides):
+            values = self.axes[name]
+            i = _bisect_cell(values, x)
+            if values[i] == x:
+                corners = [(index + i * stride, w) for index, w in corners]
+            else:
+                t = (x - values[i]) / (values[i + 1] - values[i])
+                lo, hi = i * stride, (i + 1) * stride
+                corners = [c for index, w in corners
+                           for c in ((index + lo, w * (1.0 - t)),
+                                     (index + hi, w * t))]
+
+        rates = self.win_rates
+        values = [rates[index] for index, _ in corners]
+        rate = sum(rates[index] * w for index, w in corners)
+        sampling = max(self._errors[index] for index, _ in corners)
+        return {"win_rate": rate,
+                "error": max(values) - min(values) + sampling}
+
+    def to_dict(self) -> dict:
+        return {
+            "axes": self.axes,
+            "hero_count": self.hero_count,
+            "enemy_count": self.enemy_count,
+            "hero_first": self.hero_first,
+            "win_rates": self.win_rates,
+            "runs": self.runs,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DifficultyTable":
+        return cls(data["axes"], data["hero_count"], data["enemy_count"],
+                   data["hero_first"], data["win_rates"], data["runs"])
+
+
+def _bisect_cell(values: list[int], x: int) -> int:
+    """Index i with ``values[i] <= x < values[i + 1]`` (last index at the top)."""
+    lo, hi = 0, len(values) - 1
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if values[mid] <= x:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _half_width(rate: float, n: int) -> float:
+    lo, hi = wilson_interval(round(rate * n), n)
+    return (hi - lo) / 2
+
+
+# ── Build step ───────────────────────────────────────────────────────
+
+def build_table(
+    heroes,
+    enemies,
+    points: int = DEFAULT_POINTS,
+    spread: float = DEFAULT_SPREAD,
+    runs: int = 500,
+    hero_first: bool = True,
+    seed: int = 0,
+    workers: int = 1,
+    progress=None,
+) -> DifficultyTable:
+    """Sweep the grid around the lead fighters' stats into a table.
+
+    Every fighter of a team gets the cell's stats, as in ``sweep``.
+    """
+    hero, enemy = heroes[0], enemies[0]
+    center = (hero.hp, hero.strength, hero.defense,
+              enemy.hp, enemy.strength, enemy.defense)
+    axes = {
+        name: axis_values(v, points, spread, 0 if name.endswith("_def") else 1)
+        for name, v in zip(STAT_AXES, center)
+    }
+    axes["hero_count"] = [len(heroes)]
+    axes["enemy_count"] = [len(enemies)]
+    rows = sweep(axes, runs=runs, hero_first=hero_first, seed=seed,
+                 workers=workers, progress=progress)
+    return DifficultyTable(
+        axes, len(heroes), len(enemies), hero_first,
+        [float(r["win_rate"]) for r in rows],
+        [int(r["runs"]) for r in rows],
+    )
+
+
+def build_tables(encounters=ENCOUNTERS, progress=None, **kwargs) -> dict[str, DifficultyTable]:
+    """``build_table`` for each encounter, keyed by encounter title.
+
+    *progress*, if given, is called as ``progress(title, done, total)``.
+    """
+    tables = {}
+    for encounter in encounters:
+        report = (lambda done, total, title=encounter.title:
+                  progress(title, done, total)) if progress else None
+        tables[encounter.title] = build_table(*encounter.teams(),
+                                              progress=report, **kwargs)
+    return tables
+
+
+def save_tables(tables: dict[str, DifficultyTable], path):
+    data = {"version": FORMAT_VERSION,
+            "tables": {name: t.to_dict() for name, t in tables.items()}}
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def load_tables(path) -> dict[str, DifficultyTable]:
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported difficulty table version: {data.get('version')!r}")
+    return {name: DifficultyTable.from_dict(t) for name, t in data["tables"].items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Precompute difficulty tables for the encounter roster",
+    )
+    parser.add_argument("-o", "--output", default="difficulty.json",
+                        help="Table file to write (default: difficulty.json)")
+    parser.add_argument("--points", type=int, default=DEFAULT_POINTS,
+                        help=f"Grid points per stat (default: {DEFAULT_POINTS})")
+    parser.add_argument("--spread", type=float, default=DEFAULT_SPREAD,
+                        help=f"Grid half-width as a fraction of each stat "
+                             f"(default: {DEFAULT_SPREAD})")
+    parser.add_argument("--runs", type=int, default=500,
+                        help="Battles per simulated cell (default: 500)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Seed shared by every cell (default: 0)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes for simulated cells (default: 1)")
+    args = parser.parse_args()
+
+    def progress(title, done, total):
+        print(f"\r  {title:<10} {done}/{total} cells", end="",
+              file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    tables = build_tables(points=args.points, spread=args.spread,
+                          runs=args.runs, seed=args.seed,
+                          workers=args.workers, progress=progress)
+    save_tables(tables, args.output)
+    print(file=sys.stderr)
+    for encounter in ENCOUNTERS:
+        answer = tables[encounter.title].lookup(*encounter.teams())
+        print(f"  {encounter.number}. {encounter.title:<10} "
+              f"{answer['win_rate']:6.1%} ± {answer['error']:.1%}")
+    print(f"{len(tables)} tables → {args.output} "
+          f"in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
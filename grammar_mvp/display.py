@@ -105,11 +105,12 @@ class BattleLog:
             )
             self.lines.append(t)
 
-    def push(self, message: str):
-        """Shift existing lines up, newest appears at the bottom."""
-        for i in range(len(self.lines) - 1):
-            self.lines[i].text = self.lines[i + 1].text
-        self.lines[-1].text = message
+    def show(self, battle_log):
+        """Display the newest lines of a BattleLogBuffer, newest at the bottom."""
+        recent = battle_log.tail(len(self.lines))
+        blank = len(self.lines) - len(recent)
+        for i, line in enumerate(self.lines):
+            line.text = str(recent[i - blank]) if i >= blank else ""
 
     def draw(self):
         for line in self.lines:
@@ -0,0 +1,95 @@
+"""Effect timeline — timed effects scheduled by absolute expiry turn.
+
+Each Character owns an EffectTimeline.  Effects are plain dicts; timed
+ones sit in a min-heap keyed by the turn they expire on, so a tick only
+touches effects that actually end this turn instead of decrementing
+every entry.  Effects without an expiry (combat-long or permanent) are
+kept aside and never scanned by a tick.
+
+Stacking effects are added with a ``key`` so a re-application can find
+its record (``find``) and update it in place — including moving its
+expiry with ``reschedule`` — instead of adding a duplicate entry.
+Rescheduled records leave a stale heap entry behind, which ``tick``
+recognises (its turn no longer matches the record) and skips.
+"""
+
+import heapq
+
+
+class EffectTimeline:
+    """Active effects on one character.
+
+    ``turn`` counts ticks on this timeline.  ``add(effect, duration)``
+    stamps ``effect["expires_at"]``; ``tick()`` advances one turn and
+    returns the effects that just expired.
+    """
+
+    def __init__(self):
+        self.turn = 0
+        self._heap: list[tuple[int, int, dict]] = []
+        self._lasting: list[dict] = []
+        self._keyed: dict = {}
+        self._stale = 0
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._heap) - self._stale + len(self._lasting)
+
+    def __iter__(self):
+        """All active effects — timed ones soonest-expiring first."""
+        for expires_at, _, effect in sorted(self._heap):
+            if effect["expires_at"] == expires_at:
+                yield effect
+        yield from self._lasting
+
+    def add(self, effect: dict, duration: int | None = None, key=None) -> dict:
+        """Schedule *effect* to expire after *duration* ticks (None = never).
+
+        With a *key*, the effect can later be looked up with ``find``.
+        """
+        if key is not None:
+            effect["key"] = key
+            self._keyed[key] = effect
+        if duration is None:
+            effect["expires_at"] = None
+            self._lasting.append(effect)
+        else:
+            self._push(effect, self.turn + duration)
+        return effect
+
+    def find(self, key) -> dict | None:
+        """The active effect added under *key*, if any."""
+        return self._keyed.get(key)
+
+    def reschedule(self, effect: dict, duration: int):
+        """Make a timed *effect* expire *duration* ticks from now."""
+        if effect["expires_at"] is None:
+            raise ValueError("cannot reschedule an effect that never expires")
+        self._stale += 1
+        self._push(effect, self.turn + duration)
+
+    def _push(self, effect, expires_at):
+        effect["expires_at"] = expires_at
+        heapq.heappush(self._heap, (expires_at, self._seq, effect))
+        self._seq += 1
+
+    def remaining(self, effect: dict) -> int | None:
+        """Ticks left before *effect* expires (None if it never does)."""
+        if effect["expires_at"] is None:
+            return None
+        return effect["expires_at"] - self.turn
+
+    def tick(self) -> list[dict]:
+        """Advance one turn; pop and return every effect expiring now."""
+        self.turn += 1
+        expired = []
+        heap = self._heap
+        while heap and heap[0][0] <= self.turn:
+            expires_at, _, effect = heapq.heappop(heap)
+            if effect["expires_at"] != expires_at:
+                self._stale -= 1  # superseded by a reschedule
+                continue
+            if "key" in effect:
+                del self._keyed[effect["key"]]
+            expired.append(effect)
+        return expired
@@ -0,0 +1,61 @@
+"""The encounter roster — the battle ladder from GRAMMAR_MVP_DESIGN.md.
+
+Battles 1–7 are the playable ladder (the demo, battle 0, is watched, not
+played).  Stats are the design doc's; elements aren't modelled by the
+combat engine yet, so the Flame Wyrm and the Fallen Angel fight as
+plain stat lines.
+"""
+
+from dataclasses import dataclass
+
+from grammar_mvp.game_state import Character
+
+
+@dataclass(frozen=True)
+class Encounter:
+    """One ladder battle: a hero against *enemy_count* copies of an enemy.
+
+    Fighters are ``(name, hp, max_hp, strength, defense)`` tuples, as in
+    ``engine.DEFAULT_HERO``.
+    """
+
+    number: int
+    title: str
+    hero: tuple
+    enemy: tuple
+    enemy_count: int = 1
+
+    def teams(self) -> tuple[list[Character], list[Character]]:
+        """Fresh ``(heroes, enemies)`` lists for a battle."""
+        name, *stats = self.enemy
+        if self.enemy_count == 1:
+            enemies = [Character(*self.enemy)]
+        else:
+            enemies = [Character(f"{name} {i + 1}", *stats)
+                       for i in range(self.enemy_count)]
+        return [Character(*self.hero)], enemies
+
+
+ENCOUNTERS = (
+    Encounter(1, "HEAL", ("Farmer", 8, 30, 6, 4), ("Wolf", 25, 25, 7, 3)),
+    Encounter(2, "WEAKEN", ("Town Guard", 30, 30, 9, 7),
+              ("Bandit Captain", 35, 35, 14, 10)),
+    Encounter(3, "TIMING", ("Young Challenger", 35, 35, 10, 6),
+              ("Dueling Champion", 40, 40, 12, 9)),
+    Encounter(4, "REACT", ("Knight", 40, 40, 10, 12),
+              ("Assassin", 25, 25, 18, 4)),
+    Encounter(5, "ELEMENTS", ("Ranger", 35, 35, 12, 8),
+              ("Flame Wyrm", 45, 45, 16, 14)),
+    Encounter(6, "OVERWHELM", ("Paladin", 50, 50, 14, 12),
+              ("Shadow Thief", 18, 18, 9, 5), enemy_count=3),
+    Encounter(7, "ASCENSION", ("The Chosen", 45, 45, 12, 10),
+              ("The Fallen Angel", 80, 80, 20, 18)),
+)
+
+
+def get_encounter(key) -> Encounter:
+    """Encounter by ladder number or (case-insensitive) title."""
+    for encounter in ENCOUNTERS:
+        if key == encounter.number or str(key).upper() == encounter.title:
+            return encounter
+    raise ValueError(f"Unknown encounter: {key!r}")
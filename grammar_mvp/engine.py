@@ -0,0 +1,305 @@
+"""Headless battle engine — one player session without any drawing.
+
+BattleEngine owns the GameState and the phase machine that BattleView
+used to run inline: auto-played turns, the build phase inputs (take a
+card from hand, dock it in a slot, lift it back out, return it to hand)
+and CAST.  Every random draw — deck shuffles, attack dice, potion
+durations, chance triggers — comes from one ``random.Random(seed)``, so
+a seed plus the list of inputs reproduces a session exactly.
+
+Accepted inputs are recorded in ``inputs`` as ``(kind, turn, arg)``
+tuples, where *turn* is ``state.turn`` when the input happened; see
+``replay.py`` for the file format built on them.
+"""
+
+import copy
+import random
+
+from ESENS_Parser import ESENSParseError, parse_esens
+
+from grammar_mvp.battle import (
+    apply_potion,
+    begin_turn,
+    check_battle_end,
+    resolve_attack,
+    tick_effects,
+)
+from grammar_mvp.deck import dispatch_action, load_cards, load_starter_deck
+from grammar_mvp.game_state import Character, GameState
+from grammar_mvp.snapshots import fork
+from grammar_mvp.triggers import TriggerBus
+
+PREVIEW_TURN_COUNT = 3     # how many turns auto-play in preview phase
+POST_CAST_TURNS = 2        # auto-play turns after a cast
+RESOLVE_TURNS = 999        # resolve phase: keep going until someone dies
+
+# Phases in which turns auto-play
+PLAYING_PHASES = ("preview", "build", "resolve", "post_cast")
+
+# Input kinds, in the order replay.py numbers them
+INPUTS = ("take", "return", "dock", "lift", "cast")
+
+DEFAULT_HERO = ("Sir Aldric", 30, 30, 6, 3)
+DEFAULT_ENEMY = ("Goblin", 25, 25, 7, 3)
+
+_POTIONS: dict[str, dict | None] = {}
+
+
+def parse_potion(notation: str) -> dict | None:
+    """``parse_esens(notation)``, cached; None if it doesn't parse."""
+    if notation not in _POTIONS:
+        try:
+            _POTIONS[notation] = parse_esens(notation)
+        except ESENSParseError:
+            _POTIONS[notation] = None
+    return _POTIONS[notation]
+
+
+class BattleEngine:
+    """A seeded, deterministic battle session."""
+
+    def __init__(self, seed: int, card_db=None, starter=None,
+                 hero=DEFAULT_HERO, enemy=DEFAULT_ENEMY):
+        self.seed = seed
+        self.fighters = (tuple(hero), tuple(enemy))
+        self.rng = random.Random(seed)
+        self.card_db = card_db if card_db is not None else load_cards()
+        if starter is None:
+            starter = load_starter_deck(self.card_db)
+        else:
+            starter = [dict(card) for card in starter]
+        self.starter = list(starter)    # the deck list, before shuffling
+        self.rng.shuffle(starter)
+
+        self.state = GameState(
+            hero=Character(*hero),
+            enemy=Character(*enemy),
+            mana=10,
+            max_mana=10,
+            deck=starter,
+            hand=[],
+            lock=[None] * 5,
+            slot_count=5,
+            hand_size=5,
+            phase="preview",
+            triggers=TriggerBus(self.rng),
+        )
+        self.turns_remaining = PREVIEW_TURN_COUNT
+        self.hero_attacks_next = True
+        self.held: dict | None = None   # card picked up, not yet placed
+        self.result: str | None = None  # "win" / "lose" once it's over
+        self.inputs: list[tuple[str, int, int]] = []
+
+        self.draw_cards(self.state.hand_size)
+
+    # ------------------------------------------------------------------
+    # Turns and phases
+    # ------------------------------------------------------------------
+
+    @property
+    def playing(self) -> bool:
+        """True while turns still auto-play."""
+        self._settle()
+        return self.state.phase in PLAYING_PHASES
+
+    def _settle(self):
+        """If stuck in build with nothing to play, auto-resolve."""
+        state = self.state
+        if state.phase == "build" and not state.hand and not state.deck:
+            state.phase = "resolve"
+            self.turns_remaining = RESOLVE_TURNS
+
+    def play_turn(self):
+        """Resolve one attack turn and check for phase transitions."""
+        if not self.playing:
+            return
+        state = self.state
+
+        # Pick attacker/defender
+        if self.hero_attacks_next:
+            attacker, defender = state.hero, state.enemy
+        else:
+            attacker, defender = state.enemy, state.hero
+        self.hero_attacks_next = not self.hero_attacks_next
+
+        bus = state.triggers
+        begin_turn(attacker, bus)
+        event = resolve_attack(attacker, defender, self.rng, bus=bus)
+
+        state.turn += 1
+        tick_effects(attacker, bus)  # the attacker's turn ends (vE)
+        tick_effects(defender)
+        bus.next_turn()
+        state.chains.next_turn()
+
+        self.log(event)
+        for entry in bus.drain() + state.chains.drain():
+            self.log(entry)
+
+        # Check win/lose
+        result = check_battle_end(state)
+        if result:
+            self.result = result
+            state.phase = "reward" if result == "win" else "gameover"
+            return
+
+        self.turns_remaining -= 1
+
+        if state.phase == "preview" and self.turns_remaining <= 0:
+            state.phase = "build"
+
+        elif state.phase == "post_cast" and self.turns_remaining <= 0:
+            # After post-cast turns, check mana
+            if state.mana > 0:
+                state.phase = "build"
+            else:
+                state.phase = "resolve"
+                self.turns_remaining = RESOLVE_TURNS
+
+        self._settle()
+
+    def fork(self, seed: int) -> "BattleEngine":
+        """An independent copy of this session whose future dice come from *seed*."""
+        clone = copy.copy(self)
+        clone.rng = random.Random(seed)
+        clone.state = fork(self.state)
+        clone.state.triggers.reseed(clone.rng)
+        clone.inputs = list(self.inputs)
+        return clone
+
+    def run_to(self, turn: int):
+        """Auto-play until ``state.turn`` reaches *turn* or play stops."""
+        while self.state.turn < turn and self.playing:
+            self.play_turn()
+
+    def log(self, entry):
+        self.state.battle_log.append(entry, turn=self.state.turn)
+
+    def _record(self, kind: str, arg: int = 0):
+        self.inputs.append((kind, self.state.turn, arg))
+
+    # ------------------------------------------------------------------
+    # Build-phase inputs
+    # ------------------------------------------------------------------
+
+    def take(self, index: int) -> dict | None:
+        """Pick up hand card *index*.  Returns it, or None if not allowed."""
+        state = self.state
+        if (state.phase != "build" or self.held is not None
+                or not 0 <= index < len(state.hand)):
+            return None
+        self.held = state.hand.pop(index)
+        self._record("take", index)
+        return self.held
+
+    def lift(self, slot: int) -> dict | None:
+        """Pick up the card docked in *slot* and refund its mana."""
+        state = self.state
+        if (state.phase != "build" or self.held is not None
+                or not 0 <= slot < len(state.lock) or state.lock[slot] is None):
+            return None
+        self.held, state.lock[slot] = state.lock[slot], None
+        state.mana = min(state.mana + 1, state.max_mana)
+        self._record("lift", slot)
+        return self.held
+
+    def dock(self, slot: int) -> bool:
+        """Put the held card into empty *slot* for 1 mana."""
+        state = self.state
+        if (self.held is None or state.mana < 1
+                or not 0 <= slot < len(state.lock) or state.lock[slot] is not None):
+            return False
+        state.lock[slot], self.held = self.held, None
+        state.mana -= 1
+        self._record("dock", slot)
+        return True
+
+    def return_to_hand(self, index: int) -> bool:
+        """Put the held card back into the hand at *index*."""
+        if self.held is None:
+            return False
+        index = max(0, min(index, len(self.state.hand)))
+        self.state.hand.insert(index, self.held)
+        self.held = None
+        self._record("return", index)
+        return True
+
+    def cast(self) -> tuple[bool, str]:
+        """Play the docked cards.  Returns ``(cast?, feedback text)``.
+
+        Action cards resolve first; grammar cards are joined into one ESENS
+        string and applied as a potion.  An invalid potion leaves the slots
+        as they are (the action cards have still fired).
+        """
+        state = self.state
+        if state.phase != "build":
+            return False, ""
+        docked = [card for card in state.lock if card]
+        if not docked:
+            return False, "Nothing to cast!"
+        self._record("cast")
+
+        # Separate action cards from grammar cards
+        action_cards = [c for c in docked if c.get("type") == "action"]
+        grammar_tokens = [c["token"] for c in docked if c.get("type") != "action"]
+
+        # Dispatch action cards
+        for card_data in action_cards:
+            dispatch_action(card_data, state, self.rng)
+            self.log(f"PLAYED: {card_data['label']}")
+
+        # Parse grammar cards as ESENS and apply potion
+        feedback = ""
+        if grammar_tokens:
+            result = parse_potion("".join(grammar_tokens))
+            if result is None:
+                return False, "Invalid potion!"
+            potion_log = apply_potion(result["dict"], state, self.rng)
+            self.log(f"CAST: {result['explanation']}")
+            if potion_log:
+                self.log(potion_log)
+            for entry in state.chains.drain():
+                self.log(entry)
+            feedback = f"Cast: {result['explanation']}"
+        elif action_cards:
+            feedback = "Played: " + ", ".join(c["label"] for c in action_cards)
+
+        # Clear lock slots (slot_count may have changed), refill hand
+        state.lock = [None] * state.slot_count
+        self.draw_cards(state.hand_size - len(state.hand))
+
+        # Transition to post_cast auto-play turns
+        state.phase = "post_cast"
+        self.turns_remaining = POST_CAST_TURNS
+        return True, feedback
+
+    def apply_input(self, kind: str, arg: int = 0):
+        """Apply one recorded input by name (see ``INPUTS``)."""
+        if kind == "cast":
+            return self.cast()
+        if kind == "take":
+            return self.take(arg)
+        if kind == "return":
+            return self.return_to_hand(arg)
+        if kind == "dock":
+            return self.dock(arg)
+        if kind == "lift":
+            return self.lift(arg)
+        raise ValueError(f"Unknown input: {kind!r}")
+
+    # ------------------------------------------------------------------
+    # Deck
+    # ------------------------------------------------------------------
+
+    def draw_cards(self, count: int):
+        """Move up to *count* cards from deck to hand. Curses fire on draw."""
+        state = self.state
+        for _ in range(count):
+            if not state.deck:
+                break
+            card = state.deck.pop()
+            if card.get("type") == "curse" and card.get("on_draw"):
+                dispatch_action(card, state, self.rng)
+                self.log(f"CURSE: {card['label']}!")
+                continue  # curse fires and vanishes
+            state.hand.append(card)
@@ -0,0 +1,145 @@
+"""Exact outcome distribution for 1v1 auto-battles — no sampling.
+
+In a one-on-one fight both combatants swing every round (the side that
+dies mid-round still gets its attack in, exactly as in
+``monte_carlo.run_battle``), so the round each side dies on is an
+independent random variable.  Each is a 1-D hit-point walk, which we
+propagate with a small convolution.  The battle ends on the first death;
+if both fall in the same round the heroes lose.
+"""
+
+from functools import lru_cache
+
+from grammar_mvp.game_state import Character
+
+
+@lru_cache(maxsize=None)
+def damage_pmf(strength: int, defense: int) -> tuple[float, ...]:
+    """P(damage == d) for d = 0..strength under the resolve_turn formula."""
+    pmf = [0.0] * (strength + 1)
+    p = 1.0 / (strength * (defense + 1))
+    for hit in range(1, strength + 1):
+        for block in range(defense + 1):
+            pmf[max(1, hit - block)] += p
+    return tuple(pmf)
+
+
+@lru_cache(maxsize=None)
+def death_round_pmf(hp: int, strength: int, defense: int) -> tuple[float, ...]:
+    """P(a fighter with *hp* dies on round t), indexed by t (t >= 1).
+
+    *strength* is the attacker's, *defense* the victim's.
+    """
+    pmf = damage_pmf(strength, defense)
+    alive = [0.0] * (hp + 1)  # alive[h] = P(h hit points left)
+    alive[hp] = 1.0
+    deaths = [0.0]
+    remaining = 1.0
+    while remaining > 1e-12:
+        nxt = [0.0] * (hp + 1)
+        died = 0.0
+        for h, mass in enumerate(alive):
+            if not mass:
+                continue
+            for dmg in range(1, len(pmf)):
+                if h - dmg > 0:
+                    nxt[h - dmg] += mass * pmf[dmg]
+                else:
+                    died += mass * pmf[dmg]
+        deaths.append(died)
+        alive = nxt
+        remaining -= died
+    return tuple(deaths)
+
+
+# Tolerance for "the cumulative mass is exactly on the boundary"
+_EPS = 1e-12
+
+
+def pmf_percentile(pmf, p: float) -> int:
+    """Smallest turn whose cumulative probability exceeds *p* percent.
+
+    The population form of ``aggregate_outcomes``' percentile, which
+    takes ``sorted_turns[int(n * p / 100)]``.
+    """
+    total = sum(pmf)
+    acc = 0.0
+    for t, mass in enumerate(pmf):
+        acc += mass
+        if acc > total * p / 100 + _EPS:
+            return t
+    return len(pmf) - 1
+
+
+def pmf_median(pmf) -> float | None:
+    """``statistics.median`` of the distribution *pmf* (unnormalized).
+
+    The smallest turn past half the mass; when the mass is split exactly
+    in half, the midpoint of the turns either side.  None for no mass.
+    """
+    total = sum(pmf)
+    if total <= _EPS:
+        return None
+    acc = 0.0
+    for t, mass in enumerate(pmf):
+        acc += mass
+        if acc > total / 2 + _EPS:
+            return t
+        if mass and abs(acc - total / 2) <= _EPS:
+            upper = next((u for u in range(t + 1, len(pmf)) if pmf[u] > 0), t)
+            return (t + upper) / 2
+    return len(pmf) - 1
+
+
+def exact_duel(hero: Character, enemy: Character) -> dict:
+    """Exact win rate and turn statistics for *hero* vs *enemy*.
+
+    Turn order does not matter in 1v1 because both sides always act each
+    round.  Returns ``win_rate``, ``ld50`` (median losing turn, or None),
+    ``avg_turns`` and ``turn_pmf`` (P(battle lasts t rounds)).
+    """
+    hero_dies = death_round_pmf(hero.hp, enemy.strength, hero.defense)
+    enemy_dies = death_round_pmf(enemy.hp, hero.strength, enemy.defense)
+    horizon = max(len(hero_dies), len(enemy_dies))
+
+    def survival(pmf):
+        # surv[t] = P(still alive after round t)
+        surv = [1.0] * horizon
+        acc = 1.0
+        for t in range(1, horizon):
+            acc -= pmf[t] if t < len(pmf) else 0.0
+            surv[t] = max(0.0, acc)
+        return surv
+
+    hero_surv = survival(hero_dies)
+    enemy_surv = survival(enemy_dies)
+
+    win = 0.0
+    turn_pmf = [0.0] * horizon
+    lose_pmf = [0.0] * horizon
+    for t in range(1, horizon):
+        h_t = hero_dies[t] if t < len(hero_dies) else 0.0
+        e_t = enemy_dies[t] if t < len(enemy_dies) else 0.0
+        # Hero dies at t with the enemy still standing before t → loss.
+        lose = h_t * enemy_surv[t - 1]
+        won = e_t * hero_surv[t]
+        lose_pmf[t] = lose
+        turn_pmf[t] = lose + won
+        win += won
+
+    return {
+        "win_rate": win,
+        "ld50": pmf_median(lose_pmf),
+        "avg_turns": sum(t * m for t, m in enumerate(turn_pmf)),
+        "turn_pmf": turn_pmf,
+    }
+
+
+def exact_applies(heroes: list[Character], enemies: list[Character]) -> bool:
+    """True when ``exact_duel`` models this matchup: 1v1, no active effects."""
+    return (
+        len(heroes) == 1
+        and len(enemies) == 1
+        and not heroes[0].active_effects
+        and not enemies[0].active_effects
+    )
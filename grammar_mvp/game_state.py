@@ -1,5 +1,11 @@
 from dataclasses import dataclass, field
 
+from grammar_mvp.battle_log import BattleLogBuffer
+from grammar_mvp.chains import ChainResolver
+from grammar_mvp.effects import EffectTimeline
+from grammar_mvp.modifiers import ModifierStack
+from grammar_mvp.triggers import TriggerBus
+
 
 @dataclass
 class Character:
@@ -8,7 +14,28 @@ class Character:
     max_hp: int
     strength: int
     defense: int
-    active_effects: list = field(default_factory=list)
+    active_effects: EffectTimeline = field(default_factory=EffectTimeline)
+    modifiers: ModifierStack = field(default_factory=ModifierStack)
+
+
+@dataclass(slots=True)
+class AttackEvent:
+    """Structured record of one attack.  Formatted only on demand."""
+
+    attacker: str
+    defender: str
+    hit: int
+    block: int
+    damage: int
+    hp_after: int
+    defender_max_hp: int
+
+    def __str__(self):
+        return (
+            f"{self.attacker} attacks! {self.hit} hit - {self.block} block = "
+            f"{self.damage} dmg. "
+            f"{self.defender}: {self.hp_after}/{self.defender_max_hp}"
+        )
 
 
 @dataclass
@@ -23,5 +50,15 @@ class GameState:
     slot_count: int
     hand_size: int
     phase: str          # "preview", "build", "resolve", "reward"
-    battle_log: list = field(default_factory=list)
+    battle_log: BattleLogBuffer = field(default_factory=BattleLogBuffer)
     turn: int = 0
+    heroes: list = field(default_factory=list)   # Whole hero side (hero leads)
+    enemies: list = field(default_factory=list)  # Whole enemy side (enemy leads)
+    triggers: TriggerBus = field(default_factory=TriggerBus)
+    chains: ChainResolver = field(default_factory=ChainResolver)
+
+    def __post_init__(self):
+        if not self.heroes:
+            self.heroes = [self.hero]
+        if not self.enemies:
+            self.enemies = [self.enemy]
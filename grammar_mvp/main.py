@@ -6,6 +6,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 import arcade
 
+from grammar_mvp.prevalidate import Prevalidator
 from grammar_mvp.views import SCREEN_HEIGHT, SCREEN_WIDTH, BattleView
 
 SCREEN_TITLE = "Potion Primer"
@@ -13,7 +14,10 @@ SCREEN_TITLE = "Potion Primer"
 
 def main():
     window = arcade.Window(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
-    window.show_view(BattleView())
+    # Check the ladder against the starter deck while the player plays
+    prevalidator = Prevalidator()
+    prevalidator.start()
+    window.show_view(BattleView(prevalidator=prevalidator))
     arcade.run()
 
 
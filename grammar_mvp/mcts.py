@@ -0,0 +1,275 @@
+"""Monte Carlo tree search player — a strong policy and a per-turn hint.
+
+A *move* is one build-phase decision: cast a potion the hand can spell
+(the card order is the slot order), play a single action card, or pass
+and let the next turn auto-play.  Moves are named by what they cast
+(``"P+S5"``, ``"Redraw"``, ``"pass"``), so the tree is open-loop: a
+node is a sequence of move names, and each iteration re-deals the dice
+on a fresh ``BattleEngine.fork``.  Children are picked by UCB1, unseen
+moves are expanded first, and a leaf is scored by playing the game out
+with a cheap rollout policy (1 for a win, 0 for a loss).
+
+Search runs until a time budget in milliseconds is spent (at least one
+playout always runs).  With
+``workers > 1`` each process searches its own tree (root
+parallelization) on a copy of the position rebuilt from its replay, and
+the root statistics are summed.  Every search reports nodes/sec.
+"""
+
+import argparse
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+
+from grammar_mvp.engine import BattleEngine
+from grammar_mvp.replay import decode, encode, record, replay
+from grammar_mvp.simulator import get_policy, idle_policy, play_cards, spellings
+
+DEFAULT_BUDGET_MS = 50
+EXPLORATION = 1.4
+
+PASS = "pass"
+
+
+class Node:
+    """Open-loop tree node: visit count, total reward, children by move name."""
+
+    __slots__ = ("visits", "value", "children")
+
+    def __init__(self):
+        self.visits = 0
+        self.value = 0.0
+        self.children: dict[str, "Node"] = {}
+
+
+def legal_moves(engine) -> dict[str, tuple]:
+    """Move name → hand indices to dock (``()`` for pass)."""
+    state = engine.state
+    budget = min(state.mana, state.slot_count)
+    moves = {PASS: ()}
+    for picks, notation in spellings(state.hand):
+        if len(picks) <= budget:
+            moves.setdefault(notation, picks)
+    if budget:
+        for i, card in enumerate(state.hand):
+            if card.get("type") == "action":
+                moves.setdefault(card["label"], (i,))
+    return moves
+
+
+def _advance(engine):
+    """Auto-play until the next build decision or the end of the game."""
+    while engine.playing and engine.state.phase != "build":
+        engine.play_turn()
+
+
+def _apply(engine, picks):
+    if picks:
+        play_cards(engine, picks)
+    engine.play_turn()
+
+
+def _rollout(engine, policy, rng) -> float:
+    while engine.playing:
+        if engine.state.phase == "build":
+            policy(engine, rng)
+        engine.play_turn()
+    return 1.0 if engine.result == "win" else 0.0
+
+
+def _ucb(parent: Node, child: Node) -> float:
+    return (child.value / child.visits
+            + EXPLORATION * math.sqrt(math.log(parent.visits) / child.visits))
+
+
+def _search(engine, budget_ms, rng, rollout=idle_policy) -> tuple[Node, int]:
+    """Grow a tree from *engine* for *budget_ms*.
+
+    Returns ``(root, nodes)``, where *nodes* counts tree nodes visited
+    below the root over all iterations.
+    """
+    root = Node()
+    deadline = time.perf_counter() + budget_ms / 1000
+    nodes = 0
+    while True:
+        sim = engine.fork(rng.getrandbits(64))
+        node, path = root, [root]
+        while True:
+            _advance(sim)
+            if not sim.playing:
+                break
+            moves = legal_moves(sim)
+            untried = [m for m in moves if m not in node.children]
+            if untried:
+                move = rng.choice(untried)
+                node.children[move] = child = Node()
+                _apply(sim, moves[move])
+                path.append(child)
+                break
+            move = max((m for m in moves),
+                       key=lambda m: _ucb(node, node.children[m]))
+            node = node.children[move]
+            _apply(sim, moves[move])
+            path.append(node)
+        reward = _rollout(sim, rollout, rng)
+        nodes += len(path) - 1
+        for visited in path:
+            visited.visits += 1
+            visited.value += reward
+        if time.perf_counter() >= deadline:
+            return root, nodes
+
+
+def _root_stats(root: Node) -> dict[str, tuple[int, float]]:
+    return {m: (c.visits, c.value) for m, c in root.children.items()}
+
+
+def _search_worker(data, card_db, starter, budget_ms, seed, rollout):
+    engine = replay(decode(data), card_db, starter)
+    root, nodes = _search(engine, budget_ms, random.Random(seed),
+                          get_policy(rollout))
+    return _root_stats(root), root.visits, nodes
+
+
+def suggest(engine, budget_ms: float = DEFAULT_BUDGET_MS, rng=random,
+            workers: int = 1, rollout: str = "idle", pool=None) -> dict:
+    """Search the current build decision and recommend a move.
+
+    With ``workers > 1`` each worker rebuilds the position by replaying
+    the engine's seed and inputs, so *engine* must only have been driven
+    through its input methods.  Pass an open ``ProcessPoolExecutor`` as
+    *pool* to reuse it; otherwise one is started (and its start-up
+    counted against the budget) for this call.
+
+    Returns a dict with:
+      - move:          best move name (most visited)
+      - picks:         hand indices to dock for it, in slot order
+      - win_rate:      estimated win rate after that move
+      - moves:         {name: (visits, estimated win rate)} at the root
+      - iterations:    playouts run, summed over workers
+      - nodes:         tree nodes visited, summed over workers
+      - nodes_per_sec: search throughput
+    """
+    moves = legal_moves(engine)
+    start = time.perf_counter()
+    if workers > 1:
+        data = encode(record(engine))
+        seeds = [rng.getrandbits(64) for _ in range(workers)]
+        with ExitStack() as stack:
+            if pool is None:
+                pool = stack.enter_context(ProcessPoolExecutor(workers))
+            results = list(pool.map(
+                _search_worker, [data] * workers, [engine.card_db] * workers,
+                [engine.starter] * workers, [budget_ms] * workers, seeds,
+                [rollout] * workers,
+            ))
+    else:
+        root, nodes = _search(engine, budget_ms, rng, get_policy(rollout))
+        results = [(_root_stats(root), root.visits, nodes)]
+    elapsed = time.perf_counter() - start
+
+    totals: dict[str, list] = {}
+    for stats, _, _ in results:
+        for move, (visits, value) in stats.items():
+            entry = totals.setdefault(move, [0, 0.0])
+            entry[0] += visits
+            entry[1] += value
+    best = max(totals, key=lambda m: totals[m][0]) if totals else PASS
+    visits, value = totals.get(best, (0, 0.0))
+    nodes = sum(n for _, _, n in results)
+    return {
+        "move": best,
+        "picks": moves.get(best, ()),
+        "win_rate": value / visits if visits else None,
+        "moves": {m: (v, val / v) for m, (v, val) in totals.items()},
+        "iterations": sum(n for _, n, _ in results),
+        "nodes": nodes,
+        "nodes_per_sec": nodes / elapsed if elapsed else 0.0,
+    }
+
+
+class MCTSPolicy:
+    """Simulator policy that plays ``suggest()``'s move each build turn.
+
+    ``history`` keeps every decision's ``suggest()`` result since the
+    last ``reset()`` (``play_game`` resets at the start of each game),
+    so a game reports its nodes/sec.  With ``workers > 1`` one process
+    pool serves every search; ``close()`` it when done.
+    """
+
+    def __init__(self, budget_ms: float = DEFAULT_BUDGET_MS, workers: int = 1,
+                 rollout: str = "idle"):
+        self.budget_ms = budget_ms
+        self.workers = workers
+        self.rollout = rollout
+        self.history: list[dict] = []
+        self._pool: ProcessPoolExecutor | None = None
+
+    def __call__(self, engine, rng):
+        # Only one move — nothing to search.
+        if len(legal_moves(engine)) == 1:
+            return
+        hint = suggest(engine, self.budget_ms, rng, self.workers, self.rollout,
+                       self._executor())
+        self.history.append(hint)
+        if hint["picks"]:
+            play_cards(engine, hint["picks"])
+
+    def _executor(self) -> ProcessPoolExecutor | None:
+        if self.workers > 1 and self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers)
+            # Start every process now, not inside the first search's budget
+            list(self._pool.map(time.sleep, [0.05] * self.workers))
+        return self._pool
+
+    def reset(self):
+        """Forget the previous game's searches."""
+        self.history.clear()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def nodes_per_sec(self) -> float | None:
+        """Mean search throughput, None if nothing needed searching."""
+        searched = [h["nodes_per_sec"] for h in self.history]
+        return sum(searched) / len(searched) if searched else None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Tree-search hint for the opening build decision",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Game seed")
+    parser.add_argument("--budget-ms", type=float, default=500,
+                        help="Search time in milliseconds (default: 500)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes searching in parallel (default: 1)")
+    parser.add_argument("--rollout", default="idle",
+                        help="Rollout policy name (default: idle)")
+    args = parser.parse_args()
+
+    engine = BattleEngine(args.seed)
+    _advance(engine)
+    print("Hand:", " ".join(c["token"] for c in engine.state.hand))
+    hint = suggest(engine, args.budget_ms, random.Random(args.seed),
+                   args.workers, args.rollout)
+    for move, (visits, rate) in sorted(hint["moves"].items(),
+                                       key=lambda kv: -kv[1][0]):
+        print(f"  {move:<12} {visits:>6} playouts  {rate:.1%}")
+    print(f"Best: {hint['move']}  ({hint['nodes_per_sec']:,.0f} nodes/sec, "
+          f"{hint['iterations']} playouts)")
+
+
+if __name__ == "__main__":
+    main()
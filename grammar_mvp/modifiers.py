@@ -0,0 +1,110 @@
+"""Derived-stat modifier stack — composable, undoable STR/DEF changes.
+
+A Character's ``strength`` and ``defense`` attributes always hold the
+*effective* value, so combat reads them directly.  While any modifier is
+active on a stat, the stack remembers the stat's base and recomputes the
+effective value only when a modifier is added or removed:
+
+    effective = set value                       (if any override is active)
+              = (base + Σ add) × (1 + Σ pct/100) × Π mul     otherwise
+
+ESENS interaction tags pick how percentages combine and what cancels:
+
+- ``IA`` (additive, the default): percentages are summed, then applied once.
+- ``IM`` (multiplicative): the percentage compounds as its own factor.
+- ``IX`` (exclusive): cancels existing modifiers of the same kind on the stat.
+"""
+
+from dataclasses import dataclass
+
+KINDS = ("add", "pct", "mul", "set")
+
+
+@dataclass(eq=False)
+class Modifier:
+    attr: str           # Character attribute, e.g. "strength"
+    kind: str           # "add" | "pct" | "mul" | "set"
+    value: float
+    tag: str | None = None  # ESENS interaction tag: "IX" | "IA" | "IM"
+
+
+class ModifierStack:
+    """Per-character modifier buckets with cached effective stats."""
+
+    def __init__(self):
+        self.base: dict[str, int] = {}
+        self._mods: dict[str, list[Modifier]] = {}
+
+    def __len__(self):
+        return sum(len(mods) for mods in self._mods.values())
+
+    def modifiers(self, attr: str) -> list[Modifier]:
+        """Active modifiers on *attr*, oldest first."""
+        return list(self._mods.get(attr, ()))
+
+    def add(self, character, modifier: Modifier) -> Modifier:
+        """Apply *modifier* to *character* and refresh the effective stat."""
+        if modifier.kind not in KINDS:
+            raise ValueError(f"Unknown modifier kind: {modifier.kind!r}")
+        attr = modifier.attr
+        mods = self._mods.setdefault(attr, [])
+        if not mods:
+            self.base[attr] = getattr(character, attr)
+        if modifier.tag == "IX":
+            mods[:] = [m for m in mods if m.kind != modifier.kind]
+        mods.append(modifier)
+        self._refresh(character, attr)
+        return modifier
+
+    def remove(self, character, modifier: Modifier) -> bool:
+        """Undo *modifier*.  False if it was already gone (e.g. cancelled by IX)."""
+        mods = self._mods.get(modifier.attr)
+        if not mods or modifier not in mods:
+            return False
+        mods.remove(modifier)
+        self._refresh(character, modifier.attr)
+        return True
+
+    def update(self, character, modifier: Modifier, value: float) -> bool:
+        """Change an active *modifier*'s value in place (e.g. a new stack)."""
+        mods = self._mods.get(modifier.attr)
+        if not mods or modifier not in mods:
+            return False
+        modifier.value = value
+        self._refresh(character, modifier.attr)
+        return True
+
+    def shift_base(self, character, attr: str, delta: int):
+        """Permanently change *attr*'s base by *delta* (floored at 0)."""
+        if self._mods.get(attr):
+            self.base[attr] = max(0, self.base[attr] + delta)
+            self._refresh(character, attr)
+        else:
+            setattr(character, attr, max(0, getattr(character, attr) + delta))
+
+    def _refresh(self, character, attr: str):
+        mods = self._mods[attr]
+        if not mods:
+            setattr(character, attr, max(0, self.base.pop(attr)))
+            del self._mods[attr]
+            return
+        value = None
+        for m in mods:
+            if m.kind == "set":
+                value = m.value  # newest override wins
+        if value is None:
+            flat = self.base[attr]
+            pct = 0.0
+            factor = 1.0
+            for m in mods:
+                if m.kind == "add":
+                    flat += m.value
+                elif m.kind == "mul":
+                    factor *= m.value
+                elif m.kind == "pct":
+                    if m.tag == "IM":
+                        factor *= 1 + m.value / 100
+                    else:
+                        pct += m.value
+            value = flat * (1 + pct / 100) * factor
+        setattr(character, attr, max(0, round(value)))
@@ -0,0 +1,1661 @@
+"""Monte Carlo battle simulator — balance tool for PotionWorld.
+
+Simulate team battles: an arbitrary number of heroes vs an arbitrary
+number of enemies.  Each round every living combatant acts once,
+targeting the frontline enemy.  Standard RPG party combat.
+
+The headline stat is LD50: the turn at which 50% of hero teams are wiped.
+
+Usage examples:
+
+  # Simple — current game defaults (1v1)
+  python -m grammar_mvp.monte_carlo
+
+  # 1 hero vs 4 skeletons (gauntlet)
+  python -m grammar_mvp.monte_carlo \\
+      --hero "Sir Aldric:30/6/3" \\
+      --enemy "Skeleton:30/5/2" --enemy "Skeleton:30/5/2" \\
+      --enemy "Skeleton:30/5/2" --enemy "Skeleton:30/5/2"
+
+  # 3 heroes vs 1 boss
+  python -m grammar_mvp.monte_carlo \\
+      --hero "Paladin:40/7/5" --hero "Rogue:25/9/2" --hero "Cleric:30/5/4" \\
+      --enemy "Ogre:50/10/4"
+
+  # With timing info (turn delay in seconds)
+  python -m grammar_mvp.monte_carlo --turn-delay 5.0
+
+  # Test first-strike advantage (paired on common random numbers)
+  python -m grammar_mvp.monte_carlo --first both --crn
+
+  # Antithetic battle pairs: same precision from fewer battles
+  python -m grammar_mvp.monte_carlo --variance antithetic --runs 2000
+
+  # CSV output for spreadsheets
+  python -m grammar_mvp.monte_carlo --csv
+
+  # Keep results in a local store; repeat runs become lookups
+  python -m grammar_mvp.monte_carlo --cache results.db --runs 5000
+
+  # Win-rate value of potions cast on turn 2
+  python -m grammar_mvp.monte_carlo --potion P+H10 --potion E-S3 --cast-turn 2
+"""
+
+import argparse
+import csv
+import io
+import math
+import random
+import statistics
+import sys
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from grammar_mvp.battle import begin_turn, strike, tick_effects
+from grammar_mvp.compiler import canonical_notation, compile_effect
+from grammar_mvp.engine import parse_potion
+from grammar_mvp.exact import exact_applies, exact_duel
+from grammar_mvp.game_state import Character, GameState
+from grammar_mvp.snapshots import clone_character
+from grammar_mvp.teams import TeamStats
+from grammar_mvp.triggers import TriggerBus
+
+
+# ── Character parsing ────────────────────────────────────────────────
+
+def parse_character(spec: str, default_name: str = "Fighter") -> Character:
+    """Parse 'Name:HP/STR/DEF' or 'HP/STR/DEF' into a Character."""
+    if ":" in spec:
+        name, stats = spec.split(":", 1)
+    else:
+        name, stats = default_name, spec
+    parts = stats.split("/")
+    if len(parts) != 3:
+        raise argparse.ArgumentTypeError(
+            f"Expected HP/STR/DEF (e.g. '30/6/3'), got '{stats}'"
+        )
+    hp, strength, defense = int(parts[0]), int(parts[1]), int(parts[2])
+    return Character(name, hp, hp, strength, defense)
+
+
+def _char_label(chars: list[Character]) -> str:
+    """Short label for a team: 'Goblin' or 'Goblin, Skeleton x2'."""
+    counts: dict[str, int] = {}
+    for c in chars:
+        key = f"{c.name}({c.max_hp}/{c.strength}/{c.defense})"
+        counts[key] = counts.get(key, 0) + 1
+    parts = []
+    for name, n in counts.items():
+        parts.append(f"{name} x{n}" if n > 1 else name)
+    return ", ".join(parts)
+
+
+def _team_total_hp(chars: list[Character]) -> int:
+    return sum(c.max_hp for c in chars)
+
+
+# ── Simulation ───────────────────────────────────────────────────────
+
+class BattleArena:
+    """Flat-array battle core for repeated runs of one matchup.
+
+    Team stats live in preallocated parallel lists that are reset in
+    place at the start of each run — no Character copies.  Because every
+    attack hits the frontline, the living fighters on each side are always
+    a suffix of the team, so a frontline index replaces rescanning.
+    Fighters already at 0 HP in the templates are left out up front (they
+    can never act or be targeted).  Dice are drawn in exactly the same
+    order as the Character-based path, so a seeded *rng* gives identical
+    results.
+
+    The starting teams are held as ``TeamStats`` (``hero_team`` and
+    ``enemy_team``), so pre-battle potions — including area ones — can be
+    applied to the template with ``cast()``.
+
+    Only valid when no template carries active effects — use
+    ``BattleArena.supports()`` to check.
+    """
+
+    def __init__(self, heroes: list[Character], enemies: list[Character]):
+        self.hero_team = TeamStats.from_characters([c for c in heroes if c.hp > 0])
+        self.enemy_team = TeamStats.from_characters([c for c in enemies if c.hp > 0])
+        self.h_dead_at_start = len(heroes) - len(self.hero_team)
+        self.e_dead_at_start = len(enemies) - len(self.enemy_team)
+        self.h_hp = list(self.hero_team.hp)
+        self.e_hp = list(self.enemy_team.hp)
+
+    @staticmethod
+    def supports(heroes: list[Character], enemies: list[Character]) -> bool:
+        """True when no fighter has active effects to tick."""
+        return not any(c.active_effects for c in heroes) and not any(
+            c.active_effects for c in enemies
+        )
+
+    def cast(self, effect) -> bool:
+        """Apply an immediate ESENS effect to the starting teams.
+
+        *effect* is a ``parse_esens`` dict or ``StatusEffect``.  ``P``/``E``
+        affect the lead fighter; ``A``/``X``/``G`` update a whole side in
+        one batched ``TeamStats.apply``.  Fighters it kills are dropped
+        from the template.  Returns False — and changes nothing — for
+        timed effects, which the arena cannot expire.
+        """
+        parsed = effect.to_dict() if hasattr(effect, "to_dict") else effect
+        if (parsed.get("duration") or {}).get("type") in ("T", "A"):
+            return False
+        sides = {
+            "P": ((self.hero_team, 0),),
+            "E": ((self.enemy_team, 0),),
+            "A": ((self.hero_team, None),),
+            "X": ((self.enemy_team, None),),
+            "G": ((self.hero_team, None), (self.enemy_team, None)),
+        }.get(parsed.get("target", "P"), ())
+        mag = parsed.get("magnitude") or {}
+        applied = False
+        for team, index in sides:
+            if len(team):
+                applied |= team.apply(
+                    parsed.get("stat_affected", "H"),
+                    parsed.get("effect_type", "+"),
+                    mag.get("value", 0),
+                    mag.get("is_percentage", False),
+                    mag.get("is_full", False),
+                    index=index,
+                )
+        self.h_dead_at_start += self.hero_team.drop_fallen()
+        self.e_dead_at_start += self.enemy_team.drop_fallen()
+        self.h_hp = list(self.hero_team.hp)
+        self.e_hp = list(self.enemy_team.hp)
+        return applied
+
+    def run(self, hero_first: bool = True, rng=random, enemy_rng=None) -> dict:
+        """One battle from the template state.  Same result dict as run_battle.
+
+        With *enemy_rng*, enemy swings draw from it and hero swings from
+        *rng* — per-side dice streams, so two battles that differ only in
+        turn order can still share every die (see ``variance.compare``).
+        """
+        h_hp, e_hp = self.h_hp, self.e_hp
+        h_hp[:] = self.hero_team.hp
+        e_hp[:] = self.enemy_team.hp
+        h_str, e_str = self.hero_team.strength, self.enemy_team.strength
+        h_def, e_def = self.hero_team.defense, self.enemy_team.defense
+        nh, ne = len(h_hp), len(e_hp)
+        randint = rng.randint
+        e_randint = enemy_rng.randint if enemy_rng is not None else randint
+        h_front = e_front = 0
+        turn = 0
+
+        while h_front < nh and e_front < ne:
+            # Attackers are fixed at round start: fighters felled by the
+            # first side still swing back this round.
+            h0, e0 = h_front, e_front
+            for side in ((True, False) if hero_first else (False, True)):
+                if side:
+                    for a in range(h0, nh):
+                        if e_front >= ne:
+                            break
+                        dmg = randint(1, h_str[a]) - randint(0, e_def[e_front])
+                        hp = e_hp[e_front] - (dmg if dmg > 1 else 1)
+                        if hp > 0:
+                            e_hp[e_front] = hp
+                        else:
+                            e_hp[e_front] = 0
+                            e_front += 1
+                else:
+                    for a in range(e0, ne):
+                        if h_front >= nh:
+                            break
+                        dmg = e_randint(1, e_str[a]) - e_randint(0, h_def[h_front])
+                        hp = h_hp[h_front] - (dmg if dmg > 1 else 1)
+                        if hp > 0:
+                            h_hp[h_front] = hp
+                        else:
+                            h_hp[h_front] = 0
+                            h_front += 1
+            turn += 1
+
+        return {
+            "result": "win" if h_front < nh else "lose",
+            "turns": turn,
+            "last_hero_hp": h_hp[-1] if h_front < nh else 0,
+            "last_enemy_hp": e_hp[-1] if e_front < ne else 0,
+            "heroes_fallen": self.h_dead_at_start + h_front,
+            "enemies_fallen": self.e_dead_at_start + e_front,
+        }
+
+
+def _battle_runner(heroes: list[Character], enemies: list[Character]):
+    """Return ``run(hero_first, rng) -> outcome`` for repeated battles.
+
+    Uses a shared BattleArena when possible, else the Character path.
+    """
+    if BattleArena.supports(heroes, enemies):
+        return BattleArena(heroes, enemies).run
+    return lambda hero_first, rng: _run_battle_characters(
+        heroes, enemies, hero_first, rng,
+    )
+
+
+def run_battle(
+    heroes: list[Character],
+    enemies: list[Character],
+    hero_first: bool = True,
+    rng=random,
+) -> dict:
+    """Simulate one full battle between hero team and enemy team.
+
+    Each round every living combatant acts once.  The side indicated by
+    *hero_first* swings first, then the other side.  Each attacker
+    targets the first living fighter on the opposing side (frontline).
+    One round = one turn for timing purposes.  All dice come from *rng*.
+    """
+    return _battle_runner(heroes, enemies)(hero_first, rng)
+
+
+def _run_battle_characters(heroes, enemies, hero_first, rng, cast=None):
+    """Character-based battle loop, used when fighters carry effects.
+
+    *cast* is an optional ``(program, turn, potion_rng)``: the compiled
+    potion is applied at the start of round *turn*, and from then on the
+    battle runs on its GameState's trigger bus.
+    """
+    h_team = [clone_character(c) for c in heroes]
+    e_team = [clone_character(c) for c in enemies]
+    turn = 0
+    bus = None
+
+    def living(team):
+        return [c for c in team if c.hp > 0]
+
+    while living(h_team) and living(e_team):
+        if cast is not None and turn == cast[1]:
+            program, _, potion_rng = cast
+            state = GameState(
+                hero=living(h_team)[0], enemy=living(e_team)[0],
+                mana=0, max_mana=0, deck=[], hand=[], lock=[],
+                slot_count=0, hand_size=0, phase="resolve",
+                heroes=h_team, enemies=e_team,
+                triggers=TriggerBus(potion_rng),
+            )
+            program(state, potion_rng, log=False)
+            bus = state.triggers
+            if not (living(h_team) and living(e_team)):
+                break
+
+        if hero_first:
+            sides = [(living(h_team), e_team), (living(e_team), h_team)]
+        else:
+            sides = [(living(e_team), h_team), (living(h_team), e_team)]
+
+        for attackers, target_team in sides:
+            for attacker in attackers:
+                targets = living(target_team)
+                if targets:
+                    if bus is not None:
+                        begin_turn(attacker, bus)
+                    strike(attacker, targets[0], rng, bus)
+
+        for c in h_team + e_team:
+            if c.hp > 0:
+                tick_effects(c, bus)
+
+        turn += 1
+
+    heroes_fallen = sum(1 for h in h_team if h.hp <= 0)
+    enemies_fallen = sum(1 for e in e_team if e.hp <= 0)
+    hero_side_won = bool(living(h_team))
+    surviving_heroes = living(h_team)
+    surviving_enemies = living(e_team)
+
+    return {
+        "result": "win" if hero_side_won else "lose",
+        "turns": turn,
+        "last_hero_hp": surviving_heroes[-1].hp if surviving_heroes else 0,
+        "last_enemy_hp": surviving_enemies[-1].hp if surviving_enemies else 0,
+        "heroes_fallen": heroes_fallen,
+        "enemies_fallen": enemies_fallen,
+    }
+
+
+def monte_carlo(
+    heroes: list[Character],
+    enemies: list[Character],
+    runs: int,
+    hero_first: bool = True,
+    seed: int | None = None,
+    cache=None,
+) -> dict:
+    """Run *runs* battles and return aggregate stats.
+
+    With a *seed*, battle ``i`` draws from a stream seeded ``seed + i``.
+    Two calls with the same seed therefore replay the same dice on every
+    battle (common random numbers), even if the teams differ.
+
+    With a *cache* (``result_cache.ResultCache``) only battles the cache
+    lacks are simulated.  Seeded stats are the same as without it;
+    unseeded stats cover every stored battle.
+    """
+    if cache is not None:
+        return cache.monte_carlo(heroes, enemies, runs, hero_first, seed)
+    return aggregate_outcomes(
+        simulate_outcomes(heroes, enemies, runs, hero_first, seed))
+
+
+def simulate_outcomes(
+    heroes: list[Character],
+    enemies: list[Character],
+    runs: int,
+    hero_first: bool = True,
+    seed: int | None = None,
+) -> list[dict]:
+    """The run_battle() outcome of each of *runs* battles (see monte_carlo)."""
+    run = _battle_runner(heroes, enemies)
+    if seed is None:
+        return [run(hero_first, random) for _ in range(runs)]
+    rng = random.Random()
+    outcomes = []
+    for i in range(runs):
+        rng.seed(seed + i)
+        outcomes.append(run(hero_first, rng))
+    return outcomes
+
+
+def aggregate_outcomes(outcomes: list[dict]) -> dict:
+    """Reduce a list of run_battle() results to the monte_carlo() stats dict."""
+    runs = len(outcomes)
+    wins = 0
+    losses = 0
+    turn_counts = []
+    win_hp = []
+    lose_hp = []
+    death_turns = []
+    heroes_fallen_counts = []
+    enemies_fallen_counts = []
+
+    for outcome in outcomes:
+        turn_counts.append(outcome["turns"])
+        heroes_fallen_counts.append(outcome["heroes_fallen"])
+        enemies_fallen_counts.append(outcome["enemies_fallen"])
+        if outcome["result"] == "win":
+            wins += 1
+            win_hp.append(outcome["last_hero_hp"])
+        else:
+            losses += 1
+            lose_hp.append(outcome["last_enemy_hp"])
+            death_turns.append(outcome["turns"])
+
+    sorted_turns = sorted(turn_counts)
+    n = len(sorted_turns)
+
+    def percentile(p):
+        idx = int(n * p / 100)
+        return sorted_turns[min(idx, n - 1)]
+
+    ld50 = statistics.median(death_turns) if death_turns else None
+
+    return {
+        "runs": runs,
+        "wins": wins,
+        "losses": losses,
+        "win_rate": wins / runs,
+        "ld50": ld50,
+        "avg_turns": statistics.mean(turn_counts),
+        "min_turns": min(turn_counts),
+        "max_turns": max(turn_counts),
+        "p10_turns": percentile(10),
+        "p25_turns": percentile(25),
+        "p50_turns": percentile(50),
+        "p75_turns": percentile(75),
+        "p90_turns": percentile(90),
+        "avg_hero_hp_on_win": statistics.mean(win_hp) if win_hp else 0,
+        "avg_enemy_hp_on_loss": statistics.mean(lose_hp) if lose_hp else 0,
+        "avg_heroes_fallen": statistics.mean(heroes_fallen_counts),
+        "avg_enemies_fallen": statistics.mean(enemies_fallen_counts),
+    }
+
+
+def wilson_interval(
+    wins: int, n: int, confidence: float = 0.95,
+) -> tuple[float, float]:
+    """Wilson score interval for a win rate of *wins* out of *n* battles."""
+    if n == 0:
+        return 0.0, 1.0
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = wins / n
+    z2 = z * z
+    centre = (p + z2 / (2 * n)) / (1 + z2 / n)
+    half = z * math.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / (1 + z2 / n)
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+# ── Progress ─────────────────────────────────────────────────────────
+
+# Battles per partial result from iter_monte_carlo()
+DEFAULT_BATCH = 250
+
+
+def iter_monte_carlo(
+    heroes: list[Character],
+    enemies: list[Character],
+    runs: int,
+    hero_first: bool = True,
+    seed: int | None = None,
+    batch_size: int = DEFAULT_BATCH,
+    workers: int = 1,
+    confidence: float = 0.95,
+):
+    """``monte_carlo()`` as a generator of partial results.
+
+    Battles run in batches of *batch_size* — spread over *workers*
+    processes when ``workers > 1`` — and a dict is yielded after each:
+
+      - done:      battles simulated so far (of *runs*)
+      - runs:      battles requested
+      - wins, win_rate, ld50:  aggregates so far
+      - ci:        Wilson interval for win_rate at *confidence*
+      - finished:  True on the last update only
+      - result:    on the last update, the full monte_carlo() stats
+
+    With a *seed* the final result equals ``monte_carlo(..., seed=seed)``
+    whatever the batching or worker count.  Closing the generator — or
+    breaking out of the loop — cancels the batches not yet run.
+    """
+    starts = range(0, runs, batch_size)
+    outcomes, deaths = [], []
+
+    def batch_args(start):
+        """simulate_outcomes() arguments for the batch at *start*."""
+        if seed is not None:
+            batch_seed = seed + start
+        else:
+            # Unseeded batches in a pool still need distinct streams
+            batch_seed = random.randrange(2**62) if workers > 1 else None
+        return (heroes, enemies, min(batch_size, runs - start), hero_first,
+                batch_seed)
+
+    def absorb(batch):
+        outcomes.extend(batch)
+        deaths.extend(o["turns"] for o in batch if o["result"] != "win")
+        done = len(outcomes)
+        wins = done - len(deaths)
+        update = {
+            "done": done,
+            "runs": runs,
+            "wins": wins,
+            "win_rate": wins / done,
+            "ci": wilson_interval(wins, done, confidence),
+            "ld50": statistics.median(deaths) if deaths else None,
+            "finished": done >= runs,
+        }
+        if update["finished"]:
+            update["result"] = aggregate_outcomes(outcomes)
+        return update
+
+    if workers <= 1:
+        for start in starts:
+            yield absorb(simulate_outcomes(*batch_args(start)))
+        return
+
+    pool = ProcessPoolExecutor(workers)
+    todo = iter(starts)
+    pending = set()
+    try:
+        while True:
+            # Keep a couple of batches queued per worker, no more, so a
+            # cancel doesn't leave a long tail of work behind.
+            for start in todo:
+                pending.add(pool.submit(simulate_outcomes, *batch_args(start)))
+                if len(pending) >= 2 * workers:
+                    break
+            if not pending:
+                return
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield absorb(future.result())
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ── Potion value ─────────────────────────────────────────────────────
+
+# (canonical notation, matchup, runs, cast turn, hero_first, seed) → stats;
+# the uncast baseline is stored under notation None.  Least recently used
+# entries are dropped past MAX_POTION_STATS.
+MAX_POTION_STATS = 4096
+_POTION_STATS: OrderedDict[tuple, dict] = OrderedDict()
+
+
+def _cached_potion_stats(key: tuple) -> dict | None:
+    stats = _POTION_STATS.get(key)
+    if stats is not None:
+        _POTION_STATS.move_to_end(key)
+    return stats
+
+
+def _store_potion_stats(key: tuple, stats: dict):
+    _POTION_STATS[key] = stats
+    _POTION_STATS.move_to_end(key)
+    if len(_POTION_STATS) > MAX_POTION_STATS:
+        _POTION_STATS.popitem(last=False)
+
+
+def _matchup_key(heroes, enemies) -> tuple | None:
+    """Hashable matchup identity, or None if fighters carry effects."""
+    if not BattleArena.supports(heroes, enemies):
+        return None
+    return tuple(
+        tuple((c.hp, c.max_hp, c.strength, c.defense) for c in team)
+        for team in (heroes, enemies)
+    )
+
+
+def _potion_stats(heroes, enemies, effect, runs, cast_turn, hero_first, seed):
+    """monte_carlo() stats with *effect* cast at *cast_turn* (pool entry).
+
+    Battle ``i`` replays the dice of ``monte_carlo(..., seed)`` battle
+    ``i``; the potion's own rolls (durations, chances) come from a
+    separate stream so they don't shift the combat dice.
+    """
+    program = compile_effect(effect)
+    rng, potion_rng = random.Random(), random.Random()
+    outcomes = []
+    for i in range(runs):
+        rng.seed(seed + i)
+        potion_rng.seed(f"potion/{seed + i}")
+        outcomes.append(_run_battle_characters(
+            heroes, enemies, hero_first, rng,
+            cast=(program, cast_turn, potion_rng),
+        ))
+    return aggregate_outcomes(outcomes)
+
+
+def potion_values(
+    heroes: list[Character],
+    enemies: list[Character],
+    notations: list[str],
+    runs: int = 1000,
+    cast_turn: int = 0,
+    hero_first: bool = True,
+    seed: int | None = None,
+    workers: int = 1,
+) -> dict:
+    """How much each ESENS potion shifts a matchup.
+
+    Every notation is cast once at the start of round *cast_turn* (0 =
+    before the first blow) and simulated *runs* times against the same
+    dice as the uncast baseline (common random numbers), so the deltas
+    are not swamped by battle-to-battle noise.  Distinct notations run
+    in parallel across *workers* processes.  Notations that compile to
+    the same effect share one simulation, and with a *seed* results are
+    cached across calls by canonical notation (the ``MAX_POTION_STATS``
+    most recently used are kept).
+
+    Returns a dict with:
+      - baseline: monte_carlo() stats without a potion
+      - potions:  one dict per notation, in order, with notation,
+                  canonical, win_rate, delta_win_rate, ld50, delta_ld50
+                  (None unless both LD50s exist) and stats
+    Raises ValueError for a notation that does not parse.
+    """
+    effects = {}
+    for notation in notations:
+        parsed = parse_potion(notation)
+        if parsed is None:
+            raise ValueError(f"Invalid potion: {notation!r}")
+        effects[notation] = parsed["dict"]
+    cacheable = seed is not None
+    if seed is None:
+        seed = random.randrange(2**32)
+    matchup = _matchup_key(heroes, enemies)
+    cacheable = cacheable and matchup is not None
+
+    def key(canonical):
+        return (canonical, matchup, runs, cast_turn, hero_first, seed)
+
+    known, todo = {}, {}
+    for effect in effects.values():
+        canonical = canonical_notation(effect)
+        stats = _cached_potion_stats(key(canonical)) if cacheable else None
+        if stats is not None:
+            known[canonical] = stats
+        else:
+            todo.setdefault(canonical, effect)
+    args = [(heroes, enemies, effect, runs, cast_turn, hero_first, seed)
+            for effect in todo.values()]
+    if workers > 1 and len(args) > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_potion_stats, *zip(*args)))
+    else:
+        results = [_potion_stats(*a) for a in args]
+    for canonical, stats in zip(todo, results):
+        known[canonical] = stats
+        if cacheable:
+            _store_potion_stats(key(canonical), stats)
+
+    baseline = _cached_potion_stats(key(None)) if cacheable else None
+    if baseline is None:
+        baseline = monte_carlo(heroes, enemies, runs, hero_first, seed)
+        if cacheable:
+            _store_potion_stats(key(None), baseline)
+    rows = []
+    for notation, effect in effects.items():
+        canonical = canonical_notation(effect)
+        stats = known[canonical]
+        ld50 = stats["ld50"]
+        rows.append({
+            "notation": notation,
+            "canonical": canonical,
+            "win_rate": stats["win_rate"],
+            "delta_win_rate": stats["win_rate"] - baseline["win_rate"],
+            "ld50": ld50,
+            "delta_ld50": (ld50 - baseline["ld50"]
+                           if ld50 is not None and baseline["ld50"] is not None
+                           else None),
+            "stats": stats,
+        })
+    return {"baseline": baseline, "cast_turn": cast_turn, "potions": rows}
+
+
+# ── Adaptive difficulty (runtime API) ────────────────────────────────
+
+def scale_team(
+    team: list[Character],
+    hp_scale: float = 1.0,
+    str_scale: float = 1.0,
+    def_scale: float = 1.0,
+) -> list[Character]:
+    """Return a deep copy of *team* with stats scaled by the given factors.
+
+    All values are clamped to a minimum of 1.  HP and max_hp are scaled
+    together so the fighter starts at full health.
+    """
+    scaled = []
+    for c in team:
+        hp = max(1, round(c.max_hp * hp_scale))
+        s = max(1, round(c.strength * str_scale))
+        d = max(1, round(c.defense * def_scale))
+        scaled.append(Character(c.name, hp, hp, s, d))
+    return scaled
+
+
+def difficulty_check(
+    heroes: list[Character],
+    enemies: list[Character],
+    target_win_rate: float = 0.65,
+    tolerance: float = 0.10,
+    runs: int = 500,
+    hero_first: bool = True,
+    sequential: bool = False,
+    batch_size: int = 50,
+    confidence: float = 0.95,
+    cache=None,
+    table=None,
+) -> dict:
+    """Assess a matchup and return a difficulty verdict.
+
+    Intended for runtime use: the game calls this before presenting an
+    encounter to see if it needs adjustment.
+
+    With *sequential*, battles run in batches of *batch_size* and stop as
+    soon as the Wilson interval at *confidence* lies wholly above, below
+    or inside the ``target ± tolerance`` band.  *runs* becomes the cap.
+    Lopsided fights settle after one or two batches instead of all 500.
+    Without *sequential*, a *cache* (``ResultCache``) turns repeated
+    checks of the same matchup into lookups.
+
+    With a *table* (``difficulty_table.DifficultyTable``) the win rate is
+    interpolated from precomputed cells and no battles run; matchups
+    outside the table's hull fall back to simulation.
+
+    Returns a dict with:
+      - win_rate:   simulated hero win rate (0.0–1.0)
+      - target:     the desired win rate
+      - delta:      win_rate - target (positive = too easy)
+      - verdict:    "easy" | "fair" | "hard"
+      - runs_used:  battles actually simulated
+      - stats:      full monte_carlo() result dict (None from a table)
+      - error:      bound on the interpolated win rate (table only)
+    """
+    answer = table.lookup(heroes, enemies, hero_first) if table else None
+    if answer is not None:
+        stats = None
+        actual = answer["win_rate"]
+    elif sequential:
+        lo_band = target_win_rate - tolerance
+        hi_band = target_win_rate + tolerance
+        run = _battle_runner(heroes, enemies)
+        outcomes = []
+        wins = 0
+        while len(outcomes) < runs:
+            for _ in range(min(batch_size, runs - len(outcomes))):
+                outcome = run(hero_first, random)
+                outcomes.append(outcome)
+                wins += outcome["result"] == "win"
+            ci_lo, ci_hi = wilson_interval(wins, len(outcomes), confidence)
+            if ci_lo > hi_band or ci_hi < lo_band:
+                break
+            if ci_lo >= lo_band and ci_hi <= hi_band:
+                break
+        stats = aggregate_outcomes(outcomes)
+    else:
+        stats = monte_carlo(heroes, enemies, runs, hero_first, cache=cache)
+    if stats is not None:
+        actual = stats["win_rate"]
+    return _difficulty_result(actual, target_win_rate, tolerance, stats, answer)
+
+
+def _difficulty_result(win_rate, target_win_rate, tolerance, stats,
+                       answer=None) -> dict:
+    """The difficulty_check() dict; *answer* is a table lookup, if any."""
+    delta = win_rate - target_win_rate
+    result = {
+        "win_rate": win_rate,
+        "target": target_win_rate,
+        "delta": delta,
+        "verdict": _verdict(delta, tolerance),
+        "runs_used": stats["runs"] if stats else 0,
+        "stats": stats,
+    }
+    if answer is not None:
+        result["error"] = answer["error"]
+    return result
+
+
+def _verdict(delta: float, tolerance: float) -> str:
+    if delta > tolerance:
+        return "easy"
+    if delta < -tolerance:
+        return "hard"
+    return "fair"
+
+
+def iter_difficulty_check(
+    heroes: list[Character],
+    enemies: list[Character],
+    target_win_rate: float = 0.65,
+    tolerance: float = 0.10,
+    runs: int = 500,
+    hero_first: bool = True,
+    batch_size: int = DEFAULT_BATCH,
+    workers: int = 1,
+    table=None,
+):
+    """``difficulty_check()`` as a generator of ``iter_monte_carlo`` updates.
+
+    Each update adds a provisional ``verdict`` for the battles so far; the
+    last update's ``result`` is the difficulty_check() dict.  Meant for
+    the game: run it on a ``background.BackgroundTask`` and poll.
+
+    When a *table* (``difficulty_table.DifficultyTable``) covers the
+    matchup, no battles run: the only update is a finished one with
+    ``done`` 0 and ``ci`` the table's error bound around its win rate.
+    """
+    answer = table.lookup(heroes, enemies, hero_first) if table else None
+    if answer is not None:
+        rate, error = answer["win_rate"], answer["error"]
+        result = _difficulty_result(rate, target_win_rate, tolerance,
+                                    None, answer)
+        yield {
+            "done": 0,
+            "runs": 0,
+            "wins": None,
+            "win_rate": rate,
+            "ci": (max(0.0, rate - error), min(1.0, rate + error)),
+            "ld50": None,
+            "finished": True,
+            "verdict": result["verdict"],
+            "result": result,
+        }
+        return
+    for update in iter_monte_carlo(heroes, enemies, runs, hero_first,
+                                   batch_size=batch_size, workers=workers):
+        update["verdict"] = _verdict(update["win_rate"] - target_win_rate,
+                                     tolerance)
+        if update["finished"]:
+            update["result"] = _difficulty_result(
+                update["win_rate"], target_win_rate, tolerance,
+                update["result"])
+        yield update
+
+
+def _scale_kwargs(scale_stat: str, factor: float) -> dict:
+    """scale_team() keyword arguments that scale *scale_stat* by *factor*."""
+    if scale_stat == "all":
+        return {"hp_scale": factor, "str_scale": factor, "def_scale": factor}
+    if scale_stat in ("hp", "str", "def"):
+        kw = {"hp_scale": 1.0, "str_scale": 1.0, "def_scale": 1.0}
+        kw[f"{scale_stat}_scale"] = factor
+        return kw
+    raise ValueError(f"Unknown scale_stat: {scale_stat!r}")
+
+
+def _probe_stats(heroes, scaled, runs, hero_first, seed):
+    """monte_carlo() stats against an already-scaled team (process-pool entry)."""
+    return monte_carlo(heroes, scaled, runs, hero_first, seed)
+
+
+def _probe_win_rate(heroes, scaled, runs, hero_first, seed, cache=None):
+    """Win rate against an already-scaled enemy team (process-pool entry)."""
+    return monte_carlo(heroes, scaled, runs, hero_first, seed,
+                       cache)["win_rate"]
+
+
+def suggest_scaling(
+    heroes: list[Character],
+    enemies: list[Character],
+    target_win_rate: float = 0.65,
+    runs: int = 500,
+    hero_first: bool = True,
+    max_iterations: int = 12,
+    scale_stat: str = "hp",
+    search: str = "bisect",
+    seed: int | None = None,
+    workers: int = 1,
+    cache=None,
+) -> dict:
+    """Search for an enemy stat multiplier that hits *target_win_rate*.
+
+    *scale_stat* can be ``"hp"``, ``"str"``, ``"def"``, or ``"all"``
+    (scales all three together).
+
+    *search* picks the strategy:
+
+    ``"bisect"`` (default)
+        Always runs all *max_iterations* steps — no early exit.  Monte
+        Carlo noise means a single "close enough" probe can't be trusted,
+        so we let the bounds tighten fully and take the midpoint.
+
+    ``"crn"``
+        Every probe replays the same dice (common random numbers, from
+        *seed*), so probes can be compared directly.  Win rate mostly
+        falls as the scale rises, but not strictly: rounding and shared
+        dice can make a stronger STR or DEF win rate dip then recover.
+        Each step evaluates three interior points of the bracket — across
+        *workers* processes when ``workers > 1`` — and keeps the first
+        quarter whose ends straddle the target, so the bracket always
+        holds a crossing even where the curve is not monotone.
+        Stops once the win rates at the two bracket ends differ by less
+        than one standard error, then interpolates between them.  Probe
+        results are reused rather than re-simulated.
+
+    A *cache* (``ResultCache``) serves probes — and the confirmation run —
+    that an earlier search already simulated.  Process-pool probes
+    bypass it.
+
+    Returns a dict with:
+      - scale:        the recommended multiplier (e.g. 1.35)
+      - win_rate:     achieved win rate at that scale (from a final
+                      confirmation run at 2x the normal sample size)
+      - target:       the requested target
+      - iterations:   search steps actually taken
+      - scaled_enemies: the enemy team at the recommended scale
+    """
+    for update in iter_suggest_scaling(
+        heroes, enemies, target_win_rate, runs, hero_first, max_iterations,
+        scale_stat, search, seed, workers, cache,
+    ):
+        pass
+    return update["result"]
+
+
+def iter_suggest_scaling(
+    heroes: list[Character],
+    enemies: list[Character],
+    target_win_rate: float = 0.65,
+    runs: int = 500,
+    hero_first: bool = True,
+    max_iterations: int = 12,
+    scale_stat: str = "hp",
+    search: str = "bisect",
+    seed: int | None = None,
+    workers: int = 1,
+    cache=None,
+):
+    """``suggest_scaling()`` as a generator of search updates.
+
+    Yields after each search step a dict with ``iteration``, the current
+    bracket ``lo``/``hi`` and ``finished=False``; the last update has
+    ``finished=True`` and ``result``, the suggest_scaling() dict.
+    Closing the generator stops the search (and its worker pool).
+    """
+    _scale_kwargs(scale_stat, 1.0)  # validate early
+    if search not in ("bisect", "crn"):
+        raise ValueError(f"Unknown search: {search!r}")
+    lo, hi = 0.25, 4.0
+
+    if search == "bisect":
+        for iteration in range(1, max_iterations + 1):
+            mid = (lo + hi) / 2.0
+            scaled = scale_team(enemies, **_scale_kwargs(scale_stat, mid))
+            stats = monte_carlo(heroes, scaled, runs, hero_first, cache=cache)
+            rate = stats["win_rate"]
+
+            # Higher scale = stronger enemies = lower hero win rate.
+            if rate > target_win_rate:
+                lo = mid
+            else:
+                hi = mid
+            yield {"iteration": iteration, "lo": lo, "hi": hi,
+                   "finished": False}
+
+        best_scale = (lo + hi) / 2.0
+        iterations = max_iterations
+        confirm_seed = None
+    else:
+        if seed is None:
+            seed = random.randrange(2**32)
+        best_scale, iterations = yield from _crn_search(
+            heroes, enemies, target_win_rate, runs, hero_first,
+            max_iterations, scale_stat, seed, workers, lo, hi, cache,
+        )
+        confirm_seed = seed
+
+    final_enemies = scale_team(enemies, **_scale_kwargs(scale_stat, best_scale))
+
+    # Confirmation run at 2x samples for a stable final win rate.
+    confirm = monte_carlo(heroes, final_enemies, runs * 2, hero_first,
+                          confirm_seed, cache)
+
+    yield {
+        "iteration": iterations,
+        "lo": best_scale,
+        "hi": best_scale,
+        "finished": True,
+        "result": {
+            "scale": round(best_scale, 3),
+            "win_rate": confirm["win_rate"],
+            "target": target_win_rate,
+            "iterations": iterations,
+            "scaled_enemies": final_enemies,
+        },
+    }
+
+
+def _crn_search(heroes, enemies, target, runs, hero_first, max_iterations,
+                scale_stat, seed, workers, lo, hi, cache=None):
+    """Quartering search for suggest_scaling(search="crn").
+
+    Probes are cached by the scaled team's stats, so factors that round to
+    the same enemies share one simulation.  A generator: yields an
+    iter_suggest_scaling() update per step and returns ``(best_scale,
+    iterations)``.
+    """
+    teams: dict[float, tuple] = {}
+    rates: dict[tuple, float] = {}
+    noise = math.sqrt(max(target * (1 - target), 1e-9) / runs)
+    pool = ProcessPoolExecutor(workers) if workers > 1 else None
+
+    def evaluate(factors):
+        todo = {}
+        for f in factors:
+            scaled = scale_team(enemies, **_scale_kwargs(scale_stat, f))
+            key = tuple((c.max_hp, c.strength, c.defense) for c in scaled)
+            teams[f] = key
+            if key not in rates:
+                todo[key] = scaled
+        args = [(heroes, scaled, runs, hero_first, seed)
+                for scaled in todo.values()]
+        if pool and args:
+            results = pool.map(_probe_win_rate, *zip(*args))
+        else:
+            results = [_probe_win_rate(*a, cache) for a in args]
+        rates.update(zip(todo, results))
+
+    def rate(f):
+        return rates[teams[f]]
+
+    try:
+        evaluate([lo, hi])
+        if rate(lo) <= target:
+            return lo, 0
+        if rate(hi) > target:
+            return hi, 0
+
+        iterations = 0
+        while iterations < max_iterations and rate(lo) - rate(hi) > noise:
+            step = (hi - lo) / 4.0
+            probes = [lo + step, lo + 2 * step, lo + 3 * step]
+            evaluate(probes)
+            iterations += 1
+            if all(teams[p] in (teams[lo], teams[hi]) for p in probes):
+                break  # adjacent integer stats — nothing left to resolve
+            points = [lo] + probes + [hi]
+            for left, right in zip(points, points[1:]):
+                if rate(right) <= target:
+                    lo, hi = left, right
+                    break
+            yield {"iteration": iterations, "lo": lo, "hi": hi,
+                   "finished": False}
+    finally:
+        if pool:
+            pool.shutdown()
+
+    span = rate(lo) - rate(hi)
+    if span <= 0:
+        return (lo + hi) / 2.0, iterations
+    return lo + (rate(lo) - target) / span * (hi - lo), iterations
+
+
+# ── Multi-stat optimizer ─────────────────────────────────────────────
+
+def _quadratic_features(x: tuple[float, float, float]) -> list[float]:
+    """1, linear, pairwise and squared terms of a log-scale vector."""
+    a, b, c = x
+    return [1.0, a, b, c, a * b, a * c, b * c, a * a, b * b, c * c]
+
+
+def _fit_weighted(rows, ys, weights, ridge=1e-3):
+    """Weighted ridge least squares → coefficient list (pure Python)."""
+    k = len(rows[0])
+    ata = [[ridge if i == j else 0.0 for j in range(k)] for i in range(k)]
+    aty = [0.0] * k
+    for row, y, w in zip(rows, ys, weights):
+        for i in range(k):
+            wi = w * row[i]
+            aty[i] += wi * y
+            for j in range(k):
+                ata[i][j] += wi * row[j]
+    # Gaussian elimination with partial pivoting.
+    for col in range(k):
+        piv = max(range(col, k), key=lambda r: abs(ata[r][col]))
+        ata[col], ata[piv] = ata[piv], ata[col]
+        aty[col], aty[piv] = aty[piv], aty[col]
+        for r in range(col + 1, k):
+            f = ata[r][col] / ata[col][col]
+            for j in range(col, k):
+                ata[r][j] -= f * ata[col][j]
+            aty[r] -= f * aty[col]
+    coef = [0.0] * k
+    for i in range(k - 1, -1, -1):
+        coef[i] = (aty[i] - sum(ata[i][j] * coef[j]
+                                for j in range(i + 1, k))) / ata[i][i]
+    return coef
+
+
+def _pareto_front(points: list[dict], keys: tuple[str, ...]) -> list[dict]:
+    """Points not dominated on every key (lower is better)."""
+    front = []
+    for p in sorted(points, key=lambda p: tuple(p[k] for k in keys)):
+        if not any(all(q[k] <= p[k] for k in keys) for q in front):
+            front.append(p)
+    return front
+
+
+def optimize_scaling(
+    heroes: list[Character],
+    enemies: list[Character],
+    target_win_rate: float = 0.65,
+    target_ld50: float | None = None,
+    tolerance: float = 0.05,
+    runs: int = 300,
+    hero_first: bool = True,
+    scale_range: tuple[float, float] = (0.5, 2.0),
+    grid_steps: int = 13,
+    seed: int | None = None,
+    workers: int = 1,
+    verify: bool = True,
+) -> dict:
+    """Search (hp, str, def) enemy scale vectors for a target win rate.
+
+    Candidates are a log-spaced ``grid_steps``³ grid over *scale_range*,
+    deduplicated by the integer stats they produce.  1v1 matchups without
+    effects are scored exactly (``grammar_mvp.exact``) — no battles at all.
+    Otherwise a 3×3×3 design of probes is simulated with common random
+    numbers and quadratic surrogates in log-scale space are fitted for
+    win rate (empirical logit) and LD50; every candidate is scored on the
+    surrogates, so battle count does not grow with the grid.  With
+    *verify*, the Pareto points are re-simulated and any whose measured
+    win rate misses the tolerance are dropped.
+
+    The Pareto set keeps candidates within *tolerance* of the target win
+    rate that are not dominated on win-rate error, LD50 error (when
+    *target_ld50* is given) and distance from the unscaled enemies.
+
+    Returns a dict with:
+      - method:            "exact" | "surrogate"
+      - candidates:        distinct candidate teams scored
+      - simulated_battles: battles actually run
+      - pareto:            list of dicts with hp_scale, str_scale,
+                           def_scale, win_rate, ld50, scaled_enemies
+    """
+    lo, hi = math.log(scale_range[0]), math.log(scale_range[1])
+    axis = [lo + (hi - lo) * i / (grid_steps - 1) for i in range(grid_steps)]
+
+    candidates = {}
+    for a in axis:
+        for b in axis:
+            for c in axis:
+                scaled = scale_team(enemies, math.exp(a), math.exp(b),
+                                    math.exp(c))
+                key = tuple((e.max_hp, e.strength, e.defense) for e in scaled)
+                # Keep the factor vector closest to 1.0 for each team.
+                if key not in candidates or (
+                    a * a + b * b + c * c < sum(v * v for v in candidates[key][0])
+                ):
+                    candidates[key] = ((a, b, c), scaled)
+
+    simulated = 0
+    scored = []
+    if exact_applies(heroes, enemies):
+        method = "exact"
+        for x, scaled in candidates.values():
+            duel = exact_duel(heroes[0], scaled[0])
+            scored.append((x, scaled, duel["win_rate"], duel["ld50"]))
+    else:
+        method = "surrogate"
+        if seed is None:
+            seed = random.randrange(2**32)
+        levels = (lo, (lo + hi) / 2, hi)
+        design = [(a, b, c) for a in levels for b in levels for c in levels]
+        probes = [scale_team(enemies, *(math.exp(v) for v in x))
+                  for x in design]
+        args = [(heroes, scaled, runs, hero_first, seed) for scaled in probes]
+        if workers > 1:
+            with ProcessPoolExecutor(workers) as pool:
+                results = list(pool.map(_probe_stats, *zip(*args)))
+        else:
+            results = [_probe_stats(*a) for a in args]
+        simulated += runs * len(design)
+
+        rows = [_quadratic_features(x) for x in design]
+        logits, weights = [], []
+        for stats in results:
+            p = (stats["wins"] + 0.5) / (runs + 1)
+            logits.append(math.log(p / (1 - p)))
+            weights.append(runs * p * (1 - p))
+        win_coef = _fit_weighted(rows, logits, weights)
+        ld_rows = [(r, math.log(s["ld50"]), s["losses"])
+                   for r, s in zip(rows, results) if s["ld50"]]
+        ld_coef = (_fit_weighted(*zip(*ld_rows)) if ld_rows else None)
+
+        for x, scaled in candidates.values():
+            f = _quadratic_features(x)
+            z = sum(w * v for w, v in zip(win_coef, f))
+            rate = 1.0 / (1.0 + math.exp(-max(-50.0, min(50.0, z))))
+            ld50 = (math.exp(sum(w * v for w, v in zip(ld_coef, f)))
+                    if ld_coef else None)
+            scored.append((x, scaled, rate, ld50))
+
+    points = []
+    for x, scaled, rate, ld50 in scored:
+        err = abs(rate - target_win_rate)
+        if err > tolerance:
+            continue
+        ld_err = 0.0
+        if target_ld50 is not None:
+            ld_err = abs(ld50 - target_ld50) if ld50 is not None else math.inf
+        points.append({
+            "hp_scale": round(math.exp(x[0]), 3),
+            "str_scale": round(math.exp(x[1]), 3),
+            "def_scale": round(math.exp(x[2]), 3),
+            "win_rate": rate,
+            "ld50": ld50,
+            "scaled_enemies": scaled,
+            "win_error": err,
+            "ld50_error": ld_err,
+            "distance": math.sqrt(sum(v * v for v in x)),
+        })
+
+    front = _pareto_front(points, ("win_error", "ld50_error", "distance"))
+    if method == "surrogate" and verify:
+        for p in front:
+            stats = monte_carlo(heroes, p["scaled_enemies"], runs, hero_first,
+                                seed)
+            p["predicted_win_rate"] = p["win_rate"]
+            p["win_rate"] = stats["win_rate"]
+            p["ld50"] = stats["ld50"]
+            p["win_error"] = abs(stats["win_rate"] - target_win_rate)
+        simulated += runs * len(front)
+        front = [p for p in front if p["win_error"] <= tolerance]
+    for p in front:
+        del p["win_error"], p["ld50_error"], p["distance"]
+
+    return {
+        "method": method,
+        "target": target_win_rate,
+        "target_ld50": target_ld50,
+        "candidates": len(candidates),
+        "simulated_battles": simulated,
+        "pareto": front,
+    }
+
+
+# ── Output ───────────────────────────────────────────────────────────
+
+def format_table(result: dict, turn_delay: float | None) -> str:
+    """Pretty-print results as a table."""
+    lines = []
+    hdr = f"{result['hero_label']}  vs  {result['enemy_label']}"
+    if result.get("first_strike"):
+        hdr += f"  (first: {result['first_strike']})"
+    lines.append(hdr)
+    lines.append("=" * len(hdr))
+
+    lines.append(f"  Heroes: {result['hero_count']}  (total HP {result['hero_total_hp']})")
+    lines.append(f"  Enemies: {result['enemy_count']}  (total HP {result['enemy_total_hp']})")
+
+    s = result["stats"]
+    lines.append(f"  Runs:  {s['runs']}")
+    lines.append("")
+
+    # LD50 — headline stat
+    ld50 = s["ld50"]
+    if ld50 is not None:
+        ld50_line = f"  LD50 (hero team): turn {ld50:.0f}"
+        if turn_delay:
+            ld50_line += f"  ({ld50 * turn_delay:.0f}s / {ld50 * turn_delay / 60:.1f}min)"
+        lines.append(ld50_line)
+    else:
+        lines.append("  LD50 (hero team): N/A (heroes always win)")
+
+    lines.append("")
+    lines.append(
+        f"  Win rate:  {s['win_rate']:.1%}  "
+        f"({s['wins']}W / {s['losses']}L)"
+    )
+    if "ess" in s:
+        lines.append(
+            f"  Std error: {s['win_rate_se']:.2%}  ({s['method']}, "
+            f"effective n {s['ess']:,.0f} = {s['ess_ratio']:.2f}x runs)"
+        )
+    lines.append(
+        f"  Turns:     avg {s['avg_turns']:.1f}  "
+        f"(range {s['min_turns']}–{s['max_turns']})"
+    )
+    lines.append(
+        f"  Quartiles: p10={s['p10_turns']}  p25={s['p25_turns']}  "
+        f"p50={s['p50_turns']}  p75={s['p75_turns']}  p90={s['p90_turns']}"
+    )
+
+    if turn_delay:
+        avg_secs = s["avg_turns"] * turn_delay
+        fast_secs = s["p10_turns"] * turn_delay
+        slow_secs = s["p90_turns"] * turn_delay
+        lines.append(
+            f"  Duration:  avg {avg_secs:.0f}s ({avg_secs/60:.1f}min)  "
+            f"fast {fast_secs:.0f}s  slow {slow_secs:.0f}s"
+        )
+
+    lines.append(
+        f"  Avg last hero HP on win:   {s['avg_hero_hp_on_win']:.1f}"
+    )
+    lines.append(
+        f"  Avg last enemy HP on loss: {s['avg_enemy_hp_on_loss']:.1f}"
+    )
+    lines.append(
+        f"  Avg heroes fallen:  {s['avg_heroes_fallen']:.1f} / {result['hero_count']}"
+    )
+    lines.append(
+        f"  Avg enemies fallen: {s['avg_enemies_fallen']:.1f} / {result['enemy_count']}"
+    )
+
+    lines.append("")
+    return "\n".join(lines)
+
+
+def format_csv(results: list[dict], turn_delay: float | None) -> str:
+    """Format results as CSV."""
+    buf = io.StringIO()
+    fieldnames = [
+        "heroes", "enemies", "first_strike",
+        "hero_count", "hero_total_hp",
+        "enemy_count", "enemy_total_hp",
+        "runs", "wins", "losses", "win_rate", "ld50",
+        "avg_turns", "min_turns", "max_turns",
+        "p10", "p25", "p50", "p75", "p90",
+        "avg_hero_hp_on_win", "avg_enemy_hp_on_loss",
+        "avg_heroes_fallen", "avg_enemies_fallen",
+    ]
+    if turn_delay:
+        fieldnames.extend(["avg_duration_s", "ld50_s"])
+    writer = csv.DictWriter(buf, fieldnames=fieldnames)
+    writer.writeheader()
+
+    for r in results:
+        s = r["stats"]
+        row = {
+            "heroes": r["hero_label"],
+            "enemies": r["enemy_label"],
+            "first_strike": r.get("first_strike", "hero"),
+            "hero_count": r["hero_count"],
+            "hero_total_hp": r["hero_total_hp"],
+            "enemy_count": r["enemy_count"],
+            "enemy_total_hp": r["enemy_total_hp"],
+            "runs": s["runs"],
+            "wins": s["wins"],
+            "losses": s["losses"],
+            "win_rate": f"{s['win_rate']:.4f}",
+            "ld50": f"{s['ld50']:.0f}" if s["ld50"] is not None else "",
+            "avg_turns": f"{s['avg_turns']:.1f}",
+            "min_turns": s["min_turns"],
+            "max_turns": s["max_turns"],
+            "p10": s["p10_turns"],
+            "p25": s["p25_turns"],
+            "p50": s["p50_turns"],
+            "p75": s["p75_turns"],
+            "p90": s["p90_turns"],
+            "avg_hero_hp_on_win": f"{s['avg_hero_hp_on_win']:.1f}",
+            "avg_enemy_hp_on_loss": f"{s['avg_enemy_hp_on_loss']:.1f}",
+            "avg_heroes_fallen": f"{s['avg_heroes_fallen']:.1f}",
+            "avg_enemies_fallen": f"{s['avg_enemies_fallen']:.1f}",
+        }
+        if turn_delay:
+            row["avg_duration_s"] = f"{s['avg_turns'] * turn_delay:.0f}"
+            row["ld50_s"] = f"{s['ld50'] * turn_delay:.0f}" if s["ld50"] is not None else ""
+        writer.writerow(row)
+
+    return buf.getvalue()
+
+
+def format_potion_table(result: dict) -> str:
+    """Potion value table, biggest win-rate gain first."""
+    base = result["baseline"]
+    base_ld50 = f"{base['ld50']:.0f}" if base["ld50"] is not None else "N/A"
+    lines = [
+        f"Potions cast at turn {result['cast_turn']}  "
+        f"(baseline {base['win_rate']:.1%}, LD50 {base_ld50}, "
+        f"{base['runs']} runs each)",
+        f"  {'Potion':<16} {'Win rate':>9} {'Δ win':>8} {'LD50':>6} {'Δ LD50':>7}",
+    ]
+    for p in sorted(result["potions"], key=lambda p: -p["delta_win_rate"]):
+        ld50 = f"{p['ld50']:.0f}" if p["ld50"] is not None else "N/A"
+        d_ld50 = f"{p['delta_ld50']:+.0f}" if p["delta_ld50"] is not None else ""
+        lines.append(
+            f"  {p['notation']:<16} {p['win_rate']:>9.1%} "
+            f"{p['delta_win_rate']:>+8.1%} {ld50:>6} {d_ld50:>7}"
+        )
+    return "\n".join(lines)
+
+
+# ── CLI ──────────────────────────────────────────────────────────────
+
+def _show_progress(text: str | None):
+    """Rewrite a live status line on stderr (terminals only); None ends it."""
+    if not sys.stderr.isatty():
+        return
+    if text is None:
+        print("\r\033[K", end="", file=sys.stderr, flush=True)
+    else:
+        print(f"\r\033[K  {text}", end="", file=sys.stderr, flush=True)
+
+
+def _run_with_progress(heroes, enemies, runs, hero_first, seed, workers):
+    """monte_carlo() via iter_monte_carlo(), with a live status line."""
+    for update in iter_monte_carlo(heroes, enemies, runs, hero_first, seed,
+                                   workers=workers):
+        lo, hi = update["ci"]
+        ld50 = f"{update['ld50']:.0f}" if update["ld50"] is not None else "N/A"
+        _show_progress(
+            f"{update['done']}/{runs} battles  win {update['win_rate']:.1%} "
+            f"[{lo:.1%}–{hi:.1%}]  LD50 {ld50}"
+        )
+    _show_progress(None)
+    return update["result"]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Monte Carlo battle simulator for PotionWorld",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=(
+            "Character format:  Name:HP/STR/DEF  or  HP/STR/DEF\n"
+            "\n"
+            "All --hero flags form one team; all --enemy flags form the\n"
+            "other.  Each round every living combatant acts once, targeting\n"
+            "the frontline enemy.  Standard RPG party combat.\n"
+            "\n"
+            "Examples:\n"
+            "  %(prog)s --hero 'Paladin:40/7/5' --enemy 'Goblin:25/7/3'\n"
+            "  %(prog)s --hero 30/6/3 --enemy 25/7/3 --turn-delay 5\n"
+            "  %(prog)s --hero 30/6/3 --enemy 25/7/3 --first both\n"
+            "  %(prog)s --hero 30/6/3 --enemy 20/5/2 --enemy 20/5/2 --enemy 20/5/2\n"
+            "  %(prog)s --csv > balance.csv\n"
+        ),
+    )
+    parser.add_argument(
+        "--hero", action="append", dest="heroes", metavar="SPEC",
+        help="Hero spec: 'Name:HP/STR/DEF' or 'HP/STR/DEF' (repeatable — forms a team)",
+    )
+    parser.add_argument(
+        "--enemy", action="append", dest="enemies", metavar="SPEC",
+        help="Enemy spec: 'Name:HP/STR/DEF' or 'HP/STR/DEF' (repeatable — forms a team)",
+    )
+    parser.add_argument(
+        "--runs", type=int, default=1000,
+        help="Simulations per matchup (default: 1000)",
+    )
+    parser.add_argument(
+        "--turn-delay", type=float, default=None, metavar="SECS",
+        help="Seconds per turn — enables duration estimates (LD50 in seconds, etc.)",
+    )
+    parser.add_argument(
+        "--first", choices=["hero", "enemy", "both"], default="hero",
+        help="Who strikes first: hero, enemy, or both (tests each)",
+    )
+    parser.add_argument(
+        "--variance", choices=["plain", "antithetic", "stratified"],
+        default="plain",
+        help="Variance-reduced estimator; reports effective sample size",
+    )
+    parser.add_argument(
+        "--crn", action="store_true",
+        help="With --first both: compare on common random numbers "
+             "(table output only)",
+    )
+    parser.add_argument(
+        "--csv", action="store_true",
+        help="Output as CSV instead of table",
+    )
+    parser.add_argument(
+        "--check", type=float, default=None, metavar="TARGET",
+        help="Difficulty check: target hero win rate 0.0–1.0 (e.g. 0.65)",
+    )
+    parser.add_argument(
+        "--sequential", action="store_true",
+        help="With --check: stop early once the verdict is statistically clear",
+    )
+    parser.add_argument(
+        "--auto-scale", type=float, default=None, metavar="TARGET",
+        help="Find enemy stat multiplier to hit target win rate (e.g. 0.65)",
+    )
+    parser.add_argument(
+        "--scale-stat", choices=["hp", "str", "def", "all"], default="hp",
+        help="Which enemy stat to scale with --auto-scale (default: hp)",
+    )
+    parser.add_argument(
+        "--optimize", type=float, default=None, metavar="TARGET",
+        help="Search (hp, str, def) enemy scale vectors for a target win rate",
+    )
+    parser.add_argument(
+        "--target-ld50", type=float, default=None, metavar="TURNS",
+        help="With --optimize: preferred LD50 (fight length) in turns",
+    )
+    parser.add_argument(
+        "--search", choices=["bisect", "crn"], default="bisect",
+        help="--auto-scale strategy: fixed bisection or common-random-numbers search",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None,
+        help="Base seed; battle i uses seed + i (default: random)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Processes for battles and parallel probes (default: 1)",
+    )
+    parser.add_argument(
+        "--cache", default=None, metavar="PATH",
+        help="SQLite result store: reuse and extend earlier simulations",
+    )
+    parser.add_argument(
+        "--potion", action="append", dest="potions", metavar="ESENS",
+        help="Report the win-rate / LD50 impact of casting this potion (repeatable)",
+    )
+    parser.add_argument(
+        "--cast-turn", type=int, default=0, metavar="N",
+        help="With --potion: round at which the potion is cast (default: 0)",
+    )
+    args = parser.parse_args()
+    if args.crn and args.csv:
+        parser.error("--crn prints a paired summary; it cannot be combined with --csv")
+
+    # Defaults
+    heroes = []
+    if args.heroes:
+        for i, spec in enumerate(args.heroes):
+            heroes.append(parse_character(spec, f"Hero{i+1}"))
+    else:
+        heroes.append(Character("Sir Aldric", 30, 30, 6, 3))
+
+    enemies = []
+    if args.enemies:
+        for i, spec in enumerate(args.enemies):
+            enemies.append(parse_character(spec, f"Enemy{i+1}"))
+    else:
+        enemies.append(Character("Goblin", 25, 25, 7, 3))
+
+    hero_first = args.first != "enemy"
+    cache = None
+    if args.cache:
+        from grammar_mvp.result_cache import ResultCache  # imports this module
+        cache = ResultCache(args.cache)
+
+    # ── Difficulty check mode ──
+    if args.check is not None:
+        result = difficulty_check(
+            heroes, enemies,
+            target_win_rate=args.check,
+            runs=args.runs,
+            hero_first=hero_first,
+            sequential=args.sequential,
+            cache=cache,
+        )
+        print(f"{_char_label(heroes)}  vs  {_char_label(enemies)}")
+        print(f"  Target win rate: {result['target']:.0%}")
+        print(f"  Actual win rate: {result['win_rate']:.1%}")
+        print(f"  Delta:           {result['delta']:+.1%}")
+        print(f"  Verdict:         {result['verdict'].upper()}")
+        print(f"  Runs used:       {result['runs_used']}")
+        return
+
+    # ── Auto-scale mode ──
+    if args.auto_scale is not None:
+        for update in iter_suggest_scaling(
+            heroes, enemies,
+            target_win_rate=args.auto_scale,
+            runs=args.runs,
+            hero_first=hero_first,
+            scale_stat=args.scale_stat,
+            search=args.search,
+            seed=args.seed,
+            workers=args.workers,
+            cache=cache,
+        ):
+            _show_progress(f"step {update['iteration']}: scale in "
+                           f"[{update['lo']:.3f}, {update['hi']:.3f}]")
+        _show_progress(None)
+        result = update["result"]
+        scaled = result["scaled_enemies"]
+        print(f"{_char_label(heroes)}  vs  {_char_label(enemies)}")
+        print(f"  Target:    {result['target']:.0%} hero win rate")
+        print(f"  Achieved:  {result['win_rate']:.1%} ({result['iterations']} iterations)")
+        print(f"  Scale:     {result['scale']:.3f}x ({args.scale_stat})")
+        print(f"  Scaled enemies: {_char_label(scaled)}")
+        for c in scaled:
+            print(f"    {c.name}: {c.max_hp}/{c.strength}/{c.defense}")
+        return
+
+    # ── Multi-stat optimizer mode ──
+    if args.optimize is not None:
+        result = optimize_scaling(
+            heroes, enemies,
+            target_win_rate=args.optimize,
+            target_ld50=args.target_ld50,
+            hero_first=hero_first,
+            seed=args.seed,
+            workers=args.workers,
+        )
+        print(f"{_char_label(heroes)}  vs  {_char_label(enemies)}")
+        print(f"  Target:     {result['target']:.0%} hero win rate")
+        print(f"  Method:     {result['method']} "
+              f"({result['candidates']} candidates, "
+              f"{result['simulated_battles']} battles)")
+        print(f"  Pareto set: {len(result['pareto'])} scale vectors")
+        for p in result["pareto"]:
+            ld50 = f"{p['ld50']:.0f}" if p["ld50"] is not None else "N/A"
+            print(f"    hp x{p['hp_scale']:.2f}  str x{p['str_scale']:.2f}  "
+                  f"def x{p['def_scale']:.2f}  →  {p['win_rate']:.1%}  "
+                  f"LD50 {ld50}  {_char_label(p['scaled_enemies'])}")
+        return
+
+    # ── Potion value mode ──
+    if args.potions:
+        result = potion_values(
+            heroes, enemies, args.potions,
+            runs=args.runs,
+            cast_turn=args.cast_turn,
+            hero_first=hero_first,
+            seed=args.seed,
+            workers=args.workers,
+        )
+        print(f"{_char_label(heroes)}  vs  {_char_label(enemies)}")
+        print(format_potion_table(result))
+        return
+
+    # ── Standard simulation ──
+    first_options = (
+        [("hero", True), ("enemy", False)]
+        if args.first == "both"
+        else [("hero", True)] if args.first == "hero"
+        else [("enemy", False)]
+    )
+
+    hero_label = _char_label(heroes)
+    enemy_label = _char_label(enemies)
+
+    from grammar_mvp.variance import compare, estimate  # imports this module
+
+    base_seed = args.seed if args.seed is not None else random.randrange(2**32)
+    all_results = []
+    for label, hero_first_val in first_options:
+        if args.variance != "plain":
+            stats = estimate(heroes, enemies, args.runs, hero_first_val,
+                             base_seed, args.variance)
+        elif cache is not None:
+            stats = monte_carlo(heroes, enemies, args.runs, hero_first_val,
+                                args.seed, cache)
+        else:
+            stats = _run_with_progress(heroes, enemies, args.runs,
+                                       hero_first_val, args.seed, args.workers)
+        all_results.append({
+            "hero_label": hero_label,
+            "enemy_label": enemy_label,
+            "hero_count": len(heroes),
+            "enemy_count": len(enemies),
+            "hero_total_hp": _team_total_hp(heroes),
+            "enemy_total_hp": _team_total_hp(enemies),
+            "first_strike": label if args.first == "both" else None,
+            "stats": stats,
+        })
+
+    # Output
+    if args.csv:
+        print(format_csv(all_results, args.turn_delay), end="")
+    else:
+        for r in all_results:
+            print(format_table(r, args.turn_delay))
+        if args.crn and args.first == "both":
+            paired = compare((heroes, enemies, True), (heroes, enemies, False),
+                             args.runs, base_seed)
+            lo, hi = paired["delta_ci"]
+            print("First-strike effect (hero - enemy first, common random numbers):")
+            print(f"  Delta: {paired['delta']:+.2%}  (95% CI {lo:+.2%} to {hi:+.2%})")
+            if math.isinf(paired["ess"]):
+                print("  Identical on every paired battle: no sampling noise")
+            else:
+                print(f"  Effective n: {paired['ess']:,.0f}  "
+                      f"({paired['ess_ratio']:.1f}x independent runs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""Encounter pre-validation — ladder difficulty against the player's deck.
+
+Each battle of the ladder (``encounters.ENCOUNTERS``) is meant to be
+winnable with the right potion, so its difficulty depends on the deck
+the player brings.  ``validate_encounter`` plays the encounter headless
+(``simulator.play_seeds``) with a policy standing in for the player and
+returns a difficulty verdict, alongside the no-potion baseline.
+
+Checking the ladder inline would stall the UI, so ``Prevalidator`` runs
+the checks on a ``background.BackgroundTask`` — at launch, and again
+whenever ``deck_changed()`` reports a different deck — and files each
+result in a ``ValidationCache`` keyed by encounter and deck checksum.
+BattleView reads that cache with ``get()``, which never waits on the
+worker: an encounter not validated yet simply has no entry.
+
+The engine plays one enemy at a time, so encounters against a group
+(battle 6) fall back to a stat-only ``monte_carlo`` check without
+potions (``method="stats"``).
+"""
+
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+
+from grammar_mvp.background import BackgroundTask
+from grammar_mvp.deck import load_cards, load_starter_deck
+from grammar_mvp.encounters import ENCOUNTERS
+from grammar_mvp.exact import exact_applies, exact_duel
+from grammar_mvp.monte_carlo import monte_carlo, wilson_interval
+from grammar_mvp.replay import deck_crc
+from grammar_mvp.simulator import game_stats, get_policy, play_seeds
+
+DEFAULT_GAMES = 200
+DEFAULT_POLICY = "greedy"
+DEFAULT_BATCH = 20      # games between cancellation checks
+
+
+def _baseline(encounter, games, seed) -> float:
+    """Hero win rate with no potions at all."""
+    heroes, enemies = encounter.teams()
+    if exact_applies(heroes, enemies):
+        return exact_duel(heroes[0], enemies[0])["win_rate"]
+    return monte_carlo(heroes, enemies, games, seed=seed)["win_rate"]
+
+
+def _deck_games(encounter, deck, games, seed, policy, workers, batch_size):
+    """Play *games* full games in batches; yield the games played so far.
+
+    The final item is the ``simulator.game_stats`` of every game.  Between
+    batches the generator can be closed, which is how a cancelled
+    ``BackgroundTask`` stops mid-encounter.
+    """
+    run = partial(play_seeds, policy, hero=tuple(encounter.hero),
+                  enemy=tuple(encounter.enemy), starter=deck)
+    outcomes = []
+    with ExitStack() as stack:
+        pool = (stack.enter_context(ProcessPoolExecutor(workers))
+                if workers > 1 else None)
+        for start in range(seed, seed + games, batch_size):
+            seeds = range(start, min(start + batch_size, seed + games))
+            if pool is None:
+                outcomes.extend(run(seeds))
+            else:
+                chunks = [seeds[i::workers] for i in range(workers)]
+                outcomes.extend(o for chunk in pool.map(run, chunks)
+                                for o in chunk)
+            yield len(outcomes)
+    yield game_stats(outcomes)
+
+
+def iter_validate_encounter(
+    encounter,
+    deck: list[dict],
+    games: int = DEFAULT_GAMES,
+    seed: int = 0,
+    policy: str = DEFAULT_POLICY,
+    target_win_rate: float = 0.65,
+    tolerance: float = 0.10,
+    workers: int = 1,
+    batch_size: int = DEFAULT_BATCH,
+):
+    """``validate_encounter`` as a generator, one update per batch.
+
+    Yields ``{"games_done", "result"}``; ``result`` is None until the
+    last update.
+    """
+    get_policy(policy)  # validate early
+    if encounter.enemy_count == 1:
+        for step in _deck_games(encounter, deck, games, seed, policy,
+                                workers, batch_size):
+            if isinstance(step, dict):
+                stats = step
+            else:
+                yield {"games_done": step, "result": None}
+        method = "deck"
+    else:
+        stats = monte_carlo(*encounter.teams(), games, seed=seed)
+        method = "stats"
+    delta = stats["win_rate"] - target_win_rate
+    if delta > tolerance:
+        verdict = "easy"
+    elif delta < -tolerance:
+        verdict = "hard"
+    else:
+        verdict = "fair"
+    yield {"games_done": stats["runs"], "result": {
+        "number": encounter.number,
+        "title": encounter.title,
+        "deck_crc": deck_crc(deck, ordered=False),
+        "method": method,
+        "policy": policy if method == "deck" else None,
+        "games": stats["runs"],
+        "win_rate": stats["win_rate"],
+        "ci": wilson_interval(stats["wins"], stats["runs"]),
+        "baseline": _baseline(encounter, games, seed),
+        "verdict": verdict,
+    }}
+
+
+def validate_encounter(encounter, deck: list[dict], **options) -> dict:
+    """Check one encounter against *deck*.
+
+    *options* are ``iter_validate_encounter``'s (games, seed, policy,
+    target_win_rate, tolerance, workers, batch_size).  Returns a dict with:
+      - number, title:  the encounter
+      - deck_crc:       ``replay.deck_crc`` of *deck* (order-insensitive)
+      - method:         "deck" (full games) or "stats" (stat-only)
+      - win_rate, ci:   hero win rate and its 95% Wilson interval
+      - baseline:       win rate without potions
+      - verdict:        "easy" | "fair" | "hard" against the target band
+    """
+    for update in iter_validate_encounter(encounter, deck, **options):
+        pass
+    return update["result"]
+
+
+class ValidationCache:
+    """Thread-safe store of validation results by ``(encounter, deck_crc)``.
+
+    The lock only guards dict access, so readers never wait on a running
+    validation.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results: dict[tuple[int, int], dict] = {}
+
+    def get(self, number: int, crc: int) -> dict | None:
+        with self._lock:
+            return self._results.get((number, crc))
+
+    def put(self, result: dict):
+        with self._lock:
+            self._results[result["number"], result["deck_crc"]] = result
+
+    def __len__(self):
+        with self._lock:
+            return len(self._results)
+
+
+def iter_validation(encounters, deck, cache: ValidationCache, **options):
+    """Validate *encounters* in order, skipping ones already in *cache*.
+
+    A generator for ``BackgroundTask``: yields ``{"done", "total",
+    "result", "finished"}`` after every batch of games, so a cancel
+    lands within one batch.  ``result`` is set on the update that
+    finishes an encounter, and None otherwise (including cached ones).
+    *options* go to ``iter_validate_encounter``.
+    """
+    crc = deck_crc(deck, ordered=False)
+    total = len(encounters)
+    for done, encounter in enumerate(encounters, 1):
+        if cache.get(encounter.number, crc) is not None:
+            yield {"done": done, "total": total, "result": None,
+                   "finished": done == total}
+            continue
+        for update in iter_validate_encounter(encounter, deck, **options):
+            result = update["result"]
+            if result is not None:
+                cache.put(result)
+            yield {"done": done - (result is None), "total": total,
+                   "result": result,
+                   "finished": result is not None and done == total}
+
+
+class Prevalidator:
+    """Background validation of the ladder for the player's current deck.
+
+    *options* are ``iter_validate_encounter`` keywords (games, policy,
+    seed, target_win_rate, tolerance, workers, batch_size).  The worker
+    checks for cancellation after every batch of games, so a restart
+    never leaves an old validation running for long.  ``workers > 1``
+    moves the games into processes so the frame loop keeps the
+    interpreter.
+    """
+
+    def __init__(self, card_db=None, encounters=ENCOUNTERS,
+                 cache: ValidationCache | None = None, **options):
+        self.card_db = card_db if card_db is not None else load_cards()
+        self.encounters = tuple(encounters)
+        self.cache = cache if cache is not None else ValidationCache()
+        self.options = options
+        self.deck: list[dict] | None = None
+        self.crc: int | None = None
+        self.task: BackgroundTask | None = None
+
+    def start(self, deck=None, first: int = 1):
+        """(Re)start validation of encounters from number *first* on.
+
+        *deck* defaults to the cards.toml starter deck.  A running
+        validation is cancelled first (it stops after its current batch);
+        its finished encounters stay cached.
+        """
+        if deck is None:
+            deck = load_starter_deck(self.card_db)
+        self.stop()
+        self.deck = [dict(card) for card in deck]
+        self.crc = deck_crc(self.deck, ordered=False)
+        upcoming = [e for e in self.encounters if e.number >= first]
+        self.task = BackgroundTask(
+            iter_validation(upcoming, self.deck, self.cache, **self.options))
+        return self.task
+
+    def deck_changed(self, deck, first: int = 1):
+        """Revalidate if *deck* differs from the one last validated."""
+        if deck_crc(deck, ordered=False) != self.crc:
+            self.start(deck, first)
+
+    def get(self, number: int) -> dict | None:
+        """Result for encounter *number* with the current deck, if ready."""
+        if self.crc is None:
+            return None
+        return self.cache.get(number, self.crc)
+
+    @property
+    def busy(self) -> bool:
+        return self.task is not None and not self.task.finished
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until the current validation finishes (tests, tools)."""
+        return self.task is None or self.task.wait(timeout)
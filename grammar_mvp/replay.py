@@ -0,0 +1,176 @@
+"""Compact binary replays — a seed plus the player's inputs.
+
+A session is fully determined by BattleEngine's seed, the fighters, the
+starter deck and the inputs the player made (with the turn each one
+happened on), so that is all a replay stores:
+
+    header   b"PWR1"  version u8  seed u64  deck crc32 u32
+             hero, enemy:  name (u8 length + UTF-8)  hp max_hp str def (u16)
+    inputs   count u32, then per input:  kind u8  turn u16  arg u8
+    footer   final turn u16  outcome u8 (0 running, 1 win, 2 lose)
+
+Four bytes per input; a typical battle is well under 200 bytes.
+``replay()`` re-runs the session headless at full speed and checks the
+footer, so a change to the rules or the cards shows up as a
+ReplayDesyncError instead of a silently different game.
+"""
+
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+
+from grammar_mvp.deck import load_cards, load_starter_deck
+from grammar_mvp.engine import INPUTS, BattleEngine
+
+MAGIC = b"PWR1"
+VERSION = 2                 # 2: deck checksum is order-sensitive
+
+_HEADER = struct.Struct("<4sBQI")
+_FIGHTER = struct.Struct("<4H")
+_COUNT = struct.Struct("<I")
+_INPUT = struct.Struct("<BHB")
+_FOOTER = struct.Struct("<HB")
+
+OUTCOMES = (None, "win", "lose")
+
+
+class ReplayError(ValueError):
+    """Raised for a file that is not a replay this version can read."""
+
+
+class ReplayDesyncError(ReplayError):
+    """Raised when a replay does not reproduce its recorded ending."""
+
+
+@dataclass
+class Replay:
+    seed: int
+    hero: tuple
+    enemy: tuple
+    deck_crc: int
+    inputs: list = field(default_factory=list)   # (kind, turn, arg)
+    final_turn: int = 0
+    outcome: str | None = None
+
+
+def deck_crc(cards: list[dict], ordered: bool = True) -> int:
+    """Checksum of a starter deck's card ids.
+
+    The engine shuffles the deck in list order, so by default the order
+    counts; ``ordered=False`` checksums just the contents.
+    """
+    ids = [card.get("id", "") for card in cards]
+    if not ordered:
+        ids.sort()
+    return zlib.crc32("\n".join(ids).encode())
+
+
+def record(engine: BattleEngine) -> Replay:
+    """A Replay of *engine*'s session so far."""
+    hero, enemy = engine.fighters
+    return Replay(
+        seed=engine.seed,
+        hero=hero,
+        enemy=enemy,
+        deck_crc=deck_crc(engine.starter),
+        inputs=list(engine.inputs),
+        final_turn=engine.state.turn,
+        outcome=engine.result,
+    )
+
+
+def encode(rep: Replay) -> bytes:
+    parts = [_HEADER.pack(MAGIC, VERSION, rep.seed, rep.deck_crc)]
+    for name, *stats in (rep.hero, rep.enemy):
+        raw = name.encode()
+        if len(raw) > 255:
+            raise ReplayError(f"Fighter name too long for a replay: {name[:20]!r}...")
+        parts.append(bytes([len(raw)]) + raw + _FIGHTER.pack(*stats))
+    parts.append(_COUNT.pack(len(rep.inputs)))
+    parts.extend(_INPUT.pack(INPUTS.index(kind), turn, arg)
+                 for kind, turn, arg in rep.inputs)
+    parts.append(_FOOTER.pack(rep.final_turn, OUTCOMES.index(rep.outcome)))
+    return b"".join(parts)
+
+
+def decode(data: bytes) -> Replay:
+    try:
+        magic, version, seed, crc = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ReplayError(f"Not a version {VERSION} replay")
+        pos = _HEADER.size
+        fighters = []
+        for _ in range(2):
+            size = data[pos]
+            name = data[pos + 1:pos + 1 + size].decode()
+            pos += 1 + size
+            fighters.append((name, *_FIGHTER.unpack_from(data, pos)))
+            pos += _FIGHTER.size
+        (count,) = _COUNT.unpack_from(data, pos)
+        pos += _COUNT.size
+        inputs = []
+        for kind, turn, arg in _INPUT.iter_unpack(
+                data[pos:pos + count * _INPUT.size]):
+            inputs.append((INPUTS[kind], turn, arg))
+        pos += count * _INPUT.size
+        final_turn, outcome = _FOOTER.unpack_from(data, pos)
+        if len(inputs) != count or pos + _FOOTER.size != len(data):
+            raise ReplayError("Replay is truncated or has trailing bytes")
+        return Replay(seed, *fighters, crc, inputs, final_turn, OUTCOMES[outcome])
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ReplayError(f"Corrupt replay: {e}") from e
+
+
+def save(rep: Replay, path):
+    Path(path).write_bytes(encode(rep))
+
+
+def load(path) -> Replay:
+    return decode(Path(path).read_bytes())
+
+
+def replay(rep: Replay, card_db=None, starter=None) -> BattleEngine:
+    """Re-run *rep* headless.  Returns the engine at the recorded end.
+
+    Raises ReplayDesyncError if the deck differs from the recorded one or
+    the session does not end on the recorded turn with the recorded outcome.
+    """
+    engine = BattleEngine(rep.seed, card_db, starter, rep.hero, rep.enemy)
+    if deck_crc(engine.starter) != rep.deck_crc:
+        raise ReplayDesyncError("Starter deck differs from the recorded one")
+    for kind, turn, arg in rep.inputs:
+        engine.run_to(turn)
+        if engine.state.turn != turn:
+            raise ReplayDesyncError(f"Battle ended before turn {turn}")
+        engine.apply_input(kind, arg)
+    engine.run_to(rep.final_turn)
+    state = engine.state
+    if state.turn != rep.final_turn or engine.result != rep.outcome:
+        raise ReplayDesyncError(
+            f"Replay ended on turn {state.turn} ({engine.result}), "
+            f"recorded turn {rep.final_turn} ({rep.outcome})"
+        )
+    return engine
+
+
+def _replay_outcome(data: bytes, card_db, starter) -> tuple[int, str | None]:
+    engine = replay(decode(data), card_db, starter)
+    return engine.state.turn, engine.result
+
+
+def replay_many(blobs: list[bytes], workers: int = 1) -> list[tuple]:
+    """Replay encoded sessions; ``(final turn, outcome)`` for each.
+
+    The card data is parsed once and shared by every replay.  Spread over
+    *workers* processes when ``workers > 1``.
+    """
+    card_db = load_cards()
+    run = partial(_replay_outcome, card_db=card_db,
+                  starter=load_starter_deck(card_db))
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            return list(pool.map(run, blobs, chunksize=16))
+    return [run(data) for data in blobs]
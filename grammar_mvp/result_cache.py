@@ -0,0 +1,370 @@
+"""Persistent matchup results — a SQLite store of simulated battles.
+
+Every ``monte_carlo`` call on the same teams re-simulates from scratch.
+A ResultCache keeps, per matchup, the sufficient statistics of every
+battle simulated so far (win count, sums, and turn histograms), so:
+
+- a request for *runs* battles that the store already covers is a
+  lookup, not a simulation;
+- a request for more battles only simulates the shortfall and merges it
+  in — 1000 earlier battles plus 4000 new ones answer a 5000-run query.
+
+Seeded battles are stored as *blocks*: the totals of battles ``start``
+to ``start + runs - 1`` (battle ``i`` always uses seed ``seed + i``).  A
+seeded request is answered for exactly its own seeds, tiled from stored
+blocks with the gaps simulated and stored as new blocks, so the answer
+never depends on what the store happened to hold.  Unseeded battles are
+interchangeable and pool in one row per matchup (seed NULL).
+
+Matchups are keyed by a canonical team signature (each fighter's
+``hp/max_hp/str/def``, in frontline order — names don't matter),
+hero_first, the seed and ``ENGINE_VERSION``; bump the version whenever
+combat rules change.  The lead fighters' stats and the team sizes are
+indexed columns, so balance questions like "every cached fight against
+an enemy with 20–30 HP" are range queries.
+"""
+
+import json
+import sqlite3
+import statistics
+from collections import Counter
+
+from grammar_mvp.game_state import Character
+from grammar_mvp.monte_carlo import aggregate_outcomes, simulate_outcomes
+
+ENGINE_VERSION = 1
+
+# Bumped when the table layout changes; older stores are rebuilt
+SCHEMA_VERSION = 2
+
+# Indexed per-matchup columns usable in query()
+STAT_COLUMNS = (
+    "hero_hp", "hero_str", "hero_def", "hero_count",
+    "enemy_hp", "enemy_str", "enemy_def", "enemy_count",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS matchups (
+    id INTEGER PRIMARY KEY,
+    heroes TEXT NOT NULL,
+    enemies TEXT NOT NULL,
+    hero_first INTEGER NOT NULL,
+    seed INTEGER,               -- first seed of the block; NULL = unseeded
+    version INTEGER NOT NULL,
+    hero_hp INTEGER, hero_str INTEGER, hero_def INTEGER, hero_count INTEGER,
+    enemy_hp INTEGER, enemy_str INTEGER, enemy_def INTEGER, enemy_count INTEGER,
+    runs INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    win_hp_sum INTEGER NOT NULL,
+    loss_hp_sum INTEGER NOT NULL,
+    heroes_fallen_sum INTEGER NOT NULL,
+    enemies_fallen_sum INTEGER NOT NULL,
+    turns TEXT NOT NULL,        -- JSON {turn: battles}
+    death_turns TEXT NOT NULL,  -- JSON {turn: lost battles}
+    UNIQUE (heroes, enemies, hero_first, seed, runs, version)
+);
+""" + "".join(
+    f"CREATE INDEX IF NOT EXISTS idx_{c} ON matchups ({c});\n"
+    for c in STAT_COLUMNS
+)
+
+
+def team_signature(team: list[Character]) -> str:
+    return ",".join(f"{c.hp}/{c.max_hp}/{c.strength}/{c.defense}" for c in team)
+
+
+def _histogram(text: str) -> Counter:
+    return Counter({int(t): n for t, n in json.loads(text).items()})
+
+
+def _dump(hist: Counter) -> str:
+    return json.dumps({str(t): n for t, n in sorted(hist.items())})
+
+
+def _sorted_median(hist: Counter) -> float | None:
+    """statistics.median of the multiset *hist* without expanding it."""
+    n = sum(hist.values())
+    if not n:
+        return None
+    wanted = sorted({(n - 1) // 2, n // 2})
+    values, seen = [], 0
+    for t in sorted(hist):
+        seen += hist[t]
+        while wanted and wanted[0] < seen:
+            values.append(t)
+            wanted.pop(0)
+    return statistics.mean(values) if len(values) > 1 else values[0]
+
+
+def stats_from_row(row) -> dict:
+    """Rebuild a ``monte_carlo()`` stats dict from a stored row."""
+    runs, wins = row["runs"], row["wins"]
+    losses = runs - wins
+    turns = _histogram(row["turns"])
+    deaths = _histogram(row["death_turns"])
+    ordered = sorted(turns)
+
+    def percentile(p):
+        idx = min(int(runs * p / 100), runs - 1)
+        seen = 0
+        for t in ordered:
+            seen += turns[t]
+            if seen > idx:
+                return t
+
+    return {
+        "runs": runs,
+        "wins": wins,
+        "losses": losses,
+        "win_rate": wins / runs,
+        "ld50": _sorted_median(deaths),
+        "avg_turns": sum(t * n for t, n in turns.items()) / runs,
+        "min_turns": ordered[0],
+        "max_turns": ordered[-1],
+        "p10_turns": percentile(10),
+        "p25_turns": percentile(25),
+        "p50_turns": percentile(50),
+        "p75_turns": percentile(75),
+        "p90_turns": percentile(90),
+        "avg_hero_hp_on_win": row["win_hp_sum"] / wins if wins else 0,
+        "avg_enemy_hp_on_loss": row["loss_hp_sum"] / losses if losses else 0,
+        "avg_heroes_fallen": row["heroes_fallen_sum"] / runs,
+        "avg_enemies_fallen": row["enemies_fallen_sum"] / runs,
+    }
+
+
+_SUMS = ("runs", "wins", "win_hp_sum", "loss_hp_sum",
+         "heroes_fallen_sum", "enemies_fallen_sum")
+
+
+def _merge(rows) -> dict:
+    """One row-like dict holding the combined totals of *rows*."""
+    merged = {name: sum(row[name] for row in rows) for name in _SUMS}
+    for name in ("turns", "death_turns"):
+        merged[name] = _dump(sum((_histogram(row[name]) for row in rows),
+                                 Counter()))
+    return merged
+
+
+class ResultCache:
+    """SQLite-backed matchup results.  ``path=":memory:"`` for a scratch store."""
+
+    def __init__(self, path=":memory:"):
+        self.db = sqlite3.connect(str(path))
+        self.db.row_factory = sqlite3.Row
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self.db.execute("DROP TABLE IF EXISTS matchups")
+            self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.db.executescript(_SCHEMA)
+        self.hits = 0
+        self.simulated = 0
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def cacheable(heroes, enemies) -> bool:
+        """Fighters carrying effects have no stable signature."""
+        return not any(c.active_effects or c.modifiers
+                       for c in (*heroes, *enemies))
+
+    @staticmethod
+    def _matchup(heroes, enemies, hero_first):
+        return (team_signature(heroes), team_signature(enemies),
+                int(hero_first), ENGINE_VERSION)
+
+    _WHERE = "heroes=? AND enemies=? AND hero_first=? AND version=?"
+
+    def _unseeded(self, matchup):
+        return self.db.execute(
+            f"SELECT * FROM matchups WHERE {self._WHERE} AND seed IS NULL",
+            matchup,
+        ).fetchone()
+
+    def _block(self, matchup, start, limit=None):
+        """The longest stored block starting at *start*, at most *limit* runs."""
+        sql = f"SELECT * FROM matchups WHERE {self._WHERE} AND seed=?"
+        params = [*matchup, start]
+        if limit is not None:
+            sql += " AND runs<=?"
+            params.append(limit)
+        return self.db.execute(sql + " ORDER BY runs DESC LIMIT 1",
+                               params).fetchone()
+
+    def _next_start(self, matchup, after, end):
+        """First block start in ``(after, end)``, else *end*."""
+        row = self.db.execute(
+            f"SELECT MIN(seed) FROM matchups WHERE {self._WHERE} "
+            "AND seed>? AND seed<?", (*matchup, after, end),
+        ).fetchone()
+        return end if row[0] is None else row[0]
+
+    def _tile(self, matchup, seed, runs=None):
+        """Stored blocks covering seeds from *seed* on, end to end.
+
+        Stops at *runs* battles or at the first seed not stored.
+        """
+        blocks, cursor = [], seed
+        while runs is None or cursor < seed + runs:
+            limit = None if runs is None else seed + runs - cursor
+            row = self._block(matchup, cursor, limit)
+            if row is None:
+                break
+            blocks.append(row)
+            cursor += row["runs"]
+        return blocks, cursor
+
+    def lookup(self, heroes, enemies, hero_first=True, seed=None,
+               runs=None) -> dict | None:
+        """Stored stats for the matchup, or None.
+
+        Seeded: battles ``seed`` to ``seed + runs - 1``, None unless all
+        are stored (``runs=None``: as many consecutive seeds as stored).
+        Unseeded: every stored battle.
+        """
+        matchup = self._matchup(heroes, enemies, hero_first)
+        if seed is None:
+            row = self._unseeded(matchup)
+            return stats_from_row(row) if row else None
+        blocks, cursor = self._tile(matchup, seed, runs)
+        if not blocks or (runs is not None and cursor < seed + runs):
+            return None
+        return stats_from_row(_merge(blocks))
+
+    def add(self, heroes, enemies, hero_first, seed, outcomes: list[dict]):
+        """Store run_battle() *outcomes*.
+
+        Seeded outcomes (battle ``i`` played with seed ``seed + i``) are
+        one new block; unseeded ones merge into the matchup's totals.
+        """
+        if not outcomes:
+            return
+        matchup = self._matchup(heroes, enemies, hero_first)
+        wins = [o for o in outcomes if o["result"] == "win"]
+        losses = [o for o in outcomes if o["result"] != "win"]
+        fresh = {
+            "runs": len(outcomes),
+            "wins": len(wins),
+            "win_hp_sum": sum(o["last_hero_hp"] for o in wins),
+            "loss_hp_sum": sum(o["last_enemy_hp"] for o in losses),
+            "heroes_fallen_sum": sum(o["heroes_fallen"] for o in outcomes),
+            "enemies_fallen_sum": sum(o["enemies_fallen"] for o in outcomes),
+        }
+        turns = Counter(o["turns"] for o in outcomes)
+        deaths = Counter(o["turns"] for o in losses)
+        with self.db:
+            row = self._unseeded(matchup) if seed is None else None
+            if row:
+                for name in fresh:
+                    fresh[name] += row[name]
+                turns += _histogram(row["turns"])
+                deaths += _histogram(row["death_turns"])
+                self.db.execute(
+                    "UPDATE matchups SET runs=?, wins=?, win_hp_sum=?, "
+                    "loss_hp_sum=?, heroes_fallen_sum=?, enemies_fallen_sum=?, "
+                    "turns=?, death_turns=? WHERE id=?",
+                    (*fresh.values(), _dump(turns), _dump(deaths), row["id"]),
+                )
+            else:
+                # An identical seeded block is already stored: same battles
+                lead_h, lead_e = heroes[0], enemies[0]
+                self.db.execute(
+                    "INSERT OR IGNORE INTO matchups (heroes, enemies, "
+                    "hero_first, version, seed, hero_hp, hero_str, hero_def, "
+                    "hero_count, enemy_hp, enemy_str, enemy_def, enemy_count, "
+                    "runs, wins, win_hp_sum, loss_hp_sum, heroes_fallen_sum, "
+                    "enemies_fallen_sum, turns, death_turns) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, "
+                    "?, ?, ?, ?, ?, ?, ?, ?)",
+                    (*matchup, seed,
+                     lead_h.hp, lead_h.strength, lead_h.defense, len(heroes),
+                     lead_e.hp, lead_e.strength, lead_e.defense, len(enemies),
+                     *fresh.values(), _dump(turns), _dump(deaths)),
+                )
+
+    def monte_carlo(self, heroes, enemies, runs, hero_first=True,
+                    seed=None) -> dict:
+        """``monte_carlo()`` backed by the store.
+
+        Simulates only the battles the store is missing.  A seeded
+        result covers exactly seeds ``seed`` to ``seed + runs - 1``, the
+        same as an uncached call; an unseeded one covers at least *runs*
+        battles — all that are stored.
+        """
+        if not self.cacheable(heroes, enemies):
+            return self._simulate(heroes, enemies, runs, hero_first, seed)
+        if seed is None:
+            return self._monte_carlo_unseeded(heroes, enemies, runs, hero_first)
+        matchup = self._matchup(heroes, enemies, hero_first)
+        end = seed + runs
+        blocks, cursor = self._tile(matchup, seed, runs)
+        hit = cursor == end
+        while cursor < end:
+            gap = self._next_start(matchup, cursor, end) - cursor
+            self.simulated += gap
+            self.add(heroes, enemies, hero_first, cursor,
+                     simulate_outcomes(heroes, enemies, gap, hero_first, cursor))
+            more, cursor = self._tile(matchup, cursor, end - cursor)
+            blocks += more
+        self.hits += hit
+        return stats_from_row(_merge(blocks))
+
+    def _monte_carlo_unseeded(self, heroes, enemies, runs, hero_first):
+        stats = self.lookup(heroes, enemies, hero_first)
+        have = stats["runs"] if stats else 0
+        if have >= runs:
+            self.hits += 1
+            return stats
+        outcomes = simulate_outcomes(heroes, enemies, runs - have, hero_first)
+        self.simulated += len(outcomes)
+        self.add(heroes, enemies, hero_first, None, outcomes)
+        return self.lookup(heroes, enemies, hero_first)
+
+    def _simulate(self, heroes, enemies, runs, hero_first, seed):
+        self.simulated += runs
+        return aggregate_outcomes(
+            simulate_outcomes(heroes, enemies, runs, hero_first, seed))
+
+    def query(self, hero_first=None, seed=None, **ranges) -> list[dict]:
+        """Stored matchups whose indexed stats fall in *ranges*.
+
+        Each range is ``name=value`` or ``name=(low, high)`` (inclusive)
+        for a name in ``STAT_COLUMNS``.  Only the current
+        ``ENGINE_VERSION`` is searched.  One entry per stored row, so a
+        seeded matchup appears once per block (``seed`` is its start).
+        """
+        clauses, params = ["version = ?"], [ENGINE_VERSION]
+        for name, bounds in ranges.items():
+            if name not in STAT_COLUMNS:
+                raise ValueError(f"Unknown stat column: {name!r}")
+            if isinstance(bounds, tuple):
+                clauses.append(f"{name} BETWEEN ? AND ?")
+                params.extend(bounds)
+            else:
+                clauses.append(f"{name} = ?")
+                params.append(bounds)
+        if hero_first is not None:
+            clauses.append("hero_first = ?")
+            params.append(int(hero_first))
+        if seed is not None:
+            clauses.append("seed = ?")
+            params.append(seed)
+        rows = self.db.execute(
+            "SELECT * FROM matchups WHERE " + " AND ".join(clauses)
+            + " ORDER BY id", params,
+        ).fetchall()
+        return [{
+            "heroes": row["heroes"],
+            "enemies": row["enemies"],
+            "hero_first": bool(row["hero_first"]),
+            "seed": row["seed"],
+            **{c: row[c] for c in STAT_COLUMNS},
+            "stats": stats_from_row(row),
+        } for row in rows]
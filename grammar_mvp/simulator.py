@@ -0,0 +1,272 @@
+"""Full-game simulator — card battles played headless by a policy.
+
+Where ``monte_carlo`` pits bare stat lines against each other, this plays
+the real game loop on BattleEngine: opening hand, preview turns, build
+phases, casts, curses on draw, post-cast turns and the final resolve.
+Whenever the engine is in the build phase a *policy* decides what to
+dock and whether to cast.  Policies are plain functions
+``policy(engine, rng)`` that call the engine's input methods; ``rng`` is
+the policy's own stream, so the battle dice don't depend on how many
+choices a policy rolled.
+
+Built-in policies (``POLICIES``):
+
+- ``idle``    never casts — the card game reduced to its duel.
+- ``random``  docks a few random cards and casts them.
+- ``greedy``  tries every target/effect/stat/magnitude[/duration] potion
+              its hand can spell, scores each on a fork of the state,
+              and casts the best one if it helps the hero.
+- ``mcts``    tree search over casts (``grammar_mvp.mcts``).
+
+Usage:
+
+  python -m grammar_mvp.simulator --policy greedy --runs 2000 --workers 4
+"""
+
+import argparse
+import itertools
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from grammar_mvp.battle import apply_potion
+from grammar_mvp.deck import load_cards, load_starter_deck
+from grammar_mvp.engine import (
+    DEFAULT_ENEMY,
+    DEFAULT_HERO,
+    BattleEngine,
+    parse_potion,
+)
+from grammar_mvp.monte_carlo import aggregate_outcomes, parse_character
+from grammar_mvp.snapshots import fork
+
+# Card categories that spell a potion, in notation order
+POTION_ORDER = ("target", "effect", "stat", "magnitude")
+
+
+# ── Policies ─────────────────────────────────────────────────────────
+
+def idle_policy(engine, rng):
+    """Never cast."""
+
+
+def random_policy(engine, rng):
+    """Dock 1–4 random hand cards into free slots, then cast."""
+    state = engine.state
+    for _ in range(rng.randint(1, 4)):
+        free = [i for i, card in enumerate(state.lock) if card is None]
+        if not state.hand or not free or state.mana < 1:
+            break
+        engine.take(rng.randrange(len(state.hand)))
+        if not engine.dock(rng.choice(free)):
+            engine.return_to_hand(len(state.hand))
+    cast, _ = engine.cast()
+    if not cast:
+        # Invalid potion: take the cards back rather than retrying it forever
+        for slot, card in enumerate(state.lock):
+            if card is not None and engine.lift(slot) is not None:
+                engine.return_to_hand(len(state.hand))
+
+
+def _power(state) -> int:
+    """Rough hero-minus-enemy balance used to score potions."""
+    hero, enemy = state.hero, state.enemy
+    return (hero.hp + 3 * (hero.strength + hero.defense)
+            - enemy.hp - 3 * (enemy.strength + enemy.defense))
+
+
+def spellings(hand: list[dict]):
+    """``(hand indices, notation)`` for each potion the hand can spell."""
+    by_category = {}
+    for i, card in enumerate(hand):
+        by_category.setdefault(card.get("category"), []).append(i)
+    if not all(c in by_category for c in POTION_ORDER):
+        return
+    percent = [i for i in by_category["magnitude"] if hand[i]["token"] == "%"]
+    magnitudes = [i for i in by_category["magnitude"] if i not in percent]
+    tails = [()] + [(i,) for i in percent[:1]]
+    durations = [()] + [(i,) for i in by_category.get("duration", [])]
+    seen = set()
+    for core in itertools.product(by_category["target"], by_category["effect"],
+                                  by_category["stat"], magnitudes):
+        for extra in itertools.product(tails, durations):
+            picks = core + extra[0] + extra[1]
+            notation = "".join(hand[i]["token"] for i in picks)
+            if notation not in seen:
+                seen.add(notation)
+                yield picks, notation
+
+
+def greedy_policy(engine, rng):
+    """Cast the potion that most improves ``_power``, if any does."""
+    state = engine.state
+    budget = min(state.mana, state.slot_count)
+    baseline = _power(state)
+    best, best_gain = None, 0
+    for picks, notation in spellings(state.hand):
+        if len(picks) > budget:
+            continue
+        parsed = parse_potion(notation)
+        if parsed is None:
+            continue
+        trial = fork(state)
+        apply_potion(parsed["dict"], trial, random.Random(0))
+        gain = _power(trial) - baseline
+        if gain > best_gain:
+            best, best_gain = picks, gain
+    if best is not None:
+        play_cards(engine, best)
+
+
+def play_cards(engine, picks) -> bool:
+    """Dock hand cards *picks* (hand indices) into slots in order and cast."""
+    for slot, index in enumerate(picks):
+        engine.take(index - sum(1 for taken in picks[:slot] if taken < index))
+        engine.dock(slot)
+    return engine.cast()[0]
+
+
+POLICIES = {
+    "idle": idle_policy,
+    "random": random_policy,
+    "greedy": greedy_policy,
+}
+
+# Policies defined in modules that build on this one
+POLICY_NAMES = (*POLICIES, "mcts")
+
+
+def get_policy(name: str):
+    """Policy function by name (see ``POLICY_NAMES``).
+
+    ``"mcts"`` gives a new ``MCTSPolicy``, which keeps per-game state.
+    """
+    if name == "mcts":
+        from grammar_mvp.mcts import MCTSPolicy  # mcts imports this module
+        return MCTSPolicy()
+    if name not in POLICIES:
+        raise ValueError(f"Unknown policy: {name!r}")
+    return POLICIES[name]
+
+
+# ── Games ────────────────────────────────────────────────────────────
+
+def play_game(policy, seed: int, card_db=None, starter=None,
+              hero=DEFAULT_HERO, enemy=DEFAULT_ENEMY) -> dict:
+    """Play one full game; an outcome dict like ``run_battle()``'s.
+
+    Adds ``casts``: how many times the policy cast successfully, and for
+    a policy that reports it (``MCTSPolicy``), ``nodes_per_sec``: its
+    average search throughput over the game's searched decisions.
+    """
+    if hasattr(policy, "reset"):
+        policy.reset()
+    engine = BattleEngine(seed, card_db, starter, hero, enemy)
+    rng = random.Random(f"{seed}/policy")
+    casts = 0
+    while engine.playing:
+        if engine.state.phase == "build":
+            policy(engine, rng)
+            if engine.state.phase == "post_cast":
+                casts += 1
+        engine.play_turn()
+    state = engine.state
+    outcome = {
+        "result": engine.result,
+        "turns": state.turn,
+        "last_hero_hp": state.hero.hp,
+        "last_enemy_hp": state.enemy.hp,
+        "heroes_fallen": int(state.hero.hp == 0),
+        "enemies_fallen": int(state.enemy.hp == 0),
+        "casts": casts,
+    }
+    if getattr(policy, "nodes_per_sec", None) is not None:
+        outcome["nodes_per_sec"] = policy.nodes_per_sec
+    return outcome
+
+
+def play_seeds(policy_name, seeds, hero, enemy, starter=None):
+    """``play_game`` outcomes for each of *seeds* (picklable for pools)."""
+    card_db = load_cards()
+    if starter is None:
+        starter = load_starter_deck(card_db)
+    policy = get_policy(policy_name)
+    return [play_game(policy, s, card_db, starter, hero, enemy) for s in seeds]
+
+
+def game_stats(outcomes: list[dict]) -> dict:
+    """``aggregate_outcomes`` plus ``avg_casts`` (and ``nodes_per_sec``)."""
+    stats = aggregate_outcomes(outcomes)
+    stats["avg_casts"] = sum(o["casts"] for o in outcomes) / len(outcomes)
+    searched = [o["nodes_per_sec"] for o in outcomes if "nodes_per_sec" in o]
+    if searched:
+        stats["nodes_per_sec"] = sum(searched) / len(searched)
+    return stats
+
+
+def simulate(policy: str, runs: int, seed: int = 0, workers: int = 1,
+             hero=DEFAULT_HERO, enemy=DEFAULT_ENEMY, starter=None) -> dict:
+    """Play *runs* games with the named *policy*; ``monte_carlo()`` stats.
+
+    Game ``i`` uses seed ``seed + i``, so two policies see the same decks
+    and dice.  *starter* is the deck (card dicts) to play with instead
+    of the cards.toml starter deck.  Adds ``avg_casts``, and
+    ``nodes_per_sec`` (mean over games) for ``"mcts"``.
+    """
+    get_policy(policy)  # validate early
+    seeds = range(seed, seed + runs)
+    run = partial(play_seeds, policy, hero=tuple(hero), enemy=tuple(enemy),
+                  starter=starter)
+    if workers > 1:
+        chunks = [seeds[i::workers] for i in range(workers)]
+        with ProcessPoolExecutor(workers) as pool:
+            outcomes = [o for chunk in pool.map(run, chunks) for o in chunk]
+    else:
+        outcomes = run(seeds)
+    return game_stats(outcomes)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Headless full-game simulator for PotionWorld",
+    )
+    parser.add_argument("--policy", choices=POLICY_NAMES, default="greedy",
+                        help="Player policy (default: greedy)")
+    parser.add_argument("--runs", type=int, default=1000,
+                        help="Games to play (default: 1000)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Base seed; game i uses seed + i (default: 0)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes to spread games over (default: 1)")
+    parser.add_argument("--hero", default=None, metavar="SPEC",
+                        help="Hero spec 'Name:HP/STR/DEF' (default: Sir Aldric)")
+    parser.add_argument("--enemy", default=None, metavar="SPEC",
+                        help="Enemy spec 'Name:HP/STR/DEF' (default: Goblin)")
+    args = parser.parse_args()
+
+    hero, enemy = DEFAULT_HERO, DEFAULT_ENEMY
+    if args.hero:
+        c = parse_character(args.hero, "Hero")
+        hero = (c.name, c.hp, c.max_hp, c.strength, c.defense)
+    if args.enemy:
+        c = parse_character(args.enemy, "Enemy")
+        enemy = (c.name, c.hp, c.max_hp, c.strength, c.defense)
+
+    start = time.perf_counter()
+    stats = simulate(args.policy, args.runs, args.seed, args.workers,
+                     hero, enemy)
+    elapsed = time.perf_counter() - start
+    ld50 = f"{stats['ld50']:.0f}" if stats["ld50"] is not None else "N/A"
+    print(f"{hero[0]}  vs  {enemy[0]}  —  policy: {args.policy}")
+    print(f"  Win rate:    {stats['win_rate']:.1%}  ({stats['runs']} games)")
+    print(f"  LD50:        {ld50} turns")
+    print(f"  Avg turns:   {stats['avg_turns']:.1f}")
+    print(f"  Avg casts:   {stats['avg_casts']:.2f}")
+    if "nodes_per_sec" in stats:
+        print(f"  Search:      {stats['nodes_per_sec']:,.0f} nodes/sec")
+    print(f"  Speed:       {args.runs / elapsed:,.0f} games/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""GameState snapshots — cheap forks and in-place rollback.
+
+``fork(state)`` returns an independent GameState that shares everything
+immutable with its parent: card dicts, names, the rng, and the
+in-memory battle log records.  Only what a fork can change is copied:
+
+- deck/hand/lock become new lists of the *same* card dicts;
+- each Character is shallow-copied; its effect timeline and modifier
+  stack are deep-copied only when non-empty (most fighters carry none);
+- the battle log ring is shared until either side appends to it;
+- the trigger bus and chain resolver are rebuilt around the copied
+  fighters.
+
+``snapshot`` / ``restore`` use the same machinery for undo and
+lookahead: restore puts a snapshot's contents back into a live state
+object, so views holding that object keep working.  Forks never touch
+the parent's log spill file.
+"""
+
+import copy
+
+from grammar_mvp.chains import ChainResolver
+from grammar_mvp.effects import EffectTimeline
+from grammar_mvp.game_state import Character, GameState
+from grammar_mvp.modifiers import ModifierStack
+from grammar_mvp.triggers import TriggerBus
+
+# GameState fields copied by reference (immutable or scalar)
+_SCALARS = ("mana", "max_mana", "slot_count", "hand_size", "phase", "turn")
+
+
+def clone_character(character: Character, memo: dict | None = None) -> Character:
+    """Independent copy of *character*; effect state copied only if present."""
+    clone = copy.copy(character)
+    if memo is not None:
+        memo[id(character)] = clone
+    timeline, modifiers = character.active_effects, character.modifiers
+    if len(timeline) or len(modifiers):
+        # One deepcopy keeps timeline records and stack sharing modifiers.
+        clone.active_effects, clone.modifiers = copy.deepcopy(
+            (timeline, modifiers), {} if memo is None else memo,
+        )
+    else:
+        clone.active_effects = EffectTimeline()
+        clone.active_effects.turn = timeline.turn
+        clone.modifiers = ModifierStack()
+    return clone
+
+
+def _fork_bus(bus: TriggerBus, new_bus: TriggerBus, memo: dict, state):
+    """Fill *new_bus* from *bus*, rebinding trigger actions to *state*."""
+    new_bus.copy_state(bus)
+    for subs in bus._index.values():
+        for sub in subs:
+            clone = memo.get(id(sub)) or copy.deepcopy(sub, memo)
+            rebind = getattr(sub.action, "rebind", None)
+            if rebind:
+                clone.action = rebind(state)
+            new_bus._index.setdefault(
+                (clone.event, id(clone.owner)), [],
+            ).append(clone)
+
+
+def _copy(state: GameState) -> tuple[GameState, dict]:
+    """*state* copied except for its trigger subscriptions, and the memo."""
+    new_bus = TriggerBus()
+    memo = {id(state.triggers): new_bus}
+    fighters = {}
+    for character in (state.hero, state.enemy, *state.heroes, *state.enemies):
+        if id(character) not in fighters:
+            fighters[id(character)] = clone_character(character, memo)
+
+    chains = ChainResolver(state.chains.budget, state.chains.max_depth)
+    chains.spent = state.chains.spent
+    chains.fired = list(state.chains.fired)
+    chains.stats = dict(state.chains.stats)
+
+    copied = GameState(
+        hero=fighters[id(state.hero)],
+        enemy=fighters[id(state.enemy)],
+        deck=list(state.deck),
+        hand=list(state.hand),
+        lock=list(state.lock),
+        battle_log=state.battle_log.fork(),
+        heroes=[fighters[id(c)] for c in state.heroes],
+        enemies=[fighters[id(c)] for c in state.enemies],
+        triggers=new_bus,
+        chains=chains,
+        **{name: getattr(state, name) for name in _SCALARS},
+    )
+    return copied, memo
+
+
+def fork(state: GameState) -> GameState:
+    """An independent copy of *state* with maximal sharing."""
+    forked, memo = _copy(state)
+    _fork_bus(state.triggers, forked.triggers, memo, forked)
+    return forked
+
+
+def snapshot(state: GameState) -> GameState:
+    """A frozen copy of *state* to ``restore`` later.  Treat it as read-only."""
+    return fork(state)
+
+
+def restore(state: GameState, snap: GameState):
+    """Roll *state* back to *snap* in place.  *snap* stays reusable.
+
+    The battle log is history, not game state, so it is left as is.
+    """
+    fresh, memo = _copy(snap)
+    for name in ("hero", "enemy", "deck", "hand", "lock", "heroes",
+                 "enemies", "triggers", "chains", *_SCALARS):
+        setattr(state, name, getattr(fresh, name))
+    # Trigger actions close over a state; bind them to the live one.
+    _fork_bus(snap.triggers, state.triggers, memo, state)
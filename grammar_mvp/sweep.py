@@ -0,0 +1,316 @@
+"""Parameter sweeps — balance heatmaps over a grid of matchups.
+
+Give each stat a range and the sweep evaluates every combination
+(the cartesian grid) of:
+
+    hero_hp  hero_str  hero_def  hero_count
+    enemy_hp enemy_str enemy_def enemy_count
+
+A team is ``*_count`` identical fighters with those stats.  Each cell
+gets win rate, LD50 and turn percentiles:
+
+- 1v1 cells are solved exactly (``grammar_mvp.exact``) — no battles;
+- other cells run ``monte_carlo`` with the same seed in every cell
+  (common random numbers), spread over a process pool;
+- cells already present in the output file from an earlier sweep with
+  the same runs/seed/turn order are kept rather than recomputed, so an
+  interrupted or extended sweep only pays for new cells;
+- with a ``result_cache.ResultCache`` (``--cache``), simulated cells are
+  looked up in and stored to it, so cells shared with other sweeps or
+  ``monte_carlo --cache`` runs are simulated once.
+
+The output is a CSV with one row per cell, ready for a spreadsheet or a
+plotting script.
+
+Usage:
+
+  python -m grammar_mvp.sweep --hero-hp 20:40:5 --enemy-str 4:10 \\
+      --enemy-count 1:3 --runs 1000 --workers 4 -o sweep.csv
+"""
+
+import argparse
+import csv
+import itertools
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from grammar_mvp.exact import exact_applies, exact_duel, pmf_percentile
+from grammar_mvp.game_state import Character
+from grammar_mvp.monte_carlo import (
+    aggregate_outcomes,
+    monte_carlo,
+    simulate_outcomes,
+)
+from grammar_mvp.result_cache import ResultCache
+
+AXES = (
+    "hero_hp", "hero_str", "hero_def", "hero_count",
+    "enemy_hp", "enemy_str", "enemy_def", "enemy_count",
+)
+
+# Sir Aldric vs one Goblin
+DEFAULTS = {
+    "hero_hp": 30, "hero_str": 6, "hero_def": 3, "hero_count": 1,
+    "enemy_hp": 25, "enemy_str": 7, "enemy_def": 3, "enemy_count": 1,
+}
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+COLUMNS = (
+    *AXES, "method", "runs", "seed", "hero_first", "win_rate", "ld50",
+    "avg_turns",
+    *(f"p{p}" for p in PERCENTILES),
+)
+
+
+def parse_axis(text: str) -> list[int]:
+    """``"7"``, ``"4,6,9"`` or ``"start:stop[:step]"`` (inclusive) → values."""
+    if ":" in text:
+        parts = [int(p) for p in text.split(":")]
+        if len(parts) not in (2, 3):
+            raise ValueError(f"Bad range {text!r}: use start:stop[:step]")
+        start, stop = parts[:2]
+        step = parts[2] if len(parts) == 3 else 1
+        if step < 1:
+            raise ValueError(f"Bad range {text!r}: step must be positive")
+        return list(range(start, stop + 1, step))
+    return [int(p) for p in text.split(",")]
+
+
+def grid(axes: dict[str, list[int]]) -> list[dict]:
+    """Every combination of the axis values; missing axes use DEFAULTS."""
+    unknown = set(axes) - set(AXES)
+    if unknown:
+        raise ValueError(f"Unknown axes: {sorted(unknown)}")
+    values = [axes.get(name) or [DEFAULTS[name]] for name in AXES]
+    for name, vals in zip(AXES, values):
+        if min(vals) < (0 if name.endswith("_def") else 1):
+            raise ValueError(f"{name} values must be positive")
+    return [dict(zip(AXES, combo)) for combo in itertools.product(*values)]
+
+
+def cell_teams(cell: dict) -> tuple[list[Character], list[Character]]:
+    heroes = [Character(f"Hero{i + 1}", cell["hero_hp"], cell["hero_hp"],
+                        cell["hero_str"], cell["hero_def"])
+              for i in range(cell["hero_count"])]
+    enemies = [Character(f"Enemy{i + 1}", cell["enemy_hp"], cell["enemy_hp"],
+                         cell["enemy_str"], cell["enemy_def"])
+               for i in range(cell["enemy_count"])]
+    return heroes, enemies
+
+
+def evaluate_cell(cell: dict, runs: int, hero_first: bool, seed: int,
+                  exact: bool = True, cache=None) -> dict:
+    """One output row for *cell*.
+
+    Exact cells use the same percentile and LD50 conventions as
+    ``monte_carlo``, so both kinds of row compare directly.
+    """
+    heroes, enemies = cell_teams(cell)
+    row = dict(cell)
+    if exact and exact_applies(heroes, enemies):
+        duel = exact_duel(heroes[0], enemies[0])
+        row.update(method="exact", runs=0, seed="", hero_first="",
+                   win_rate=duel["win_rate"], ld50=duel["ld50"],
+                   avg_turns=duel["avg_turns"])
+        for p in PERCENTILES:
+            row[f"p{p}"] = pmf_percentile(duel["turn_pmf"], p)
+        return row
+    stats = monte_carlo(heroes, enemies, runs, hero_first, seed, cache)
+    return _simulated_row(cell, runs, hero_first, seed, stats)
+
+
+def _simulated_row(cell, runs, hero_first, seed, stats) -> dict:
+    row = dict(cell)
+    row.update(method="monte_carlo", runs=runs, seed=seed,
+               hero_first=int(hero_first), win_rate=stats["win_rate"],
+               ld50=stats["ld50"], avg_turns=stats["avg_turns"])
+    for p in PERCENTILES:
+        row[f"p{p}"] = stats[f"p{p}_turns"]
+    return row
+
+
+def _evaluate_cells(cells, runs, hero_first, seed, exact):
+    return [evaluate_cell(c, runs, hero_first, seed, exact) for c in cells]
+
+
+def _cell_outcomes(cells, runs, hero_first, seed, exact):
+    """Each cell's battles, for the caller to store (process-pool entry)."""
+    return [simulate_outcomes(*cell_teams(c), runs, hero_first, seed)
+            for c in cells]
+
+
+def _cell_key(row: dict) -> tuple:
+    return tuple(int(row[name]) for name in AXES)
+
+
+def _reusable(row: dict, runs: int, hero_first: bool, seed: int,
+              exact: bool) -> bool:
+    """True if a stored row answers the same question as a fresh one.
+
+    Exact cells don't depend on turn order, runs or seed.
+    """
+    if row["method"] == "exact":
+        return exact
+    return (int(row["runs"]) == runs and str(row["seed"]) == str(seed)
+            and str(row.get("hero_first")) == str(int(hero_first)))
+
+
+def sweep(
+    axes: dict[str, list[int]],
+    runs: int = 1000,
+    hero_first: bool = True,
+    seed: int = 0,
+    workers: int = 1,
+    exact: bool = True,
+    previous: list[dict] | None = None,
+    progress=None,
+    cache=None,
+) -> list[dict]:
+    """Evaluate every cell of the grid.  Returns rows in grid order.
+
+    *previous* rows (e.g. ``read_csv`` of an earlier sweep) are reused for
+    matching cells.  A *cache* (``ResultCache``) answers simulated cells
+    it already holds and stores the rest.  *progress*, if given, is
+    called as ``progress(done, total)`` as cells complete.
+    """
+    cells = grid(axes)
+    known = {}
+    for row in previous or ():
+        if _reusable(row, runs, hero_first, seed, exact):
+            known[_cell_key(row)] = row
+
+    rows: dict[tuple, dict] = {}
+    fast, slow = [], []
+    for cell in cells:
+        key = _cell_key(cell)
+        if key in known:
+            rows[key] = known[key]
+        elif exact and cell["hero_count"] == cell["enemy_count"] == 1:
+            fast.append(cell)
+        else:
+            slow.append(cell)
+
+    total = len(cells)
+
+    def report():
+        if progress:
+            progress(len(rows), total)
+
+    report()
+    for cell in fast:
+        rows[_cell_key(cell)] = evaluate_cell(cell, runs, hero_first, seed, exact)
+    report()
+
+    if cache is not None:
+        pending = []
+        for cell in slow:
+            stats = cache.lookup(*cell_teams(cell), hero_first, seed, runs)
+            if stats is None:
+                pending.append(cell)
+            else:
+                rows[_cell_key(cell)] = _simulated_row(cell, runs, hero_first,
+                                                       seed, stats)
+        slow = pending
+        report()
+
+    def absorb(chunk, results):
+        for cell, result in zip(chunk, results):
+            if cache is not None:
+                cache.add(*cell_teams(cell), hero_first, seed, result)
+                result = _simulated_row(cell, runs, hero_first, seed,
+                                        aggregate_outcomes(result))
+            rows[_cell_key(cell)] = result
+        report()
+
+    if slow:
+        size = max(1, min(32, len(slow) // (workers * 4) or 1))
+        chunks = [slow[i:i + size] for i in range(0, len(slow), size)]
+        args = (runs, hero_first, seed, exact)
+        # With a cache the battles come back to be stored here
+        work = _evaluate_cells if cache is None else _cell_outcomes
+        if workers > 1:
+            with ProcessPoolExecutor(workers) as pool:
+                futures = [pool.submit(work, chunk, *args) for chunk in chunks]
+                for chunk, future in zip(chunks, futures):
+                    absorb(chunk, future.result())
+        else:
+            for chunk in chunks:
+                absorb(chunk, work(chunk, *args))
+
+    return [rows[_cell_key(cell)] for cell in cells]
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    return value
+
+
+def write_csv(rows: list[dict], path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: _csv_value(row.get(k)) for k in COLUMNS})
+
+
+def read_csv(path) -> list[dict]:
+    """Rows of an earlier sweep (values as strings, except the axes)."""
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Balance sweep over a grid of matchups",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=(
+            "Axis values: N, a,b,c, or start:stop[:step] (inclusive).\n"
+            "Axes left out stay at Sir Aldric 30/6/3 vs one Goblin 25/7/3.\n"
+        ),
+    )
+    for name in AXES:
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name,
+                            type=parse_axis, metavar="VALUES")
+    parser.add_argument("--runs", type=int, default=1000,
+                        help="Battles per simulated cell (default: 1000)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Seed shared by every cell (default: 0)")
+    parser.add_argument("--first", choices=["hero", "enemy"], default="hero",
+                        help="Who strikes first in team battles")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes for simulated cells (default: 1)")
+    parser.add_argument("--no-exact", action="store_true",
+                        help="Simulate 1v1 cells too instead of solving them")
+    parser.add_argument("-o", "--output", default="sweep.csv",
+                        help="CSV file; existing rows are reused (default: sweep.csv)")
+    parser.add_argument("--cache", default=None, metavar="PATH",
+                        help="SQLite result store shared with monte_carlo --cache")
+    args = parser.parse_args()
+
+    axes = {name: getattr(args, name) for name in AXES if getattr(args, name)}
+    previous = read_csv(args.output) if Path(args.output).exists() else None
+
+    def progress(done, total):
+        print(f"\r  {done}/{total} cells", end="", file=sys.stderr, flush=True)
+
+    cache = ResultCache(args.cache) if args.cache else None
+    start = time.perf_counter()
+    rows = sweep(axes, runs=args.runs, hero_first=args.first == "hero",
+                 seed=args.seed, workers=args.workers,
+                 exact=not args.no_exact, previous=previous,
+                 progress=progress, cache=cache)
+    if cache is not None:
+        cache.close()
+    write_csv(rows, args.output)
+    print(f"\n{len(rows)} cells → {args.output} "
+          f"in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Team stats — struct-of-arrays view of one side of a battle.
+
+A TeamStats keeps one parallel list per stat instead of one object per
+fighter, so an area effect (ESENS targets ``A``, ``X``, ``G``) is a
+single list rebuild per stat rather than a walk over Character objects.
+The lists are updated in place, so code holding a reference to, say,
+``team.hp`` keeps seeing current values.
+"""
+
+from itertools import repeat
+
+from grammar_mvp.game_state import Character
+
+# ESENS stat code → TeamStats list name
+STAT_LISTS = {
+    "H": "hp",
+    "S": "strength",
+    "D": "defense",
+}
+
+
+class TeamStats:
+    """Parallel ``names``/``hp``/``max_hp``/``strength``/``defense`` lists."""
+
+    __slots__ = ("names", "hp", "max_hp", "strength", "defense")
+
+    def __init__(self, names, hp, max_hp, strength, defense):
+        self.names = list(names)
+        self.hp = list(hp)
+        self.max_hp = list(max_hp)
+        self.strength = list(strength)
+        self.defense = list(defense)
+
+    @classmethod
+    def from_characters(cls, characters: list[Character]) -> "TeamStats":
+        return cls(
+            [c.name for c in characters],
+            [c.hp for c in characters],
+            [c.max_hp for c in characters],
+            [c.strength for c in characters],
+            [c.defense for c in characters],
+        )
+
+    def __len__(self):
+        return len(self.hp)
+
+    def to_characters(self) -> list[Character]:
+        """Fresh Characters with the current stats (no effects)."""
+        return [
+            Character(*row)
+            for row in zip(self.names, self.hp, self.max_hp,
+                           self.strength, self.defense)
+        ]
+
+    def drop_fallen(self) -> int:
+        """Remove members at 0 HP.  Returns how many were removed."""
+        keep = [i for i, h in enumerate(self.hp) if h > 0]
+        removed = len(self.hp) - len(keep)
+        if removed:
+            for name in self.__slots__:
+                column = getattr(self, name)
+                column[:] = [column[i] for i in keep]
+        return removed
+
+    def apply(self, stat: str, effect_type: str, value,
+              is_percentage: bool = False, is_full: bool = False,
+              index: int | None = None) -> bool:
+        """Apply one immediate effect to every member at once.
+
+        Same arithmetic as ``apply_potion`` on a fresh Character: HP is
+        clamped to ``[0, max_hp]`` and only living members are healed or
+        hurt; STR/DEF are floored at 0.  With *index* only that member is
+        affected.  Returns False for effects it can't express (unknown
+        stat or effect type).
+        """
+        if index is not None:
+            row = TeamStats(*(getattr(self, n)[index:index + 1]
+                              for n in self.__slots__))
+            applied = row.apply(stat, effect_type, value, is_percentage, is_full)
+            for n in self.__slots__:
+                getattr(self, n)[index] = getattr(row, n)[0]
+            return applied
+        name = STAT_LISTS.get(stat)
+        if name is None:
+            return False
+        if name == "hp":
+            return self._apply_hp(effect_type, value, is_percentage, is_full)
+
+        column = getattr(self, name)
+        if effect_type in ("+", "-"):
+            sign = -1 if effect_type == "-" else 1
+            if is_percentage:
+                factor = 1 + sign * value / 100
+                column[:] = [max(0, round(s * factor)) for s in column]
+            else:
+                delta = sign * value
+                column[:] = [max(0, s + delta) for s in column]
+        elif effect_type == "=":
+            column[:] = repeat(max(0, round(value)), len(column))
+        elif effect_type == "*":
+            column[:] = [max(0, round(s * value)) for s in column]
+        else:
+            return False
+        return True
+
+    def _apply_hp(self, effect_type, value, is_percentage, is_full):
+        max_hp = self.max_hp
+        if is_full:
+            amounts = max_hp
+        elif is_percentage:
+            amounts = [round(m * value / 100) for m in max_hp]
+        else:
+            amounts = repeat(value, len(max_hp))
+
+        if effect_type == "+":
+            new = [min(h + a, m) if h > 0 else 0
+                   for h, a, m in zip(self.hp, amounts, max_hp)]
+        elif effect_type == "-":
+            new = [max(0, h - a) for h, a in zip(self.hp, amounts)]
+        elif effect_type == "=":
+            new = [max(0, min(a, m)) if h > 0 else 0
+                   for h, a, m in zip(self.hp, amounts, max_hp)]
+        else:
+            return False
+        self.hp[:] = new
+        return True
@@ -0,0 +1,48 @@
+"""Tests for background simulation tasks."""
+
+import time
+
+from grammar_mvp.background import BackgroundTask
+from grammar_mvp.game_state import Character
+from grammar_mvp.monte_carlo import iter_difficulty_check, iter_monte_carlo
+
+
+def _duel():
+    return ([Character("Sir Aldric", 30, 30, 6, 3)],
+            [Character("Goblin", 25, 25, 7, 3)])
+
+
+class TestBackgroundTask:
+
+    def test_runs_to_completion(self):
+        task = BackgroundTask(iter_difficulty_check(*_duel(), runs=300,
+                                                    batch_size=100))
+        assert task.wait(10)
+        assert task.finished and not task.cancelled
+        assert task.result["runs_used"] == 300
+        assert task.latest["finished"]
+
+    def test_cancel(self):
+        task = BackgroundTask(iter_monte_carlo(*_duel(), 10_000_000,
+                                               batch_size=50))
+        while task.latest is None:
+            time.sleep(0.001)
+        task.cancel()
+        assert task.wait(10)
+        assert task.cancelled and task.result is None
+        assert task.latest["done"] < 10_000_000
+
+    def test_errors_are_kept(self):
+        def broken():
+            yield {"finished": False}
+            raise RuntimeError("boom")
+
+        task = BackgroundTask(broken())
+        assert task.wait(10)
+        assert isinstance(task.error, RuntimeError)
+
+    def test_deferred_start(self):
+        task = BackgroundTask(iter_monte_carlo(*_duel(), 100), start=False)
+        assert task.latest is None and not task.finished
+        task.start()
+        assert task.wait(10) and task.result["runs"] == 100
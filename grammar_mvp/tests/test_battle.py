@@ -1,14 +1,20 @@
 """Tests for the grammar_mvp battle engine."""
 
+import random
+
 import pytest
 
 from grammar_mvp.battle import (
+    AttackEvent,
     apply_potion,
     check_battle_end,
+    resolve_attack,
     resolve_turn,
+    strike,
     tick_effects,
 )
 from grammar_mvp.game_state import Character, GameState
+from grammar_mvp.modifiers import Modifier
 
 
 # ------------------------------------------------------------------
@@ -62,6 +68,37 @@ class TestResolveTurn:
         assert state.hero.hp == 38
 
 
+# ------------------------------------------------------------------
+# resolve_attack / strike
+# ------------------------------------------------------------------
+
+class TestResolveAttack:
+
+    def test_event_fields(self):
+        state = _make_state(hero_str=1, enemy_def=0)
+        event = resolve_attack(state.hero, state.enemy)
+        assert event == AttackEvent("Hero", "Enemy", 1, 0, 1, 24, 25)
+        assert state.enemy.hp == 24
+
+    def test_format_matches_resolve_turn(self):
+        a, b = _make_state(), _make_state()
+        event = resolve_attack(a.hero, a.enemy, random.Random(3))
+        log = resolve_turn(b.hero, b.enemy, random.Random(3))
+        assert str(event) == log
+
+    def test_strike_rolls_same_dice(self):
+        a, b = _make_state(), _make_state()
+        damage = strike(a.hero, a.enemy, random.Random(5))
+        event = resolve_attack(b.hero, b.enemy, random.Random(5))
+        assert damage == event.damage
+        assert a.enemy.hp == b.enemy.hp
+
+    def test_strike_minimum_damage_and_floor(self):
+        state = _make_state(enemy_hp=1, hero_str=1, enemy_def=99)
+        assert strike(state.hero, state.enemy) == 1
+        assert state.enemy.hp == 0
+
+
 # ------------------------------------------------------------------
 # apply_potion
 # ------------------------------------------------------------------
@@ -150,7 +187,7 @@ class TestApplyPotion:
     def test_unknown_target_fizzles(self):
         state = _make_state()
         parsed = {
-            "target": "X",
+            "target": "Z",
             "effect_type": "+",
             "stat_affected": "H",
             "magnitude": {"value": 5, "is_percentage": False, "is_full": False},
@@ -169,6 +206,65 @@ class TestApplyPotion:
         assert state.hero.hp == 40  # unchanged
 
 
+class TestModifierPotions:
+
+    @staticmethod
+    def _parsed(effect_type, value, stat="S", pct=False, tag=None,
+                turns=None):
+        parsed = {
+            "target": "P",
+            "effect_type": effect_type,
+            "stat_affected": stat,
+            "magnitude": {"value": value, "is_percentage": pct,
+                          "is_full": False},
+        }
+        if tag:
+            parsed["interaction_tag"] = tag
+        if turns:
+            parsed["duration"] = {"value": turns, "range_start": None,
+                                  "range_end": None, "type": "T"}
+        return parsed
+
+    def test_percentage_buff(self):
+        state = _make_state(hero_str=10)
+        log = apply_potion(self._parsed("+", 50, pct=True), state)
+        assert state.hero.strength == 15
+        assert "+50%" in log
+
+    def test_set_and_multiply(self):
+        state = _make_state(hero_str=10)
+        apply_potion(self._parsed("*", 2), state)
+        assert state.hero.strength == 20
+        apply_potion(self._parsed("=", 4), state)
+        assert state.hero.strength == 4
+
+    def test_timed_multiplier_composes_with_permanent_buff(self):
+        state = _make_state(hero_str=10)
+        apply_potion(self._parsed("*", 2, turns=1), state)
+        apply_potion(self._parsed("+", 3), state)
+        assert state.hero.strength == 26
+        tick_effects(state.hero)
+        assert state.hero.strength == 13
+
+    def test_im_tag_compounds(self):
+        state = _make_state(hero_str=100)
+        apply_potion(self._parsed("+", 10, pct=True, tag="IM"), state)
+        apply_potion(self._parsed("+", 10, pct=True, tag="IM"), state)
+        assert state.hero.strength == 121
+
+    def test_percent_heal_uses_max_hp(self):
+        state = _make_state(hero_hp=10)
+        apply_potion(self._parsed("+", 25, stat="H", pct=True), state)
+        assert state.hero.hp == 20
+
+    def test_full_heal(self):
+        state = _make_state(hero_hp=3)
+        parsed = self._parsed("+", 0, stat="H")
+        parsed["magnitude"]["is_full"] = True
+        apply_potion(parsed, state)
+        assert state.hero.hp == 40
+
+
 # ------------------------------------------------------------------
 # tick_effects
 # ------------------------------------------------------------------
@@ -177,31 +273,112 @@ class TestTickEffects:
 
     def test_decrement_remaining(self):
         hero = Character("Hero", 40, 40, 8, 5)
-        hero.active_effects = [{"remaining": 3, "stat": "S", "delta": 2}]
+        effect = hero.active_effects.add({"stat": "S", "delta": 2}, 3)
         tick_effects(hero)
         assert len(hero.active_effects) == 1
-        assert hero.active_effects[0]["remaining"] == 2
+        assert hero.active_effects.remaining(effect) == 2
 
     def test_remove_expired(self):
         hero = Character("Hero", 40, 40, 8, 5)
-        hero.active_effects = [{"remaining": 1, "stat": "S", "delta": 2}]
+        hero.active_effects.add({"stat": "S", "delta": 2}, 1)
         tick_effects(hero)
         assert len(hero.active_effects) == 0
 
     def test_mixed_effects(self):
         hero = Character("Hero", 40, 40, 8, 5)
-        hero.active_effects = [
-            {"remaining": 1, "stat": "S", "delta": 2},
-            {"remaining": 5, "stat": "D", "delta": 1},
-        ]
+        hero.active_effects.add({"stat": "S", "delta": 2}, 1)
+        hero.active_effects.add({"stat": "D", "delta": 1}, 5)
         tick_effects(hero)
         assert len(hero.active_effects) == 1
-        assert hero.active_effects[0]["stat"] == "D"
+        assert list(hero.active_effects)[0]["stat"] == "D"
 
     def test_empty_effects_no_error(self):
         hero = Character("Hero", 40, 40, 8, 5)
+        assert tick_effects(hero) == []
+        assert len(hero.active_effects) == 0
+
+    def test_expiry_reverses_stat_change(self):
+        hero = Character("Hero", 40, 40, 8, 5)
+        modifier = hero.modifiers.add(hero, Modifier("strength", "add", 2))
+        hero.active_effects.add({"stat": "S", "modifier": modifier}, 2)
+        assert hero.strength == 10
+        tick_effects(hero)
+        assert hero.strength == 10
         tick_effects(hero)
-        assert hero.active_effects == []
+        assert hero.strength == 8
+
+    def test_lasting_effects_never_expire(self):
+        hero = Character("Hero", 40, 40, 8, 5)
+        effect = hero.active_effects.add({"stat": "S", "delta": 2})
+        for _ in range(50):
+            assert tick_effects(hero) == []
+        assert hero.active_effects.remaining(effect) is None
+        assert len(hero.active_effects) == 1
+
+
+class TestTimedPotions:
+
+    def test_timed_buff_expires(self):
+        state = _make_state()
+        parsed = {
+            "target": "P",
+            "effect_type": "+",
+            "stat_affected": "S",
+            "magnitude": {"value": 8, "is_percentage": False, "is_full": False},
+            "duration": {"value": 3, "range_start": None, "range_end": None,
+                         "type": "T"},
+        }
+        log = apply_potion(parsed, state)
+        assert state.hero.strength == 16
+        assert "3 turns" in log
+        for _ in range(2):
+            tick_effects(state.hero)
+        assert state.hero.strength == 16
+        tick_effects(state.hero)
+        assert state.hero.strength == 8
+
+    def test_clamped_debuff_reverses_exactly(self):
+        state = _make_state(enemy_def=3)
+        parsed = {
+            "target": "E",
+            "effect_type": "-",
+            "stat_affected": "D",
+            "magnitude": {"value": 10, "is_percentage": False, "is_full": False},
+            "duration": {"value": 1, "range_start": None, "range_end": None,
+                         "type": "T"},
+        }
+        apply_potion(parsed, state)
+        assert state.enemy.defense == 0
+        tick_effects(state.enemy)
+        assert state.enemy.defense == 3
+
+    def test_range_duration_rolls_within_bounds(self):
+        state = _make_state()
+        parsed = {
+            "target": "P",
+            "effect_type": "+",
+            "stat_affected": "D",
+            "magnitude": {"value": 2, "is_percentage": False, "is_full": False},
+            "duration": {"value": None, "range_start": 1, "range_end": 3,
+                         "type": "T"},
+        }
+        apply_potion(parsed, state, rng=random.Random(0))
+        effect = list(state.hero.active_effects)[0]
+        assert 1 <= state.hero.active_effects.remaining(effect) <= 3
+
+    def test_combat_duration_is_not_scheduled(self):
+        state = _make_state()
+        parsed = {
+            "target": "P",
+            "effect_type": "+",
+            "stat_affected": "S",
+            "magnitude": {"value": 2, "is_percentage": False, "is_full": False},
+            "duration": {"value": None, "range_start": None, "range_end": None,
+                         "type": "C"},
+        }
+        apply_potion(parsed, state)
+        assert state.hero.strength == 10
+        assert len(state.hero.active_effects) == 0
 
 
 # ------------------------------------------------------------------
@@ -0,0 +1,89 @@
+"""Tests for the bounded battle log buffer."""
+
+import pytest
+
+from grammar_mvp.battle_log import BattleLogBuffer, read_spill
+from grammar_mvp.game_state import AttackEvent, Character, GameState
+
+
+def _event(hp):
+    return AttackEvent("Hero", "Goblin", 5, 1, 4, hp, 25)
+
+
+class TestRing:
+
+    def test_keeps_only_capacity(self):
+        log = BattleLogBuffer(capacity=3)
+        for i in range(10):
+            log.append(f"line {i}")
+        assert len(log) == 3
+        assert log.total == 10
+        assert list(log) == ["line 7", "line 8", "line 9"]
+
+    def test_tail(self):
+        log = BattleLogBuffer(capacity=5)
+        for i in range(7):
+            log.append(i)
+        assert log.tail(2) == [5, 6]
+        assert log.tail(99) == [2, 3, 4, 5, 6]
+
+    def test_tail_of_empty_log(self):
+        assert BattleLogBuffer().tail(4) == []
+
+    def test_range_uses_absolute_sequence(self):
+        log = BattleLogBuffer(capacity=4)
+        for i in range(10):
+            log.append(f"e{i}", turn=i // 2)
+        # seq 0-5 rotated out; only 6-9 remain.
+        assert log.range(0, 8) == [(6, 3, "e6"), (7, 3, "e7")]
+
+    def test_indexing(self):
+        log = BattleLogBuffer(capacity=2)
+        for entry in ("a", "b", "c"):
+            log.append(entry)
+        assert log[0] == "b"
+        assert log[-1] == "c"
+        with pytest.raises(IndexError):
+            log[2]
+
+    def test_rejects_zero_capacity(self):
+        with pytest.raises(ValueError):
+            BattleLogBuffer(capacity=0)
+
+    def test_game_state_log_is_bounded(self):
+        state = GameState(
+            hero=Character("Hero", 40, 40, 8, 5),
+            enemy=Character("Enemy", 25, 25, 7, 3),
+            mana=10, max_mana=10, deck=[], hand=[], lock=[None] * 5,
+            slot_count=5, hand_size=5, phase="resolve",
+        )
+        for i in range(5000):
+            state.battle_log.append(_event(i))
+        assert len(state.battle_log) == state.battle_log.capacity
+
+
+class TestSpill:
+
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "log.ndjson"
+        log = BattleLogBuffer(capacity=2, spill_path=path)
+        log.append("CAST: heal", turn=1)
+        log.append(_event(12), turn=2)
+        log.append("CURSE: Hex!", turn=3)
+        log.close()
+        records = list(read_spill(path))
+        assert records == [
+            (0, 1, "CAST: heal"),
+            (1, 2, _event(12)),
+            (2, 3, "CURSE: Hex!"),
+        ]
+        # Memory only holds the newest two.
+        assert len(log) == 2
+
+    def test_spill_appends_across_buffers(self, tmp_path):
+        path = tmp_path / "log.ndjson"
+        for text in ("first", "second"):
+            log = BattleLogBuffer(spill_path=path)
+            log.append(text)
+            log.close()
+        assert [entry for _, _, entry in read_spill(path)] == ["first", "second"]
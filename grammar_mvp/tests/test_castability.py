@@ -0,0 +1,111 @@
+"""Tests for the exact castability odds."""
+
+import itertools
+from fractions import Fraction
+
+import pytest
+
+from grammar_mvp.castability import (
+    POTION_CLASSES,
+    castability,
+    castability_for_state,
+    castability_table,
+)
+from grammar_mvp.deck import load_cards, load_starter_deck
+from grammar_mvp.engine import BattleEngine
+from grammar_mvp.simulator import spellings
+
+
+@pytest.fixture(scope="module")
+def card_db():
+    return load_cards()
+
+
+@pytest.fixture(scope="module")
+def starter(card_db):
+    return load_starter_deck(card_db)
+
+
+def _card(card_db, key):
+    return dict(card_db[key])
+
+
+def _brute_force(deck, hand, hand_size, slot_count, mana):
+    """Enumerate every draw; castable = ``spellings`` finds a potion."""
+    draws = min(hand_size - len(hand), len(deck))
+    favourable = total = 0
+    for picks in itertools.combinations(range(len(deck)), draws):
+        total += 1
+        slots, budget_mana, drawn = slot_count, mana, list(hand)
+        for i in picks:
+            card = deck[i]
+            args = card.get("on_draw_args") or {}
+            if card.get("type") == "curse" and card.get("on_draw"):
+                if args.get("field") == "slot_count":
+                    slots += args["delta"]
+                elif args.get("field") == "mana":
+                    budget_mana += args["delta"]
+                continue
+            drawn.append(card)
+        if min(slots, budget_mana) >= 4 and next(spellings(drawn), None):
+            favourable += 1
+    return Fraction(favourable, total)
+
+
+class TestCastability:
+
+    def test_matches_brute_force(self, card_db, starter):
+        curses = [_card(card_db, "curse_mana_drain"),
+                  _card(card_db, "curse_shattered_slot")]
+        deck = starter[1:] + curses
+        hand = starter[:1]
+        for slots, mana in ((5, 10), (5, 5), (4, 10)):
+            odds = castability(deck, hand, 6, slots, mana, exact=True)
+            assert odds == _brute_force(deck, hand, 6, slots, mana)
+            assert slots == 4 or odds > 0
+
+    def test_starter_deck(self, starter):
+        odds = castability(starter, [], 5, 5, 10)
+        assert 0 < odds < 1
+        assert castability(starter, [], 5, 5) == odds  # mana doesn't bind
+
+    def test_full_hand_needs_no_draw(self, starter):
+        hand = [next(c for c in starter if c.get("category") == cat)
+                for cat in ("target", "effect", "stat")]
+        magnitude = next(c for c in starter if c.get("category") == "magnitude"
+                         and c["token"] != "%")
+        assert castability(starter, hand + [magnitude], 4, 5) == 1.0
+        assert castability(starter, hand, 3, 5) == 0.0
+
+    def test_budget_below_four(self, starter):
+        assert castability(starter, [], 5, 3) == 0.0
+        assert castability(starter, [], 5, 5, mana=3) == 0.0
+
+    def test_curses_lower_odds(self, card_db, starter):
+        drained = starter + [_card(card_db, "curse_mana_drain")] * 3
+        plain = starter + [_card(card_db, "curse_dead_weight")] * 3
+        assert castability(drained, [], 5, 5, 5) < castability(plain, [], 5, 5, 5)
+
+    def test_classes_are_narrower(self, starter):
+        any_odds = castability(starter, [], 5, 5)
+        for name in POTION_CLASSES:
+            assert castability(starter, [], 5, 5, potion=name) <= any_odds
+
+    def test_unknown_class(self, starter):
+        with pytest.raises(ValueError):
+            castability(starter, [], 5, 5, potion="poison")
+
+    def test_large_deck(self, starter):
+        big = starter * 15
+        odds = castability(big, [], 8, 5, exact=True)
+        assert 0 < odds < 1
+
+
+class TestState:
+
+    def test_from_engine(self, card_db):
+        engine = BattleEngine(3, card_db)
+        state = engine.state
+        table = castability_table(state)
+        assert set(table) == set(POTION_CLASSES)
+        assert table["any"] == castability_for_state(state)
@@ -0,0 +1,94 @@
+"""Tests for the chain-effect resolver."""
+
+import random
+
+from grammar_mvp.battle import apply_potion, resolve_attack
+from grammar_mvp.chains import ChainResolver
+from grammar_mvp.game_state import Character, GameState
+
+
+def _state(n_enemies=3, budget=64):
+    hero = Character("Paladin", 30, 50, 14, 12)
+    enemies = [Character(f"Thief{i}", 18, 18, 9, 5) for i in range(n_enemies)]
+    return GameState(
+        hero=hero, enemy=enemies[0],
+        mana=10, max_mana=10,
+        deck=[], hand=[], lock=[None] * 5,
+        slot_count=5, hand_size=5, phase="build",
+        enemies=enemies, chains=ChainResolver(budget=budget),
+    )
+
+
+def _effect(target, effect_type, stat, value, chain=None, chain_target=None):
+    effect = {
+        "target": target,
+        "effect_type": effect_type,
+        "stat_affected": stat,
+        "magnitude": {"value": value, "is_percentage": False,
+                      "is_full": False},
+    }
+    if chain:
+        effect["chain_effect"] = chain
+    if chain_target:
+        effect["chain_target"] = chain_target
+    return effect
+
+
+class TestChains:
+
+    def test_explosion_hits_the_rest_of_the_side(self):
+        state = _state()
+        apply_potion(_effect("E", "-", "H", 5, ">Expl"), state)
+        assert [e.hp for e in state.enemies] == [13, 13, 13]
+        assert len(state.chains.drain()) == 2
+
+    def test_spread_walks_the_side_once(self):
+        state = _state(4)
+        apply_potion(_effect("E", "-", "H", 4, ">Sprd"), state)
+        assert [e.hp for e in state.enemies] == [14, 14, 14, 14]
+        assert state.chains.stats["cycles"] == 1
+
+    def test_default_heal_uses_parent_magnitude(self):
+        state = _state()
+        apply_potion(_effect("E", "-", "H", 6, ">Heal"), state)
+        assert state.enemy.hp == 12
+        assert state.hero.hp == 36
+
+    def test_trig_applies_chain_target(self):
+        state = _state()
+        apply_potion(_effect("P", "+", "S", 2, ">Trig",
+                             _effect("X", "-", "D", 1)), state)
+        assert state.hero.strength == 16
+        assert [e.defense for e in state.enemies] == [4, 4, 4]
+
+    def test_depth_limit_stops_long_spreads(self):
+        state = _state(12)
+        apply_potion(_effect("E", "-", "H", 1, ">Sprd"), state)
+        assert sum(e.hp == 17 for e in state.enemies) == 9  # root + 8 hops
+        assert state.chains.stats["dropped"] == 1
+
+    def test_merged_follow_ups_apply_once_scaled(self):
+        state = _state()
+        # Every thief explodes onto the other two → each gets two hits,
+        # merged into one application of -2.
+        apply_potion(_effect("X", "-", "H", 1, ">Expl"), state)
+        assert [e.hp for e in state.enemies] == [15, 15, 15]
+        assert state.chains.stats["merged"] == 3
+        assert state.chains.stats["applied"] == 3
+
+    def test_budget_caps_work_per_turn(self):
+        state = _state(6, budget=2)
+        apply_potion(_effect("E", "-", "H", 1, ">Expl"), state)
+        assert state.chains.stats["applied"] == 2
+        assert state.chains.stats["dropped"] == 3
+        state.chains.next_turn()
+        assert state.chains.spent == 0
+
+    def test_triggered_chain_runs_on_fire(self):
+        state = _state()
+        effect = _effect("E", "-", "H", 2, ">Expl")
+        effect["trigger"] = {"type": "<D", "chance": None, "condition": None}
+        apply_potion(effect, state)
+        resolve_attack(state.hero, state.enemy, random.Random(0),
+                       bus=state.triggers)
+        assert [e.hp for e in state.enemies[1:]] == [16, 16]
@@ -0,0 +1,124 @@
+"""Tests for compiled effect programs."""
+
+import random
+
+from ESENS_Parser import parse_esens
+
+from grammar_mvp.battle import apply_potion
+from grammar_mvp.compiler import (
+    _PROGRAMS,
+    FIZZLE,
+    canonical_notation,
+    clear_cache,
+    compile_effect,
+)
+from grammar_mvp.game_state import Character, GameState
+
+
+def _make_state(hero_str=10):
+    return GameState(
+        hero=Character("Hero", 30, 40, hero_str, 5),
+        enemy=Character("Enemy", 25, 25, 7, 3),
+        mana=10, max_mana=10,
+        deck=[], hand=[], lock=[None] * 5,
+        slot_count=5, hand_size=5, phase="build",
+    )
+
+
+def _parsed(effect_type="+", stat="S", value=10, pct=False, target="P",
+            duration=None, tag=None):
+    parsed = {
+        "target": target,
+        "effect_type": effect_type,
+        "stat_affected": stat,
+        "magnitude": {"value": value, "is_percentage": pct, "is_full": False},
+    }
+    if duration:
+        parsed["duration"] = duration
+    if tag:
+        parsed["interaction_tag"] = tag
+    return parsed
+
+
+class TestCanonicalNotation:
+
+    def test_distinct_effects_get_distinct_keys(self):
+        keys = {
+            canonical_notation(_parsed()),
+            canonical_notation(_parsed(pct=True)),
+            canonical_notation(_parsed(target="E")),
+            canonical_notation(_parsed(tag="IX")),
+            canonical_notation(_parsed(value=103)),
+            canonical_notation(_parsed(
+                value=10, duration={"value": 3, "type": "T"})),
+        }
+        assert len(keys) == 6
+
+    def test_status_effect_and_dict_agree(self):
+        result = parse_esens("P+S10%3T")
+        assert (canonical_notation(result["object"])
+                == canonical_notation(result["dict"]))
+
+
+class TestCompileEffect:
+
+    def test_programs_are_cached(self):
+        assert compile_effect(_parsed()) is compile_effect(_parsed())
+        assert compile_effect(_parsed()) is not compile_effect(_parsed(value=5))
+
+    def test_compiling_a_range_duration_leaves_random_alone(self):
+        clear_cache()
+        random.seed(3)
+        expected = random.random()
+        random.seed(3)
+        compile_effect(_parsed("+", "S", 4, duration={
+            "type": "T", "range_start": 1, "range_end": 3, "value": None}))
+        assert random.random() == expected
+
+    def test_cache_is_bounded(self, monkeypatch):
+        clear_cache()
+        monkeypatch.setattr("grammar_mvp.compiler.MAX_PROGRAMS", 3)
+        first = compile_effect(_parsed(value=1))
+        for value in range(2, 5):
+            compile_effect(_parsed(value=value))
+        assert len(_PROGRAMS) == 3
+        assert compile_effect(_parsed(value=1)) is not first
+
+    def test_program_log_matches_apply_potion(self):
+        cases = [
+            (_parsed("+", "H", 8), "Hero +8 HP! (30→38)"),
+            (_parsed("-", "H", 50, pct=True, target="E"),
+             "Enemy -50% HP! (25→13)"),
+            (_parsed("=", "D", 9, tag="IX"), "Hero DEFENSE set to 9! (5→9)"),
+            (_parsed("*", "S", 2, duration={"value": 2, "type": "T"}),
+             "Hero STRENGTH x2! (10→20) for 2 turns"),
+        ]
+        for parsed, expected in cases:
+            assert compile_effect(parsed)(_make_state()) == expected
+            assert apply_potion(parsed, _make_state()) == expected
+
+    def test_ranged_duration_rolls_per_cast(self):
+        program = compile_effect(_parsed(
+            "+", "S", 2, duration={"range_start": 1, "range_end": 3,
+                                   "value": None, "type": "T"}))
+        rng = random.Random(0)
+        rolls = {program(_make_state(), rng).rsplit(" ", 2)[1]
+                 for _ in range(30)}
+        assert rolls == {"1", "2", "3"}
+
+    def test_reused_program_stacks_modifiers(self):
+        state = _make_state(hero_str=10)
+        program = compile_effect(_parsed("+", "S", 50, pct=True))
+        program(state)
+        program(state)
+        assert state.hero.strength == 20
+        assert len(state.hero.modifiers) == 2
+
+    def test_log_false_skips_text(self):
+        state = _make_state()
+        assert compile_effect(_parsed("+", "H", 5))(state, log=False) is None
+        assert state.hero.hp == 35
+
+    def test_unknown_stat_fizzles(self):
+        state = _make_state()
+        assert compile_effect(_parsed(stat="L"))(state) == FIZZLE
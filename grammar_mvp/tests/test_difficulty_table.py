@@ -0,0 +1,114 @@
+"""Tests for precomputed difficulty tables and the encounter roster."""
+
+import pytest
+
+from grammar_mvp.difficulty_table import (
+    DifficultyTable,
+    axis_values,
+    build_table,
+    load_tables,
+    save_tables,
+)
+from grammar_mvp.encounters import ENCOUNTERS, get_encounter
+from grammar_mvp.exact import exact_duel
+from grammar_mvp.game_state import Character
+from grammar_mvp.monte_carlo import difficulty_check, iter_difficulty_check
+
+
+def _duel(hp=40, enemy_str=18):
+    return ([Character("Knight", hp, 40, 10, 12)],
+            [Character("Assassin", 25, 25, enemy_str, 4)])
+
+
+@pytest.fixture(scope="module")
+def table():
+    return build_table(*_duel(), points=3, spread=0.2)
+
+
+class TestRoster:
+
+    def test_ladder_has_seven_battles(self):
+        assert [e.number for e in ENCOUNTERS] == list(range(1, 8))
+
+    def test_get_encounter(self):
+        assert get_encounter(4).title == "REACT"
+        assert get_encounter("overwhelm").enemy_count == 3
+        with pytest.raises(ValueError):
+            get_encounter(9)
+
+    def test_teams_are_fresh(self):
+        heroes, enemies = get_encounter(6).teams()
+        assert len(enemies) == 3 and len({c.name for c in enemies}) == 3
+        enemies[0].hp = 0
+        assert get_encounter(6).teams()[1][0].hp == 18
+
+
+class TestLookup:
+
+    def test_axis_values(self):
+        assert axis_values(10, 3, 0.2) == [8, 10, 12]
+        assert axis_values(2, 3, 0.9, minimum=1) == [1, 2, 4]
+
+    def test_grid_point_is_exact(self, table):
+        heroes, enemies = _duel()
+        answer = table.lookup(heroes, enemies)
+        assert answer["win_rate"] == pytest.approx(
+            exact_duel(heroes[0], enemies[0])["win_rate"])
+        assert answer["error"] == pytest.approx(0.0)
+
+    def test_interpolation_within_error_bound(self, table):
+        heroes, enemies = _duel(hp=35, enemy_str=20)
+        assert 32 < heroes[0].hp < 40  # between grid points
+        answer = table.lookup(heroes, enemies)
+        truth = exact_duel(heroes[0], enemies[0])["win_rate"]
+        assert 0 < answer["error"] < 1
+        assert abs(answer["win_rate"] - truth) <= answer["error"]
+
+    def test_outside_hull(self, table):
+        heroes, enemies = _duel(hp=60)
+        assert table.lookup(heroes, enemies) is None
+        heroes, enemies = _duel()
+        assert table.lookup(heroes, enemies + enemies) is None
+        assert table.lookup(heroes, enemies, hero_first=False) is None
+
+    def test_simulated_cells_carry_sampling_error(self):
+        heroes, enemies = get_encounter(6).teams()
+        t = build_table(heroes, enemies, points=2, spread=0.1, runs=50)
+        assert len(t) == 64
+        corner = [Character("P", 45, 45, 13, 11)]
+        thieves = [Character(f"T{i}", 16, 16, 8, 4) for i in range(3)]
+        assert t.lookup(corner, thieves)["error"] > 0
+
+    def test_round_trip(self, table, tmp_path):
+        path = tmp_path / "difficulty.json"
+        save_tables({"REACT": table}, path)
+        loaded = load_tables(path)["REACT"]
+        assert isinstance(loaded, DifficultyTable)
+        assert loaded.lookup(*_duel(35)) == table.lookup(*_duel(35))
+
+
+class TestDifficultyCheck:
+
+    def test_table_answers_without_battles(self, table):
+        result = difficulty_check(*_duel(), table=table)
+        assert result["runs_used"] == 0 and result["stats"] is None
+        assert "error" in result
+        assert result["verdict"] in ("easy", "fair", "hard")
+
+    def test_falls_back_outside_hull(self, table):
+        result = difficulty_check(*_duel(hp=60), runs=100, table=table)
+        assert result["runs_used"] == 100
+        assert "error" not in result
+
+    def test_background_check_uses_table(self, table):
+        updates = list(iter_difficulty_check(*_duel(), table=table))
+        assert len(updates) == 1 and updates[0]["finished"]
+        result = updates[0]["result"]
+        assert result == difficulty_check(*_duel(), table=table)
+        lo, hi = updates[0]["ci"]
+        assert lo <= result["win_rate"] <= hi
+
+    def test_background_check_falls_back(self, table):
+        *_, last = iter_difficulty_check(*_duel(hp=60), runs=100,
+                                         batch_size=50, table=table)
+        assert last["result"]["runs_used"] == 100
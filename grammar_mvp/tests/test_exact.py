@@ -0,0 +1,102 @@
+"""Tests for the exact 1v1 outcome solver."""
+
+import pytest
+
+from grammar_mvp.exact import (
+    damage_pmf,
+    death_round_pmf,
+    exact_applies,
+    exact_duel,
+    pmf_median,
+    pmf_percentile,
+)
+from grammar_mvp.game_state import Character
+from grammar_mvp.monte_carlo import aggregate_outcomes, monte_carlo
+
+
+class TestDamagePmf:
+
+    def test_sums_to_one(self):
+        assert sum(damage_pmf(7, 3)) == pytest.approx(1.0)
+
+    def test_minimum_damage_is_one(self):
+        pmf = damage_pmf(1, 99)
+        assert pmf[0] == 0.0
+        assert pmf[1] == pytest.approx(1.0)
+
+    def test_no_defense_is_uniform(self):
+        assert damage_pmf(4, 0)[1:] == pytest.approx((0.25,) * 4)
+
+
+class TestDeathRound:
+
+    def test_one_hp_dies_first_round(self):
+        assert death_round_pmf(1, 5, 0)[1] == pytest.approx(1.0)
+
+    def test_distribution_is_complete(self):
+        assert sum(death_round_pmf(30, 7, 3)) == pytest.approx(1.0)
+
+
+class TestExactDuel:
+
+    def test_matches_simulation(self):
+        hero = Character("Sir Aldric", 30, 30, 6, 3)
+        enemy = Character("Goblin", 25, 25, 7, 3)
+        exact = exact_duel(hero, enemy)
+        sim = monte_carlo([hero], [enemy], 20000, seed=1)
+        assert exact["win_rate"] == pytest.approx(sim["win_rate"], abs=0.015)
+        assert exact["avg_turns"] == pytest.approx(sim["avg_turns"], abs=0.1)
+        assert exact["ld50"] == sim["ld50"]
+
+    def test_turn_pmf_sums_to_one(self):
+        result = exact_duel(Character("A", 12, 12, 10, 6),
+                            Character("B", 35, 35, 8, 4))
+        assert sum(result["turn_pmf"]) == pytest.approx(1.0)
+
+    def test_simultaneous_death_is_a_loss(self):
+        # Both always deal exactly 1 and have 1 HP: both die in round 1.
+        result = exact_duel(Character("A", 1, 1, 1, 0),
+                            Character("B", 1, 1, 1, 0))
+        assert result["win_rate"] == 0.0
+        assert result["ld50"] == 1
+
+    def test_certain_win_has_no_ld50(self):
+        result = exact_duel(Character("A", 50, 50, 1, 0),
+                            Character("B", 1, 1, 1, 0))
+        assert result["win_rate"] == pytest.approx(1.0)
+        assert result["ld50"] is None
+
+
+class TestPmfSummaries:
+
+    @staticmethod
+    def _outcomes(turns):
+        return [{"result": "lose", "turns": t, "last_hero_hp": 0,
+                 "last_enemy_hp": 1, "heroes_fallen": 1, "enemies_fallen": 0}
+                for t in turns]
+
+    @pytest.mark.parametrize("turns", [[1, 2], [1, 2, 2, 3], [3, 3, 5, 5, 5],
+                                       [2, 4, 4, 4, 6, 6, 7, 9, 9, 9]])
+    def test_match_aggregate_outcomes(self, turns):
+        # A sample's empirical pmf must summarize like the sample itself
+        pmf = [0.0] * (max(turns) + 1)
+        for t in turns:
+            pmf[t] += 1 / len(turns)
+        stats = aggregate_outcomes(self._outcomes(turns))
+        assert pmf_median(pmf) == stats["ld50"]
+        for p in (10, 25, 50, 75, 90):
+            assert pmf_percentile(pmf, p) == stats[f"p{p}_turns"]
+
+    def test_no_mass(self):
+        assert pmf_median([0.0, 0.0]) is None
+
+
+class TestExactApplies:
+
+    def test_duel(self):
+        assert exact_applies([Character("A", 5, 5, 2, 1)],
+                             [Character("B", 5, 5, 2, 1)])
+
+    def test_party(self):
+        team = [Character("A", 5, 5, 2, 1), Character("C", 5, 5, 2, 1)]
+        assert not exact_applies(team, [Character("B", 5, 5, 2, 1)])
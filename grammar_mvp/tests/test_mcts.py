@@ -0,0 +1,93 @@
+"""Tests for the tree-search player."""
+
+import random
+
+from grammar_mvp.deck import load_cards
+from grammar_mvp.engine import BattleEngine
+from grammar_mvp.mcts import PASS, MCTSPolicy, legal_moves, suggest
+from grammar_mvp.simulator import play_game, simulate
+
+
+def _build_engine(*card_ids, seed=0):
+    card_db = load_cards()
+    engine = BattleEngine(seed, card_db)
+    engine.run_to(3)
+    engine.state.hand = [dict(card_db[cid]) for cid in card_ids]
+    return engine
+
+
+class TestEngineFork:
+
+    def test_fork_is_independent(self):
+        engine = _build_engine("target_E", "effect_minus", "stat_H", "mag_20")
+        before = (engine.state.hero.hp, engine.state.enemy.hp, engine.rng.getstate())
+        clone = engine.fork(1)
+        clone.run_to(30)
+        assert clone.state.turn > 3
+        assert engine.state.turn == 3
+        assert (engine.state.hero.hp, engine.state.enemy.hp,
+                engine.rng.getstate()) == before
+
+
+class TestLegalMoves:
+
+    def test_potions_actions_and_pass(self):
+        engine = _build_engine("target_E", "effect_minus", "stat_H", "mag_20",
+                               "action_redraw")
+        moves = legal_moves(engine)
+        assert moves[PASS] == ()
+        assert moves["E-H20"] == (0, 1, 2, 3)
+        assert moves["Redraw"] == (4,)
+
+    def test_mana_limits_moves(self):
+        engine = _build_engine("target_E", "effect_minus", "stat_H", "mag_20")
+        engine.state.mana = 3
+        assert list(legal_moves(engine)) == [PASS]
+
+
+class TestSuggest:
+
+    def test_finds_the_winning_cast(self):
+        engine = _build_engine("target_E", "effect_minus", "stat_H", "mag_20")
+        hint = suggest(engine, budget_ms=150, rng=random.Random(0))
+        assert hint["move"] == "E-H20"
+        assert hint["picks"] == (0, 1, 2, 3)
+        assert hint["moves"]["E-H20"][1] > hint["moves"][PASS][1]
+        assert hint["nodes_per_sec"] > 0
+
+    def test_parallel_search_merges_roots(self):
+        engine = BattleEngine(2)   # opening hand holds a Redraw
+        engine.run_to(3)
+        hint = suggest(engine, budget_ms=100, rng=random.Random(0), workers=2)
+        assert set(hint["moves"]) == set(legal_moves(engine)) == {PASS, "Redraw"}
+        assert hint["iterations"] == sum(v for v, _ in hint["moves"].values())
+
+    def test_policy_plays_the_hint(self):
+        engine = _build_engine("target_E", "effect_minus", "stat_H", "mag_20")
+        policy = MCTSPolicy(budget_ms=100)
+        policy(engine, random.Random(0))
+        assert engine.state.phase == "post_cast"
+        assert len(policy.history) == 1 and policy.nodes_per_sec > 0
+
+    def test_policy_reuses_its_pool(self):
+        with MCTSPolicy(budget_ms=50, workers=2) as policy:
+            for seed in (2, 2):
+                engine = BattleEngine(seed)
+                engine.run_to(3)
+                pool = policy._executor()
+                policy(engine, random.Random(0))
+                assert policy._executor() is pool
+            assert len(policy.history) == 2
+            # Start-up is paid before the search, not inside its budget
+            assert policy.history[0]["nodes_per_sec"] > 0
+        assert policy._pool is None
+
+    def test_games_report_nodes_per_sec(self):
+        policy = MCTSPolicy(budget_ms=20)
+        first = play_game(policy, 0)
+        assert first["nodes_per_sec"] > 0
+        searched = list(policy.history)
+        second = play_game(policy, 1)  # never more than one legal move
+        assert "nodes_per_sec" not in second
+        assert not any(h in policy.history for h in searched)
+        assert simulate("mcts", 2)["nodes_per_sec"] > 0
@@ -0,0 +1,99 @@
+"""Tests for the derived-stat modifier stack."""
+
+import pytest
+
+from grammar_mvp.game_state import Character
+from grammar_mvp.modifiers import Modifier
+
+
+def _hero(strength=10):
+    return Character("Hero", 40, 40, strength, 5)
+
+
+class TestModifierStack:
+
+    def test_add_and_remove_restores_base(self):
+        hero = _hero()
+        mod = hero.modifiers.add(hero, Modifier("strength", "add", 4))
+        assert hero.strength == 14
+        assert hero.modifiers.remove(hero, mod)
+        assert hero.strength == 10
+        assert len(hero.modifiers) == 0
+
+    def test_percentages_add_by_default(self):
+        hero = _hero(100)
+        hero.modifiers.add(hero, Modifier("strength", "pct", 10))
+        hero.modifiers.add(hero, Modifier("strength", "pct", 10, "IA"))
+        assert hero.strength == 120
+
+    def test_multiplicative_tag_compounds(self):
+        hero = _hero(100)
+        hero.modifiers.add(hero, Modifier("strength", "pct", 10, "IM"))
+        hero.modifiers.add(hero, Modifier("strength", "pct", 10, "IM"))
+        assert hero.strength == 121
+
+    def test_exclusive_tag_cancels_same_kind(self):
+        hero = _hero()
+        first = hero.modifiers.add(hero, Modifier("strength", "add", 5))
+        hero.modifiers.add(hero, Modifier("strength", "pct", 50))
+        hero.modifiers.add(hero, Modifier("strength", "add", 2, "IX"))
+        assert hero.strength == 18  # (10 + 2) * 1.5
+        assert not hero.modifiers.remove(hero, first)
+
+    def test_flat_applies_before_percent_and_multiplier(self):
+        hero = _hero()
+        hero.modifiers.add(hero, Modifier("strength", "mul", 2))
+        hero.modifiers.add(hero, Modifier("strength", "add", 5))
+        hero.modifiers.add(hero, Modifier("strength", "pct", 20))
+        assert hero.strength == 36  # (10 + 5) * 1.2 * 2
+
+    def test_override_wins_until_removed(self):
+        hero = _hero()
+        hero.modifiers.add(hero, Modifier("strength", "add", 5))
+        override = hero.modifiers.add(hero, Modifier("strength", "set", 3))
+        assert hero.strength == 3
+        hero.modifiers.remove(hero, override)
+        assert hero.strength == 15
+
+    def test_effective_floors_at_zero(self):
+        hero = _hero()
+        mod = hero.modifiers.add(hero, Modifier("defense", "add", -20))
+        assert hero.defense == 0
+        hero.modifiers.remove(hero, mod)
+        assert hero.defense == 5
+
+    def test_shift_base_under_active_modifier(self):
+        hero = _hero()
+        mod = hero.modifiers.add(hero, Modifier("strength", "mul", 2))
+        hero.modifiers.shift_base(hero, "strength", 3)
+        assert hero.strength == 26
+        hero.modifiers.remove(hero, mod)
+        assert hero.strength == 13
+
+    def test_shift_base_floors_under_active_modifier(self):
+        hero = _hero()
+        mod = hero.modifiers.add(hero, Modifier("strength", "add", 4))
+        hero.modifiers.shift_base(hero, "strength", -15)
+        assert hero.strength == 4
+        hero.modifiers.remove(hero, mod)
+        assert hero.strength == 0
+        hero.modifiers.shift_base(hero, "strength", 3)
+        assert hero.strength == 3
+
+    def test_shift_base_without_modifiers_is_direct(self):
+        hero = _hero()
+        hero.modifiers.shift_base(hero, "strength", -15)
+        assert hero.strength == 0
+        assert hero.modifiers.base == {}
+
+    def test_stats_are_independent(self):
+        hero = _hero()
+        hero.modifiers.add(hero, Modifier("strength", "add", 1))
+        hero.modifiers.add(hero, Modifier("defense", "add", 2))
+        assert (hero.strength, hero.defense) == (11, 7)
+        assert len(hero.modifiers.modifiers("defense")) == 1
+
+    def test_unknown_kind_rejected(self):
+        hero = _hero()
+        with pytest.raises(ValueError):
+            hero.modifiers.add(hero, Modifier("strength", "pow", 2))
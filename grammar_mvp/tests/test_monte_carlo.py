@@ -0,0 +1,472 @@
+"""Tests for the grammar_mvp Monte Carlo balance tool."""
+
+import copy
+import math
+import random
+
+import pytest
+
+from grammar_mvp.battle import resolve_turn
+from grammar_mvp.game_state import Character
+from grammar_mvp.monte_carlo import (
+    _POTION_STATS,
+    BattleArena,
+    difficulty_check,
+    iter_difficulty_check,
+    iter_monte_carlo,
+    iter_suggest_scaling,
+    monte_carlo,
+    optimize_scaling,
+    potion_values,
+    run_battle,
+    suggest_scaling,
+    wilson_interval,
+)
+
+
+# ------------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------------
+
+def _knight():
+    return [Character("Knight", 40, 40, 8, 5)]
+
+
+def _goblin_pack(n=3):
+    return [Character("Goblin", 25, 25, 7, 3) for _ in range(n)]
+
+
+def _duel():
+    return (
+        [Character("Sir Aldric", 30, 30, 6, 3)],
+        [Character("Goblin", 25, 25, 7, 3)],
+    )
+
+
+def _reference_battle(heroes, enemies, hero_first, rng):
+    """The original deepcopy/living() battle loop, kept as an oracle."""
+    h_team = [copy.deepcopy(c) for c in heroes]
+    e_team = [copy.deepcopy(c) for c in enemies]
+    turn = 0
+
+    def living(team):
+        return [c for c in team if c.hp > 0]
+
+    while living(h_team) and living(e_team):
+        if hero_first:
+            sides = [(living(h_team), e_team), (living(e_team), h_team)]
+        else:
+            sides = [(living(e_team), h_team), (living(h_team), e_team)]
+        for attackers, target_team in sides:
+            for attacker in attackers:
+                targets = living(target_team)
+                if targets:
+                    resolve_turn(attacker, targets[0], rng)
+        turn += 1
+
+    surviving_heroes = living(h_team)
+    surviving_enemies = living(e_team)
+    return {
+        "result": "win" if surviving_heroes else "lose",
+        "turns": turn,
+        "last_hero_hp": surviving_heroes[-1].hp if surviving_heroes else 0,
+        "last_enemy_hp": surviving_enemies[-1].hp if surviving_enemies else 0,
+        "heroes_fallen": sum(1 for h in h_team if h.hp <= 0),
+        "enemies_fallen": sum(1 for e in e_team if e.hp <= 0),
+    }
+
+
+# ------------------------------------------------------------------
+# BattleArena / run_battle
+# ------------------------------------------------------------------
+
+class TestBattleArena:
+
+    @pytest.mark.parametrize("heroes,enemies", [
+        _duel(),
+        (_knight(), _goblin_pack()),
+        ([Character("Paladin", 40, 40, 7, 5), Character("Rogue", 25, 25, 9, 2),
+          Character("Cleric", 30, 30, 5, 4)],
+         [Character("Dragon", 80, 80, 12, 6)]),
+        # Fighters already down at the start are skipped.
+        ([Character("Fallen", 0, 40, 7, 5), Character("Rogue", 25, 25, 9, 2)],
+         [Character("Imp", 20, 20, 5, 1), Character("Husk", 0, 5, 5, 5),
+          Character("Rat", 10, 10, 3, 0)]),
+    ])
+    @pytest.mark.parametrize("hero_first", [True, False])
+    def test_matches_reference_for_fixed_seed(self, heroes, enemies,
+                                              hero_first):
+        arena = BattleArena(heroes, enemies)
+        for seed in range(100):
+            fast = arena.run(hero_first, random.Random(seed))
+            slow = _reference_battle(heroes, enemies, hero_first,
+                                     random.Random(seed))
+            assert fast == slow
+
+    def test_reset_between_runs(self):
+        heroes, enemies = _duel()
+        arena = BattleArena(heroes, enemies)
+        first = arena.run(True, random.Random(9))
+        arena.run(True, random.Random(10))
+        assert arena.run(True, random.Random(9)) == first
+
+    def test_effects_fall_back_to_character_path(self):
+        heroes, enemies = _duel()
+        effect = heroes[0].active_effects.add({"stat": "S", "delta": 0}, 2)
+        assert not BattleArena.supports(heroes, enemies)
+        outcome = run_battle(heroes, enemies, rng=random.Random(1))
+        assert outcome["result"] in ("win", "lose")
+        assert heroes[0].active_effects.remaining(effect) == 2
+
+
+# ------------------------------------------------------------------
+# wilson_interval
+# ------------------------------------------------------------------
+
+class TestWilsonInterval:
+
+    def test_contains_point_estimate(self):
+        lo, hi = wilson_interval(30, 100)
+        assert lo < 0.30 < hi
+
+    def test_zero_wins_has_positive_upper_bound(self):
+        lo, hi = wilson_interval(0, 50)
+        assert lo == 0.0
+        assert 0.0 < hi < 0.1
+
+    def test_narrows_with_more_samples(self):
+        lo_small, hi_small = wilson_interval(50, 100)
+        lo_big, hi_big = wilson_interval(500, 1000)
+        assert hi_big - lo_big < hi_small - lo_small
+
+    def test_no_samples_is_uninformative(self):
+        assert wilson_interval(0, 0) == (0.0, 1.0)
+
+
+# ------------------------------------------------------------------
+# monte_carlo
+# ------------------------------------------------------------------
+
+class TestMonteCarlo:
+
+    def test_counts_add_up(self):
+        random.seed(1)
+        heroes, enemies = _duel()
+        stats = monte_carlo(heroes, enemies, 200)
+        assert stats["runs"] == 200
+        assert stats["wins"] + stats["losses"] == 200
+        assert stats["min_turns"] <= stats["p50_turns"] <= stats["max_turns"]
+
+    def test_seed_is_reproducible(self):
+        heroes, enemies = _duel()
+        first = monte_carlo(heroes, enemies, 100, seed=7)
+        second = monte_carlo(heroes, enemies, 100, seed=7)
+        assert first == second
+
+    def test_common_random_numbers_are_monotone(self):
+        heroes, _ = _duel()
+        rates = [
+            monte_carlo(heroes, [Character("Goblin", hp, hp, 7, 3)], 300,
+                        seed=11)["win_rate"]
+            for hp in (15, 20, 25, 30, 35)
+        ]
+        assert rates == sorted(rates, reverse=True)
+
+    def test_templates_not_mutated(self):
+        heroes, enemies = _duel()
+        monte_carlo(heroes, enemies, 20)
+        assert heroes[0].hp == 30
+        assert enemies[0].hp == 25
+
+
+# ------------------------------------------------------------------
+# difficulty_check
+# ------------------------------------------------------------------
+
+class TestDifficultyCheck:
+
+    def test_fixed_mode_uses_all_runs(self):
+        random.seed(2)
+        result = difficulty_check(_knight(), _goblin_pack(), runs=200)
+        assert result["runs_used"] == 200
+        assert result["verdict"] == "hard"
+
+    def test_sequential_stops_early_on_lopsided_fight(self):
+        random.seed(3)
+        result = difficulty_check(
+            _knight(), _goblin_pack(), runs=500, sequential=True,
+        )
+        assert result["verdict"] == "hard"
+        assert result["runs_used"] == 50
+        assert result["stats"]["runs"] == 50
+
+    def test_sequential_easy_verdict(self):
+        random.seed(4)
+        heroes = [Character("Paladin", 80, 80, 20, 10)]
+        result = difficulty_check(
+            heroes, [Character("Rat", 5, 5, 1, 0)], sequential=True,
+        )
+        assert result["verdict"] == "easy"
+        assert result["runs_used"] < 500
+
+    def test_sequential_respects_run_cap(self):
+        random.seed(5)
+        heroes, enemies = _duel()
+        # Zero-width band at the true win rate (~45%) never clears.
+        result = difficulty_check(
+            heroes, enemies, target_win_rate=0.45, tolerance=0.0,
+            runs=120, sequential=True, batch_size=50,
+        )
+        assert result["runs_used"] == 120
+
+    @pytest.mark.parametrize("sequential", [False, True])
+    def test_result_shape(self, sequential):
+        random.seed(6)
+        heroes, enemies = _duel()
+        result = difficulty_check(heroes, enemies, runs=100,
+                                  sequential=sequential)
+        assert set(result) == {
+            "win_rate", "target", "delta", "verdict", "runs_used", "stats",
+        }
+        assert result["delta"] == pytest.approx(result["win_rate"] - 0.65)
+
+
+# ------------------------------------------------------------------
+# suggest_scaling
+# ------------------------------------------------------------------
+
+class TestSuggestScaling:
+
+    def test_bisect_runs_all_iterations(self):
+        random.seed(8)
+        heroes, enemies = _duel()
+        result = suggest_scaling(heroes, enemies, runs=50, max_iterations=4)
+        assert result["iterations"] == 4
+        assert 0.25 <= result["scale"] <= 4.0
+
+    def test_crn_hits_target_and_stops_early(self):
+        heroes, enemies = _duel()
+        result = suggest_scaling(heroes, enemies, runs=400, search="crn",
+                                 seed=1)
+        assert set(result) == {
+            "scale", "win_rate", "target", "iterations", "scaled_enemies",
+        }
+        assert result["iterations"] < 12
+        assert result["win_rate"] == pytest.approx(0.65, abs=0.08)
+
+    def test_crn_is_deterministic_for_a_seed(self):
+        heroes, enemies = _duel()
+        a = suggest_scaling(heroes, enemies, runs=200, search="crn", seed=3)
+        b = suggest_scaling(heroes, enemies, runs=200, search="crn", seed=3)
+        assert a["scale"] == b["scale"]
+        assert a["win_rate"] == b["win_rate"]
+
+    def test_crn_parallel_matches_serial(self):
+        heroes, enemies = _duel()
+        serial = suggest_scaling(heroes, enemies, runs=100, search="crn",
+                                 seed=4)
+        parallel = suggest_scaling(heroes, enemies, runs=100, search="crn",
+                                   seed=4, workers=2)
+        assert serial["scale"] == parallel["scale"]
+
+    def test_crn_keeps_a_straddling_bracket(self, monkeypatch):
+        import grammar_mvp.monte_carlo as mc
+
+        def bumpy(hp):
+            # Falls overall but with wiggles, like rounded STR/DEF scaling
+            return 1 - hp / 100 + 0.15 * math.sin(hp)
+
+        monkeypatch.setattr(
+            mc, "_probe_win_rate",
+            lambda heroes, scaled, *args: bumpy(scaled[0].max_hp),
+        )
+        heroes, enemies = _duel()
+        updates = list(iter_suggest_scaling(heroes, enemies, runs=100,
+                                            search="crn", seed=1))
+        for update in updates[:-1]:
+            lo_hp = round(enemies[0].max_hp * update["lo"])
+            hi_hp = round(enemies[0].max_hp * update["hi"])
+            assert bumpy(lo_hp) > 0.65 >= bumpy(hi_hp)
+
+    def test_crn_unreachable_target_clamps_to_bound(self):
+        ogres = [Character("Ogre", 200, 200, 30, 10) for _ in range(5)]
+        result = suggest_scaling(_knight(), ogres, runs=100,
+                                 search="crn", seed=5)
+        assert result["scale"] == 0.25
+
+    def test_unknown_search_raises(self):
+        heroes, enemies = _duel()
+        with pytest.raises(ValueError):
+            suggest_scaling(heroes, enemies, search="golden")
+
+
+# ------------------------------------------------------------------
+# optimize_scaling
+# ------------------------------------------------------------------
+
+class TestOptimizeScaling:
+
+    def test_duel_uses_exact_solver(self):
+        heroes, enemies = _duel()
+        result = optimize_scaling(heroes, enemies, grid_steps=7)
+        assert result["method"] == "exact"
+        assert result["simulated_battles"] == 0
+        assert result["pareto"]
+        for p in result["pareto"]:
+            assert abs(p["win_rate"] - 0.65) <= 0.05
+
+    def test_pareto_points_are_not_dominated(self):
+        heroes, enemies = _duel()
+        result = optimize_scaling(heroes, enemies, target_ld50=12,
+                                  grid_steps=7)
+
+        def objectives(p):
+            scales = (p["hp_scale"], p["str_scale"], p["def_scale"])
+            return (
+                abs(p["win_rate"] - 0.65),
+                abs(p["ld50"] - 12),
+                round(sum(math.log(v) ** 2 for v in scales), 6),
+            )
+
+        front = [objectives(p) for p in result["pareto"]]
+        assert len(front) > 1
+        for p in front:
+            for q in front:
+                assert not (q != p and all(a <= b for a, b in zip(q, p)))
+
+    def test_surrogate_battles_do_not_grow_with_grid(self):
+        heroes = [Character("Paladin", 40, 40, 7, 5),
+                  Character("Rogue", 25, 25, 9, 2)]
+        enemies = [Character("Orc", 35, 35, 8, 4) for _ in range(2)]
+        small = optimize_scaling(heroes, enemies, runs=60, grid_steps=5,
+                                 seed=1, verify=False)
+        big = optimize_scaling(heroes, enemies, runs=60, grid_steps=11,
+                               seed=1, verify=False)
+        assert small["method"] == big["method"] == "surrogate"
+        assert big["candidates"] > small["candidates"]
+        assert big["simulated_battles"] == small["simulated_battles"] == 27 * 60
+
+    def test_verified_points_meet_tolerance(self):
+        heroes = [Character("Paladin", 40, 40, 7, 5),
+                  Character("Rogue", 25, 25, 9, 2)]
+        enemies = [Character("Orc", 35, 35, 8, 4) for _ in range(2)]
+        result = optimize_scaling(heroes, enemies, runs=100, grid_steps=7,
+                                  seed=2)
+        for p in result["pareto"]:
+            assert abs(p["win_rate"] - 0.65) <= 0.05
+            assert "predicted_win_rate" in p
+
+
+class TestPotionValues:
+
+    def test_helpful_and_harmful_potions(self):
+        heroes, enemies = _duel()
+        result = potion_values(heroes, enemies, ["E-S3", "P-S3"],
+                               runs=300, seed=5)
+        weaken, curse = result["potions"]
+        assert weaken["delta_win_rate"] > 0.2
+        assert curse["delta_win_rate"] < -0.1
+
+    def test_no_op_potion_matches_baseline_dice(self):
+        # Healing a full-HP hero changes nothing, so with common random
+        # numbers every battle replays the baseline exactly.
+        heroes, enemies = _duel()
+        result = potion_values(heroes, enemies, ["P+H10"], runs=200, seed=3)
+        row = result["potions"][0]
+        assert row["stats"] == result["baseline"]
+        assert row["delta_win_rate"] == 0 and row["delta_ld50"] == 0
+
+    def test_cast_turn_matters_for_heals(self):
+        heroes, enemies = _duel()
+        early = potion_values(heroes, enemies, ["P+H10"], runs=300, seed=3)
+        late = potion_values(heroes, enemies, ["P+H10"], runs=300, seed=3,
+                             cast_turn=3)
+        assert late["potions"][0]["delta_win_rate"] > early["potions"][0]["delta_win_rate"]
+
+    def test_seeded_results_are_cached(self):
+        heroes, enemies = _duel()
+        first = potion_values(heroes, enemies, ["E-H5"], runs=100, seed=9)
+        again = potion_values(heroes, enemies, ["E-H5"], runs=100, seed=9)
+        assert again["potions"][0]["stats"] is first["potions"][0]["stats"]
+
+    def test_cache_is_bounded(self, monkeypatch):
+        import grammar_mvp.monte_carlo as mc
+
+        monkeypatch.setattr(mc, "MAX_POTION_STATS", 3)
+        _POTION_STATS.clear()
+        heroes, enemies = _duel()
+        result = potion_values(heroes, enemies, ["E-H2", "E-H3", "E-H4"],
+                               runs=20, seed=9)
+        assert len(_POTION_STATS) == 3
+        assert [row["notation"] for row in result["potions"]] == [
+            "E-H2", "E-H3", "E-H4"]
+        _POTION_STATS.clear()
+
+    def test_invalid_notation(self):
+        heroes, enemies = _duel()
+        with pytest.raises(ValueError):
+            potion_values(heroes, enemies, ["nonsense"], runs=10, seed=1)
+
+    def test_chance_triggers_use_potion_stream(self):
+        heroes, enemies = _duel()
+        rates = []
+        for global_seed in range(3):
+            _POTION_STATS.clear()
+            random.seed(global_seed)
+            result = potion_values(heroes, enemies, ["E-H3?50%"],
+                                   runs=200, seed=5)
+            rates.append(result["potions"][0]["win_rate"])
+        assert len(set(rates)) == 1
+
+
+# ------------------------------------------------------------------
+# Progress generators
+# ------------------------------------------------------------------
+
+class TestProgress:
+
+    def test_partials_then_full_result(self):
+        heroes, enemies = _duel()
+        updates = list(iter_monte_carlo(heroes, enemies, 1000, seed=3,
+                                        batch_size=300))
+        assert [u["done"] for u in updates] == [300, 600, 900, 1000]
+        assert [u["finished"] for u in updates] == [False] * 3 + [True]
+        for u in updates:
+            lo, hi = u["ci"]
+            assert lo <= u["win_rate"] <= hi
+        assert updates[-1]["result"] == monte_carlo(heroes, enemies, 1000, seed=3)
+
+    def test_parallel_matches_serial(self):
+        heroes, enemies = _knight(), _goblin_pack(2)
+        *_, last = iter_monte_carlo(heroes, enemies, 600, seed=8,
+                                    batch_size=100, workers=2)
+        assert last["result"] == monte_carlo(heroes, enemies, 600, seed=8)
+
+    def test_cancel_stops_early(self):
+        heroes, enemies = _duel()
+        updates = iter_monte_carlo(heroes, enemies, 10_000, batch_size=100,
+                                   workers=2)
+        first = next(updates)
+        updates.close()
+        assert first["done"] == 100 and not first["finished"]
+
+    def test_difficulty_check_updates(self):
+        heroes, enemies = _duel()
+        *partials, last = iter_difficulty_check(heroes, enemies, 0.45,
+                                                runs=400, batch_size=100)
+        assert all(p["verdict"] in ("easy", "fair", "hard") for p in partials)
+        assert last["result"]["runs_used"] == 400
+        assert last["result"]["verdict"] == last["verdict"]
+
+    def test_suggest_scaling_updates(self):
+        heroes, enemies = _duel()
+        updates = list(iter_suggest_scaling(heroes, enemies, 0.6, runs=200,
+                                            search="crn", seed=1))
+        assert not any(u["finished"] for u in updates[:-1])
+        final = updates[-1]["result"]
+        blocking = suggest_scaling(heroes, enemies, 0.6, runs=200,
+                                   search="crn", seed=1)
+        assert (final["scale"], final["win_rate"]) == (
+            blocking["scale"], blocking["win_rate"])
+        for u in updates[:-1]:
+            assert u["lo"] <= u["hi"]
@@ -0,0 +1,116 @@
+"""Tests for background encounter pre-validation."""
+
+import pytest
+
+from grammar_mvp.deck import load_cards, load_starter_deck
+from grammar_mvp.encounters import ENCOUNTERS, get_encounter
+from grammar_mvp.prevalidate import (
+    Prevalidator,
+    ValidationCache,
+    iter_validation,
+    validate_encounter,
+)
+from grammar_mvp.replay import deck_crc
+from grammar_mvp.simulator import simulate
+
+
+@pytest.fixture(scope="module")
+def card_db():
+    return load_cards()
+
+
+@pytest.fixture(scope="module")
+def starter(card_db):
+    return load_starter_deck(card_db)
+
+
+class TestValidateEncounter:
+
+    def test_deck_games(self, starter):
+        result = validate_encounter(get_encounter(4), starter, games=60)
+        assert result["method"] == "deck" and result["policy"] == "greedy"
+        assert result["games"] == 60
+        assert result["deck_crc"] == deck_crc(starter, ordered=False)
+        lo, hi = result["ci"]
+        assert lo <= result["win_rate"] <= hi
+        assert result["verdict"] in ("easy", "fair", "hard")
+
+    def test_potions_beat_baseline(self, starter):
+        # Battle 1's farmer is nearly dead; healing is the way out
+        result = validate_encounter(get_encounter(1), starter, games=100)
+        assert result["baseline"] < 0.01
+        assert result["win_rate"] >= result["baseline"]
+
+    def test_groups_fall_back_to_stats(self, starter):
+        result = validate_encounter(get_encounter(6), starter, games=50)
+        assert result["method"] == "stats" and result["policy"] is None
+
+    def test_batches_match_simulate(self, starter):
+        encounter = get_encounter(4)
+        stats = simulate("greedy", 45, 3, hero=encounter.hero,
+                         enemy=encounter.enemy, starter=starter)
+        result = validate_encounter(encounter, starter, games=45, seed=3,
+                                    batch_size=10)
+        assert result["win_rate"] == stats["win_rate"]
+
+    def test_deck_matters(self, starter):
+        thin = [c for c in starter if c.get("type") == "grammar"][:2]
+        assert deck_crc(thin, ordered=False) != deck_crc(starter, ordered=False)
+        result = validate_encounter(get_encounter(4), thin, games=40)
+        assert result["deck_crc"] == deck_crc(thin, ordered=False)
+        assert result["win_rate"] <= result["baseline"] + 0.2
+
+
+class TestCache:
+
+    def test_iter_validation_skips_cached(self, starter):
+        cache = ValidationCache()
+        ladder = [get_encounter(1), get_encounter(2)]
+        first = list(iter_validation(ladder, starter, cache, games=20,
+                                     batch_size=10))
+        assert len(first) == 6  # two batches and a result per encounter
+        assert sum(u["result"] is not None for u in first) == 2
+        assert first[-1]["finished"] and len(cache) == 2
+        again = list(iter_validation(ladder, starter, cache, games=20))
+        assert all(u["result"] is None for u in again)
+
+
+class TestPrevalidator:
+
+    def test_background_fills_cache(self, card_db, starter):
+        pre = Prevalidator(card_db, games=20)
+        pre.start(starter)
+        assert pre.wait(30)
+        assert not pre.busy
+        for encounter in ENCOUNTERS:
+            assert pre.get(encounter.number)["number"] == encounter.number
+
+    def test_get_never_blocks(self, card_db):
+        pre = Prevalidator(card_db, games=5000)
+        assert pre.get(1) is None  # nothing started
+        pre.start()
+        pre.get(7)  # returns at once, validated or not
+        pre.stop()
+        assert pre.wait(30)
+
+    def test_cancel_lands_mid_encounter(self, card_db, starter):
+        pre = Prevalidator(card_db, encounters=[get_encounter(4)],
+                           games=100000, batch_size=5)
+        pre.start(starter)
+        pre.stop()
+        assert pre.wait(10)
+        assert pre.get(4) is None
+
+    def test_deck_change_restarts(self, card_db, starter):
+        pre = Prevalidator(card_db, encounters=[get_encounter(3)], games=20)
+        pre.start(starter)
+        task = pre.task
+        pre.deck_changed(list(starter))  # same cards: no restart
+        assert pre.task is task
+        pre.deck_changed(starter[::-1])  # order doesn't matter here
+        assert pre.task is task
+        smaller = starter[:-1]
+        pre.deck_changed(smaller)
+        assert pre.task is not task and pre.crc == deck_crc(smaller, ordered=False)
+        assert pre.wait(30)
+        assert pre.get(3)["deck_crc"] == deck_crc(smaller, ordered=False)
@@ -0,0 +1,119 @@
+"""Tests for the headless engine and binary replays."""
+
+import random
+
+import pytest
+
+from grammar_mvp.engine import BattleEngine
+from grammar_mvp.replay import (
+    VERSION,
+    ReplayDesyncError,
+    ReplayError,
+    decode,
+    encode,
+    record,
+    replay,
+    replay_many,
+)
+
+
+def _session(seed):
+    """Play one session with random docking and casting."""
+    engine = BattleEngine(seed)
+    rng = random.Random(seed)
+    while engine.playing:
+        if engine.state.phase == "build" and engine.state.hand:
+            for _ in range(rng.randint(1, 4)):
+                if engine.state.hand and engine.take(
+                        rng.randrange(len(engine.state.hand))) is not None:
+                    if not engine.dock(rng.randrange(engine.state.slot_count)):
+                        engine.return_to_hand(0)
+            engine.cast()
+        engine.play_turn()
+    return engine
+
+
+def _log(engine):
+    log = engine.state.battle_log
+    return [str(entry) for entry in log], log.total
+
+
+class TestBattleEngine:
+
+    def test_same_seed_same_session(self):
+        assert _log(_session(4)) == _log(_session(4))
+
+    def test_preview_then_build(self):
+        engine = BattleEngine(1)
+        assert engine.state.phase == "preview"
+        assert len(engine.state.hand) == engine.state.hand_size
+        engine.run_to(3)
+        assert engine.state.phase in ("build", "reward", "gameover")
+
+    def test_dock_costs_mana_and_lift_refunds(self):
+        engine = BattleEngine(1)
+        engine.run_to(3)
+        assert engine.take(0) is not None
+        assert engine.dock(2)
+        assert engine.state.mana == 9 and engine.state.lock[2]
+        assert engine.lift(2) is not None
+        assert engine.state.mana == 10 and engine.state.lock[2] is None
+        assert engine.return_to_hand(99)
+        assert [k for k, _, _ in engine.inputs] == ["take", "dock", "lift", "return"]
+
+    def test_inputs_rejected_outside_build(self):
+        engine = BattleEngine(1)
+        assert engine.take(0) is None
+        assert engine.cast() == (False, "")
+        assert engine.inputs == []
+
+
+class TestReplay:
+
+    def test_round_trip_encoding(self):
+        rep = record(_session(7))
+        data = encode(rep)
+        assert decode(data) == rep
+        assert len(data) < 64 + 4 * len(rep.inputs)
+
+    def test_replay_reproduces_session(self):
+        for seed in range(10):
+            engine = _session(seed)
+            again = replay(decode(encode(record(engine))))
+            assert _log(again) == _log(engine)
+            assert again.result == engine.result
+
+    def test_tampered_input_desyncs(self):
+        rep = record(_session(2))
+        assert rep.inputs
+        kind, turn, arg = rep.inputs[0]
+        rep.inputs[0] = (kind, turn + 1, arg)
+        rep.final_turn += 40
+        with pytest.raises(ReplayDesyncError):
+            replay(rep)
+
+    def test_reordered_deck_rejected(self):
+        engine = _session(3)
+        rep = record(engine)
+        with pytest.raises(ReplayDesyncError, match="deck differs"):
+            replay(rep, starter=engine.starter[::-1])
+
+    def test_corrupt_data_rejected(self):
+        data = encode(record(_session(2)))
+        with pytest.raises(ReplayError):
+            decode(data[:-3])
+        with pytest.raises(ReplayError):
+            decode(b"XXXX" + data[4:])
+        with pytest.raises(ReplayError, match=f"version {VERSION} "):
+            decode(data[:4] + bytes([VERSION + 1]) + data[5:])
+
+    def test_long_fighter_name_rejected(self):
+        rep = record(_session(2))
+        rep.hero = ("é" * 128, *rep.hero[1:])
+        with pytest.raises(ReplayError, match="too long"):
+            encode(rep)
+
+    def test_replay_many(self):
+        engines = [_session(seed) for seed in range(5)]
+        blobs = [encode(record(e)) for e in engines]
+        assert replay_many(blobs) == [(e.state.turn, e.result) for e in engines]
@@ -0,0 +1,147 @@
+"""Tests for the SQLite matchup result cache."""
+
+import pytest
+
+from grammar_mvp.game_state import Character
+from grammar_mvp.monte_carlo import (
+    aggregate_outcomes,
+    monte_carlo,
+    simulate_outcomes,
+    suggest_scaling,
+)
+from grammar_mvp.result_cache import ResultCache, team_signature
+
+
+def _teams(enemy_hp=25):
+    return ([Character("Hero", 30, 30, 6, 3)],
+            [Character("Goblin", enemy_hp, enemy_hp, 7, 3)])
+
+
+@pytest.fixture
+def cache():
+    with ResultCache() as c:
+        yield c
+
+
+class TestStore:
+
+    def test_signature_ignores_names(self):
+        a = [Character("A", 30, 30, 6, 3)]
+        b = [Character("B", 30, 30, 6, 3)]
+        assert team_signature(a) == team_signature(b)
+        assert team_signature(a) != team_signature([Character("A", 29, 30, 6, 3)])
+
+    def test_second_call_is_a_lookup(self, cache):
+        heroes, enemies = _teams()
+        first = monte_carlo(heroes, enemies, 300, seed=5, cache=cache)
+        assert cache.simulated == 300
+        again = monte_carlo(heroes, enemies, 300, seed=5, cache=cache)
+        assert cache.simulated == 300 and cache.hits == 1
+        assert again == first
+
+    def test_stats_match_aggregate_outcomes(self, cache):
+        heroes, enemies = _teams()
+        outcomes = simulate_outcomes(heroes, enemies, 500, seed=11)
+        cache.add(heroes, enemies, True, 11, outcomes)
+        stored = cache.lookup(heroes, enemies, True, 11)
+        expected = aggregate_outcomes(outcomes)
+        assert set(stored) == set(expected)
+        for key, value in expected.items():
+            assert stored[key] == pytest.approx(value), key
+
+    def test_results_are_additive(self, cache):
+        heroes, enemies = _teams()
+        monte_carlo(heroes, enemies, 1000, seed=3, cache=cache)
+        merged = monte_carlo(heroes, enemies, 5000, seed=3, cache=cache)
+        assert cache.simulated == 5000
+        whole = monte_carlo(heroes, enemies, 5000, seed=3)
+        assert merged["runs"] == 5000
+        for key, value in whole.items():
+            assert merged[key] == pytest.approx(value), key
+
+    def test_seeded_answer_covers_exactly_its_seeds(self, cache):
+        heroes, enemies = _teams()
+        monte_carlo(heroes, enemies, 400, seed=0, cache=cache)
+        smaller = monte_carlo(heroes, enemies, 100, seed=0, cache=cache)
+        assert smaller == monte_carlo(heroes, enemies, 100, seed=0)
+        # Overlapping blocks tile a later request without re-simulating
+        simulated = cache.simulated
+        shifted = monte_carlo(heroes, enemies, 300, seed=100, cache=cache)
+        assert shifted == monte_carlo(heroes, enemies, 300, seed=100)
+        assert cache.simulated == simulated + 300
+        assert monte_carlo(heroes, enemies, 400, seed=0, cache=cache)["runs"] == 400
+        assert cache.simulated == simulated + 300
+
+    def test_unseeded_pools_every_battle(self, cache):
+        heroes, enemies = _teams()
+        monte_carlo(heroes, enemies, 400, cache=cache)
+        assert monte_carlo(heroes, enemies, 100, cache=cache)["runs"] == 400
+
+    def test_key_separates_seed_and_first_strike(self, cache):
+        heroes, enemies = _teams()
+        monte_carlo(heroes, enemies, 100, seed=1, cache=cache)
+        assert cache.lookup(heroes, enemies, True, 2) is None
+        assert cache.lookup(heroes, enemies, False, 1) is None
+        assert cache.lookup(heroes, enemies, True, None) is None
+
+    def test_negative_seed_is_not_unseeded(self, cache):
+        heroes, enemies = _teams()
+        monte_carlo(heroes, enemies, 100, seed=-1, cache=cache)
+        assert cache.lookup(heroes, enemies, True, None) is None
+        assert cache.lookup(heroes, enemies, True, -1, runs=100)["runs"] == 100
+
+    def test_engine_version_separates(self, cache, monkeypatch):
+        heroes, enemies = _teams()
+        monte_carlo(heroes, enemies, 100, seed=1, cache=cache)
+        monkeypatch.setattr("grammar_mvp.result_cache.ENGINE_VERSION", 2)
+        assert cache.lookup(heroes, enemies, True, 1) is None
+
+    def test_fighters_with_effects_bypass_the_store(self, cache):
+        heroes, enemies = _teams()
+        heroes[0].active_effects.add({"stat": "strength", "magnitude": 2}, 3)
+        monte_carlo(heroes, enemies, 50, seed=0, cache=cache)
+        assert cache.query() == []
+
+    def test_persists_on_disk(self, tmp_path):
+        heroes, enemies = _teams()
+        path = tmp_path / "results.db"
+        with ResultCache(path) as c:
+            monte_carlo(heroes, enemies, 200, seed=0, cache=c)
+        with ResultCache(path) as c:
+            assert c.lookup(heroes, enemies, True, 0)["runs"] == 200
+
+
+class TestQueries:
+
+    def test_range_query_by_stat(self, cache):
+        for hp in (15, 20, 25, 30, 35):
+            monte_carlo(*_teams(hp), 50, seed=0, cache=cache)
+        rows = cache.query(enemy_hp=(20, 30))
+        assert [r["enemy_hp"] for r in rows] == [20, 25, 30]
+        assert all(r["stats"]["runs"] == 50 for r in rows)
+        assert [r["enemy_hp"] for r in cache.query(enemy_hp=35, seed=0)] == [35]
+
+    def test_unknown_column_rejected(self, cache):
+        with pytest.raises(ValueError):
+            cache.query(hero_luck=(1, 2))
+
+    def test_repeated_scaling_search_is_served_from_store(self, cache):
+        heroes, enemies = _teams()
+        first = suggest_scaling(heroes, enemies, 0.6, runs=200, seed=4,
+                                search="crn", cache=cache)
+        simulated = cache.simulated
+        again = suggest_scaling(heroes, enemies, 0.6, runs=200, seed=4,
+                                search="crn", cache=cache)
+        assert cache.simulated == simulated
+        assert again["scale"] == first["scale"]
+
+    def test_scaling_search_ignores_earlier_runs(self, cache):
+        heroes, enemies = _teams()
+        suggest_scaling(heroes, enemies, 0.6, runs=400, seed=1,
+                        search="crn", cache=cache)
+        cached = suggest_scaling(heroes, enemies, 0.6, runs=100, seed=1,
+                                 search="crn", cache=cache)
+        fresh = suggest_scaling(heroes, enemies, 0.6, runs=100, seed=1,
+                                search="crn")
+        assert cached["scale"] == fresh["scale"]
+        assert cached["win_rate"] == fresh["win_rate"]
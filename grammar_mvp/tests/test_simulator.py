@@ -0,0 +1,70 @@
+"""Tests for the headless full-game simulator."""
+
+import pytest
+
+from grammar_mvp.deck import load_cards
+from grammar_mvp.engine import BattleEngine
+from grammar_mvp.simulator import (
+    POLICIES,
+    spellings,
+    greedy_policy,
+    play_game,
+    simulate,
+)
+
+
+def _hand(*ids):
+    card_db = load_cards()
+    return [dict(card_db[cid]) for cid in ids]
+
+
+class TestSpellings:
+
+    def test_spells_core_potion_with_optional_parts(self):
+        hand = _hand("target_P", "effect_plus", "stat_S", "mag_5", "dur_3T")
+        notations = {n for _, n in spellings(hand)}
+        assert notations == {"P+S5", "P+S53T"}
+
+    def test_incomplete_hand_spells_nothing(self):
+        hand = _hand("target_P", "effect_plus", "mag_5")
+        assert list(spellings(hand)) == []
+
+
+class TestPolicies:
+
+    def test_greedy_casts_a_helpful_potion(self):
+        engine = BattleEngine(0)
+        engine.run_to(3)
+        engine.state.hand = _hand("target_P", "effect_plus", "stat_S", "mag_10")
+        greedy_policy(engine, None)
+        assert engine.state.phase == "post_cast"
+        assert engine.state.hero.strength == 16
+        assert engine.state.mana == 6
+
+    def test_greedy_skips_harmful_potion(self):
+        engine = BattleEngine(0)
+        engine.run_to(3)
+        engine.state.hand = _hand("target_P", "effect_minus", "stat_S", "mag_10")
+        greedy_policy(engine, None)
+        assert engine.state.phase == "build"
+        assert engine.inputs == []
+
+
+class TestSimulate:
+
+    @pytest.mark.parametrize("policy", sorted(POLICIES))
+    def test_every_policy_finishes_games(self, policy):
+        for seed in range(20):
+            outcome = play_game(POLICIES[policy], seed)
+            assert outcome["result"] in ("win", "lose")
+            assert outcome["heroes_fallen"] + outcome["enemies_fallen"] == 1
+
+    def test_seeded_runs_repeat(self):
+        assert simulate("greedy", 50, seed=3) == simulate("greedy", 50, seed=3)
+
+    def test_idle_never_casts(self):
+        assert simulate("idle", 50)["avg_casts"] == 0
+
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError):
+            simulate("psychic", 10)
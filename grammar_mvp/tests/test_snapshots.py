@@ -0,0 +1,140 @@
+"""Tests for GameState forks, snapshots and rollback."""
+
+import random
+
+from grammar_mvp.battle import apply_potion, resolve_attack, tick_effects
+from grammar_mvp.game_state import Character, GameState
+from grammar_mvp.snapshots import clone_character, fork, restore, snapshot
+
+
+def _make_state():
+    deck = [{"id": f"card{i}"} for i in range(6)]
+    return GameState(
+        hero=Character("Hero", 40, 40, 10, 5),
+        enemy=Character("Enemy", 25, 25, 7, 3),
+        mana=10, max_mana=10,
+        deck=deck[2:], hand=deck[:2], lock=[None] * 5,
+        slot_count=5, hand_size=5, phase="build",
+    )
+
+
+def _buff(turns=2, trigger=None):
+    parsed = {
+        "target": "P",
+        "effect_type": "+",
+        "stat_affected": "S",
+        "magnitude": {"value": 50, "is_percentage": True, "is_full": False},
+        "duration": {"value": turns, "range_start": None, "range_end": None,
+                     "type": "T"},
+    }
+    if trigger:
+        parsed["trigger"] = {"type": trigger, "chance": None,
+                             "condition": None}
+    return parsed
+
+
+class TestFork:
+
+    def test_fork_is_independent(self):
+        state = _make_state()
+        child = fork(state)
+        child.hero.hp = 1
+        child.hand.append(child.deck.pop())
+        child.mana = 0
+        assert state.hero.hp == 40
+        assert len(state.hand) == 2 and len(state.deck) == 4
+        assert state.mana == 10
+
+    def test_fork_shares_card_dicts(self):
+        state = _make_state()
+        child = fork(state)
+        assert child.deck is not state.deck
+        assert all(a is b for a, b in zip(child.deck, state.deck))
+
+    def test_effects_are_copied_with_their_modifiers(self):
+        state = _make_state()
+        apply_potion(_buff(), state)
+        child = fork(state)
+        assert child.hero.strength == 15
+        tick_effects(child.hero)
+        tick_effects(child.hero)
+        assert child.hero.strength == 10
+        assert state.hero.strength == 15
+        assert len(state.hero.active_effects) == 1
+
+    def test_triggers_follow_the_forked_fighters(self):
+        state = _make_state()
+        apply_potion(_buff(trigger="<D"), state)
+        child = fork(state)
+        resolve_attack(child.enemy, child.hero, random.Random(0),
+                       bus=child.triggers)
+        assert child.hero.strength == 15
+        assert state.hero.strength == 10
+        assert len(child.triggers) == len(state.triggers) == 1
+
+    def test_fork_log_is_detached(self):
+        state = _make_state()
+        state.battle_log.append("before")
+        child = fork(state)
+        child.battle_log.append("after")
+        assert list(state.battle_log) == ["before"]
+        assert list(child.battle_log) == ["before", "after"]
+
+    def test_fork_shares_log_ring_until_written(self):
+        state = _make_state()
+        state.battle_log.append("before")
+        child = fork(state)
+        assert child.battle_log._ring is state.battle_log._ring
+        state.battle_log.append("parent")
+        assert list(child.battle_log) == ["before"]
+        assert list(state.battle_log) == ["before", "parent"]
+
+    def test_clone_character_fast_path(self):
+        hero = Character("Hero", 40, 40, 10, 5)
+        hero.active_effects.tick()
+        clone = clone_character(hero)
+        assert clone is not hero and clone.hp == hero.hp
+        assert clone.active_effects is not hero.active_effects
+        assert clone.active_effects.turn == 1
+
+
+class TestSnapshotRestore:
+
+    def test_restore_rolls_back_in_place(self):
+        state = _make_state()
+        snap = snapshot(state)
+        apply_potion(_buff(), state)
+        state.hero.hp = 3
+        state.hand.clear()
+        state.phase = "resolve"
+        restore(state, snap)
+        assert state.hero.hp == 40
+        assert state.hero.strength == 10
+        assert len(state.hand) == 2
+        assert state.phase == "build"
+
+    def test_snapshot_survives_repeated_restores(self):
+        state = _make_state()
+        snap = snapshot(state)
+        for _ in range(3):
+            state.hero.hp -= 10
+            restore(state, snap)
+        assert state.hero.hp == 40
+        assert snap.hero.hp == 40
+
+    def test_restore_binds_triggers_to_live_state(self):
+        state = _make_state()
+        bound = []
+
+        def armed(target):
+            def action(character, rng=random):
+                bound.append(target)
+            action.rebind = armed
+            return action
+
+        state.triggers.subscribe(state.hero, "<D", armed(state))
+        snap = snapshot(state)
+        restore(state, snap)
+        resolve_attack(state.enemy, state.hero, random.Random(0),
+                       bus=state.triggers)
+        assert bound == [state]
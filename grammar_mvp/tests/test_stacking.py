@@ -0,0 +1,122 @@
+"""Tests for stacking effects — counted records instead of duplicates."""
+
+import random
+
+from grammar_mvp.battle import apply_potion, resolve_attack, tick_effects
+from grammar_mvp.effects import EffectTimeline
+from grammar_mvp.game_state import Character, GameState
+
+
+def _make_state(strength=10):
+    return GameState(
+        hero=Character("Hero", 40, 40, strength, 5),
+        enemy=Character("Enemy", 25, 25, 7, 3),
+        mana=10, max_mana=10,
+        deck=[], hand=[], lock=[None] * 5,
+        slot_count=5, hand_size=5, phase="build",
+    )
+
+
+def _buff(value=2, turns=3, pct=False, flags=None, behaviour=None, cap=None):
+    parsed = {
+        "target": "P",
+        "effect_type": "+",
+        "stat_affected": "S",
+        "magnitude": {"value": value, "is_percentage": pct, "is_full": False},
+        "duration": {"value": turns, "range_start": None, "range_end": None,
+                     "type": "T"},
+    }
+    if flags:
+        parsed["special_flags"] = flags
+    if behaviour:
+        parsed["stacking_behavior"] = {"type": behaviour, "value": cap}
+    return parsed
+
+
+class TestTimelineReschedule:
+
+    def test_reschedule_moves_expiry(self):
+        timeline = EffectTimeline()
+        effect = timeline.add({"name": "x"}, 1, key="x")
+        timeline.reschedule(effect, 3)
+        assert timeline.tick() == []
+        assert len(timeline) == 1
+        timeline.tick()
+        assert timeline.tick() == [effect]
+        assert timeline.find("x") is None
+        assert len(timeline) == 0
+
+    def test_iter_skips_stale_entries(self):
+        timeline = EffectTimeline()
+        effect = timeline.add({}, 2)
+        timeline.reschedule(effect, 5)
+        assert list(timeline) == [effect]
+
+
+class TestStacking:
+
+    def test_stacks_merge_into_one_record(self):
+        state = _make_state()
+        for _ in range(5):
+            log = apply_potion(_buff(flags=["ST"]), state)
+        hero = state.hero
+        assert hero.strength == 20
+        assert len(hero.active_effects) == 1
+        assert len(hero.modifiers) == 1
+        assert log.endswith("[x5]")
+
+    def test_max_stacks(self):
+        state = _make_state()
+        for _ in range(5):
+            apply_potion(_buff(behaviour="S", cap=3), state)
+        assert state.hero.strength == 16
+
+    def test_restack_refreshes_duration(self):
+        state = _make_state()
+        apply_potion(_buff(flags=["ST"]), state)
+        tick_effects(state.hero)
+        tick_effects(state.hero)
+        apply_potion(_buff(flags=["ST"]), state)
+        for _ in range(2):
+            tick_effects(state.hero)
+        assert state.hero.strength == 14
+        tick_effects(state.hero)
+        assert state.hero.strength == 10
+        assert len(state.hero.active_effects) == 0
+
+    def test_add_duration_extends_without_stacking(self):
+        state = _make_state()
+        apply_potion(_buff(turns=2, behaviour="S+"), state)
+        apply_potion(_buff(turns=2, behaviour="S+"), state)
+        assert state.hero.strength == 12
+        for _ in range(3):
+            tick_effects(state.hero)
+        assert state.hero.strength == 12
+        tick_effects(state.hero)
+        assert state.hero.strength == 10
+
+    def test_multiply_effect_doubles_per_stack(self):
+        state = _make_state()
+        for _ in range(3):
+            apply_potion(_buff(value=10, pct=True, behaviour="S*"), state)
+        assert state.hero.strength == 14  # 10% → 20% → 40%
+
+    def test_unique_stacking_is_per_source(self):
+        state = _make_state()
+        state.hero.hp = 40
+        parsed = _buff(value=20, pct=True, behaviour="SU")
+        parsed["trigger"] = {"type": "<D", "chance": None, "condition": None}
+        apply_potion(parsed, state)
+        apply_potion(parsed, state)
+        rng = random.Random(0)
+        for _ in range(3):
+            resolve_attack(state.enemy, state.hero, rng, bus=state.triggers)
+        # Two armed sources → two records; repeated firings only refresh.
+        assert state.hero.strength == 14
+        assert len(state.hero.modifiers) == 2
+
+    def test_non_stacking_effects_stay_independent(self):
+        state = _make_state()
+        apply_potion(_buff(), state)
+        apply_potion(_buff(), state)
+        assert len(state.hero.active_effects) == 2
@@ -0,0 +1,106 @@
+"""Tests for balance parameter sweeps."""
+
+import pytest
+
+from grammar_mvp.exact import exact_duel
+from grammar_mvp.game_state import Character
+from grammar_mvp.monte_carlo import monte_carlo
+from grammar_mvp.result_cache import ResultCache
+from grammar_mvp.sweep import (
+    evaluate_cell,
+    grid,
+    parse_axis,
+    read_csv,
+    sweep,
+    write_csv,
+)
+
+
+class TestAxes:
+
+    def test_parse_axis_forms(self):
+        assert parse_axis("7") == [7]
+        assert parse_axis("4,6,9") == [4, 6, 9]
+        assert parse_axis("20:30:5") == [20, 25, 30]
+        assert parse_axis("1:3") == [1, 2, 3]
+        with pytest.raises(ValueError):
+            parse_axis("1:5:0")
+
+    def test_grid_is_cartesian_with_defaults(self):
+        cells = grid({"hero_hp": [20, 30], "enemy_count": [1, 2, 3]})
+        assert len(cells) == 6
+        assert all(c["enemy_str"] == 7 for c in cells)
+        with pytest.raises(ValueError):
+            grid({"hero_luck": [1]})
+
+
+class TestEvaluate:
+
+    def test_one_on_one_cells_are_exact(self):
+        row = evaluate_cell(grid({})[0], runs=100, hero_first=True, seed=0)
+        duel = exact_duel(Character("H", 30, 30, 6, 3), Character("E", 25, 25, 7, 3))
+        assert row["method"] == "exact"
+        assert row["win_rate"] == duel["win_rate"]
+        assert row["p10"] <= row["p50"] <= row["p90"]
+
+    def test_team_cells_use_seeded_monte_carlo(self):
+        cell = grid({"enemy_count": [2]})[0]
+        row = evaluate_cell(cell, runs=200, hero_first=True, seed=4)
+        stats = monte_carlo([Character("H", 30, 30, 6, 3)],
+                            [Character("E", 25, 25, 7, 3)] * 2, 200, True, 4)
+        assert row["method"] == "monte_carlo"
+        assert row["win_rate"] == stats["win_rate"]
+        assert row["p50"] == stats["p50_turns"]
+
+
+class TestSweep:
+
+    def test_rows_follow_grid_order(self):
+        axes = {"hero_hp": [20, 40], "enemy_count": [1, 2]}
+        rows = sweep(axes, runs=50, seed=1)
+        assert [(r["hero_hp"], r["enemy_count"]) for r in rows] == [
+            (20, 1), (20, 2), (40, 1), (40, 2)]
+
+    def test_parallel_matches_serial(self):
+        axes = {"hero_hp": [20, 40], "enemy_count": [2, 3]}
+        assert sweep(axes, runs=50, seed=1, workers=2) == sweep(axes, runs=50, seed=1)
+
+    def test_previous_rows_are_reused(self, tmp_path):
+        path = tmp_path / "sweep.csv"
+        axes = {"enemy_count": [2, 3]}
+        write_csv(sweep(axes, runs=50, seed=1), path)
+        previous = read_csv(path)
+        calls = []
+        rows = sweep({"enemy_count": [2, 3, 4]}, runs=50, seed=1,
+                     previous=previous, progress=lambda d, t: calls.append(d))
+        assert rows[0] is previous[0] and rows[1] is previous[1]
+        assert rows[2]["method"] == "monte_carlo"
+        assert calls[0] == 2 and calls[-1] == 3
+
+    def test_changed_runs_are_recomputed(self, tmp_path):
+        path = tmp_path / "sweep.csv"
+        write_csv(sweep({"enemy_count": [2]}, runs=50, seed=1), path)
+        rows = sweep({"enemy_count": [2]}, runs=60, seed=1,
+                     previous=read_csv(path))
+        assert rows[0]["runs"] == 60
+
+    def test_turn_order_is_part_of_the_key(self, tmp_path):
+        path = tmp_path / "sweep.csv"
+        axes = {"enemy_count": [1, 2]}
+        write_csv(sweep(axes, runs=50, seed=1, hero_first=False), path)
+        previous = read_csv(path)
+        rows = sweep(axes, runs=50, seed=1, previous=previous)
+        assert rows[0] is previous[0]  # exact: turn order doesn't matter
+        assert rows[1] is not previous[1] and rows[1]["hero_first"] == 1
+
+    def test_cells_go_through_the_result_cache(self, monkeypatch):
+        axes = {"enemy_count": [2, 3]}
+        with ResultCache() as cache:
+            first = sweep(axes, runs=50, seed=1, cache=cache)
+            assert [r["enemy_count"] for r in cache.query()] == [2, 3]
+            assert first == sweep(axes, runs=50, seed=1)
+
+            def fail(*args):
+                raise AssertionError("cell was re-simulated")
+            monkeypatch.setattr("grammar_mvp.sweep.simulate_outcomes", fail)
+            assert sweep(axes, runs=50, seed=1, workers=2, cache=cache) == first
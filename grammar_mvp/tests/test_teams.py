@@ -0,0 +1,156 @@
+"""Tests for team stats and area-targeted potions."""
+
+import random
+
+from grammar_mvp.battle import apply_potion
+from grammar_mvp.game_state import Character, GameState
+from grammar_mvp.monte_carlo import BattleArena, monte_carlo, run_battle
+from grammar_mvp.teams import TeamStats
+
+
+def _thieves(n=3):
+    return [Character("Thief", 18, 18, 9, 5) for _ in range(n)]
+
+
+def _paladin():
+    return Character("Paladin", 50, 50, 14, 12)
+
+
+def _overwhelm_state():
+    paladin, thieves = _paladin(), _thieves()
+    return GameState(
+        hero=paladin, enemy=thieves[0],
+        mana=10, max_mana=10,
+        deck=[], hand=[], lock=[None] * 5,
+        slot_count=5, hand_size=5, phase="build",
+        heroes=[paladin], enemies=thieves,
+    )
+
+
+def _parsed(target, effect_type, stat, value, pct=False, duration=None):
+    parsed = {
+        "target": target,
+        "effect_type": effect_type,
+        "stat_affected": stat,
+        "magnitude": {"value": value, "is_percentage": pct, "is_full": False},
+    }
+    if duration:
+        parsed["duration"] = duration
+    return parsed
+
+
+class TestTeamStats:
+
+    def test_batched_damage_clamps_at_zero(self):
+        team = TeamStats.from_characters(
+            [Character("A", 4, 20, 5, 5), Character("B", 15, 20, 5, 5)])
+        assert team.apply("H", "-", 5)
+        assert team.hp == [0, 10]
+
+    def test_heal_skips_fallen_and_caps(self):
+        team = TeamStats.from_characters(
+            [Character("A", 0, 20, 5, 5), Character("B", 15, 20, 5, 5)])
+        team.apply("H", "+", 50, is_percentage=True)
+        assert team.hp == [0, 20]
+
+    def test_stat_ops(self):
+        team = TeamStats.from_characters(_thieves(2))
+        team.apply("S", "-", 5)
+        assert team.strength == [4, 4]
+        team.apply("D", "*", 2)
+        assert team.defense == [10, 10]
+        team.apply("S", "=", 7, index=1)
+        assert team.strength == [4, 7]
+
+    def test_unknown_stat_is_rejected(self):
+        team = TeamStats.from_characters(_thieves(1))
+        assert not team.apply("L", "+", 5)
+
+    def test_drop_fallen_keeps_columns_aligned(self):
+        team = TeamStats.from_characters(
+            [Character("A", 0, 20, 1, 1), Character("B", 5, 20, 2, 2)])
+        assert team.drop_fallen() == 1
+        assert team.names == ["B"]
+        assert team.strength == [2]
+
+
+class TestAreaPotions:
+
+    def test_default_teams_are_the_leads(self):
+        state = _overwhelm_state()
+        plain = GameState(
+            hero=state.hero, enemy=state.enemy, mana=0, max_mana=0,
+            deck=[], hand=[], lock=[], slot_count=0, hand_size=0,
+            phase="build",
+        )
+        assert plain.heroes == [state.hero]
+        assert plain.enemies == [state.enemy]
+
+    def test_all_enemies_lose_strength(self):
+        state = _overwhelm_state()
+        log = apply_potion(_parsed("X", "-", "S", 5), state)
+        assert [t.strength for t in state.enemies] == [4, 4, 4]
+        assert state.hero.strength == 14
+        assert log.startswith("All enemies -5 STRENGTH!")
+        assert log.count("9→4") == 3
+
+    def test_global_hits_both_sides(self):
+        state = _overwhelm_state()
+        apply_potion(_parsed("G", "-", "H", 10), state)
+        assert state.hero.hp == 40
+        assert [t.hp for t in state.enemies] == [8, 8, 8]
+
+    def test_fallen_members_are_skipped(self):
+        state = _overwhelm_state()
+        state.enemies[1].hp = 0
+        apply_potion(_parsed("X", "+", "H", 5), state)
+        assert [t.hp for t in state.enemies] == [18, 0, 18]
+
+    def test_timed_area_buff_rolls_once(self):
+        state = _overwhelm_state()
+        state.heroes.append(Character("Squire", 20, 20, 6, 4))
+        log = apply_potion(
+            _parsed("A", "+", "S", 4, duration={
+                "value": None, "range_start": 1, "range_end": 3, "type": "T"}),
+            state, random.Random(1),
+        )
+        remaining = {next(iter(c.active_effects))["expires_at"]
+                     for c in state.heroes}
+        assert len(remaining) == 1
+        assert log.endswith(f"for {remaining.pop()} turns")
+
+
+class TestArenaCast:
+
+    def test_cast_matches_prebuffed_characters(self):
+        arena = BattleArena([_paladin()], _thieves())
+        assert arena.cast(_parsed("X", "-", "S", 5))
+        weakened = [Character("Thief", 18, 18, 4, 5) for _ in range(3)]
+        for seed in range(20):
+            assert (arena.run(rng=random.Random(seed))
+                    == run_battle([_paladin()], weakened, rng=random.Random(seed)))
+
+    def test_area_damage_removes_the_dead(self):
+        arena = BattleArena([_paladin()], _thieves())
+        arena.cast(_parsed("X", "-", "H", 18))
+        outcome = arena.run(rng=random.Random(0))
+        assert outcome["result"] == "win"
+        assert outcome["turns"] == 0
+        assert outcome["enemies_fallen"] == 3
+
+    def test_timed_effects_are_not_cast(self):
+        arena = BattleArena([_paladin()], _thieves())
+        assert not arena.cast(_parsed("X", "-", "S", 5, duration={
+            "value": 3, "range_start": None, "range_end": None, "type": "T"}))
+        assert arena.enemy_team.strength == [9, 9, 9]
+
+    def test_overwhelm_area_debuff_helps(self):
+        baseline = monte_carlo([_paladin()], _thieves(), 400, seed=7)
+        arena = BattleArena([_paladin()], _thieves())
+        arena.cast(_parsed("X", "-", "S", 5))
+        rng = random.Random()
+        wins = 0
+        for i in range(400):
+            rng.seed(7 + i)
+            wins += arena.run(rng=rng)["result"] == "win"
+        assert wins / 400 > baseline["win_rate"]
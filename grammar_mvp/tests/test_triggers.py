@@ -0,0 +1,132 @@
+"""Tests for the trigger bus and triggered potions."""
+
+import random
+
+from grammar_mvp.battle import (
+    apply_potion,
+    begin_turn,
+    resolve_attack,
+    tick_effects,
+)
+from grammar_mvp.game_state import Character, GameState
+from grammar_mvp.triggers import TriggerBus, parse_condition
+
+
+def _make_state():
+    return GameState(
+        hero=Character("Knight", 40, 40, 10, 12),
+        enemy=Character("Assassin", 25, 25, 18, 4),
+        mana=10, max_mana=10,
+        deck=[], hand=[], lock=[None] * 5,
+        slot_count=5, hand_size=5, phase="build",
+    )
+
+
+def _parsed(target, effect_type, stat, value, trigger, duration=None):
+    parsed = {
+        "target": target,
+        "effect_type": effect_type,
+        "stat_affected": stat,
+        "magnitude": {"value": value, "is_percentage": False,
+                      "is_full": False},
+        "trigger": {"type": None, "chance": None, "condition": None,
+                    **trigger},
+    }
+    if duration:
+        parsed["duration"] = duration
+    return parsed
+
+
+class TestTriggerBus:
+
+    def test_emit_only_touches_subscribers(self):
+        bus = TriggerBus()
+        a, b = Character("A", 10, 10, 1, 1), Character("B", 10, 10, 1, 1)
+        hits = []
+        bus.subscribe(a, ">A", lambda c, rng: hits.append(c.name))
+        assert bus.emit(">A", b) == 0
+        assert bus.emit("<D", a) == 0
+        assert bus.emit(">A", a) == 1
+        assert hits == ["A"]
+        assert bus.counts == {"events": 3, "checked": 1, "rolled": 0,
+                              "fired": 1}
+
+    def test_chance_rolls_are_batched(self):
+        bus = TriggerBus(random.Random(5))
+        owner = Character("A", 10, 10, 1, 1)
+        bus.subscribe(owner, "^S", lambda c, rng: None, chance=30)
+        fired = sum(bus.emit("^S", owner) for _ in range(2000))
+        assert bus.counts["rolled"] == 2000
+        assert 500 < fired < 700
+
+    def test_unsubscribe_and_history(self):
+        bus = TriggerBus()
+        owner = Character("A", 10, 10, 1, 1)
+        sub = bus.subscribe(owner, "K", lambda c, rng: None)
+        bus.emit("K", owner)
+        assert bus.next_turn()["fired"] == 1
+        assert sub.cancel()
+        assert not sub.cancel()
+        assert len(bus) == 0
+        assert bus.emit("K", owner) == 0
+        assert list(bus.history)[0]["fired"] == 1
+
+    def test_conditions(self):
+        hurt = Character("A", 10, 40, 5, 5)
+        assert parse_condition("HP<50%")(hurt)
+        assert not parse_condition("HP>50%")(hurt)
+        assert parse_condition("S>=5")(hurt)
+        assert not parse_condition("gibberish")(hurt)
+        assert parse_condition(None) is None
+
+
+class TestTriggeredPotions:
+
+    def test_defend_trigger_arms_instead_of_applying(self):
+        state = _make_state()
+        log = apply_potion(_parsed("P", "+", "D", 8, {"type": "<D"},
+                                   {"type": "C"}), state)
+        assert state.hero.defense == 12
+        assert "primed on defend" in log
+        resolve_attack(state.enemy, state.hero, random.Random(0),
+                       bus=state.triggers)
+        assert state.hero.defense == 20
+        assert state.triggers.drain() == ["Knight +8 DEFENSE! (12→20)"]
+
+    def test_attack_trigger_weakens_attacker_each_swing(self):
+        state = _make_state()
+        apply_potion(_parsed("E", "-", "S", 5, {"type": ">A"}), state)
+        rng = random.Random(1)
+        resolve_attack(state.enemy, state.hero, rng, bus=state.triggers)
+        resolve_attack(state.hero, state.enemy, rng, bus=state.triggers)
+        resolve_attack(state.enemy, state.hero, rng, bus=state.triggers)
+        assert state.enemy.strength == 8
+
+    def test_kill_trigger(self):
+        state = _make_state()
+        state.enemy.hp = 1
+        apply_potion(_parsed("P", "+", "H", 10, {"type": "K"}), state)
+        state.hero.hp = 20
+        resolve_attack(state.hero, state.enemy, random.Random(0),
+                       bus=state.triggers)
+        assert state.hero.hp == 30
+
+    def test_timed_trigger_disarms_on_expiry(self):
+        state = _make_state()
+        apply_potion(_parsed("P", "+", "H", 1, {"type": "^S"},
+                             {"value": 2, "type": "T"}), state)
+        state.hero.hp = 30
+        bus = state.triggers
+        for _ in range(4):
+            begin_turn(state.hero, bus)
+            tick_effects(state.hero, bus)
+        assert state.hero.hp == 32
+        assert len(bus) == 0
+
+    def test_area_trigger_arms_every_member(self):
+        state = _make_state()
+        state.enemies.append(Character("Thug", 20, 20, 6, 2))
+        apply_potion(_parsed("X", "-", "H", 3, {"type": "vE"}), state)
+        for enemy in state.enemies:
+            tick_effects(enemy, state.triggers)
+        assert [e.hp for e in state.enemies] == [22, 17]
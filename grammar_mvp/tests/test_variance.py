@@ -0,0 +1,122 @@
+"""Tests for the variance-reduction estimators."""
+
+import random
+
+import pytest
+
+from grammar_mvp.exact import exact_duel
+from grammar_mvp.game_state import Character
+from grammar_mvp.monte_carlo import BattleArena, monte_carlo
+from grammar_mvp.variance import (
+    AntitheticRandom,
+    _collapsed_variance,
+    StratifiedRandom,
+    compare,
+    effective_sample_size,
+    estimate,
+)
+
+
+def _hero(strength=6):
+    return [Character("Sir Aldric", 30, 30, strength, 3)]
+
+
+def _goblin():
+    return [Character("Goblin", 25, 25, 7, 3)]
+
+
+TRUE_RATE = exact_duel(_hero()[0], _goblin()[0])["win_rate"]
+
+
+class TestStreams:
+
+    def test_antithetic_mirrors_dice(self):
+        a, b = random.Random(7), AntitheticRandom(random.Random(7))
+        for _ in range(50):
+            assert a.randint(1, 6) + b.randint(1, 6) == 7
+
+    def test_stratified_digits_cover_strata(self):
+        firsts = [StratifiedRandom((i + 0.5) / 12, 12, random).randint(1, 6)
+                  for i in range(12)]
+        assert sorted(firsts) == sorted(list(range(1, 7)) * 2)
+
+    def test_stratified_hands_over_to_rng(self):
+        rng = StratifiedRandom(0.5, 6, random.Random(1))
+        rng.randint(1, 6)
+        assert rng.u is not None
+        rng.randint(1, 6)  # 36 > 6 strata: no longer resolved
+        assert rng.u is None
+
+    def test_enemy_stream_drives_enemy_swings(self):
+        arena = BattleArena(_hero(), _goblin())
+        a = arena.run(True, random.Random(1), random.Random(2))
+        b = arena.run(True, random.Random(1), random.Random(2))
+        c = arena.run(True, random.Random(1), random.Random(3))
+        assert a == b
+        assert a != c
+
+
+class TestEstimate:
+
+    def test_plain_matches_monte_carlo(self):
+        stats = estimate(_hero(), _goblin(), 300, seed=4)
+        expected = monte_carlo(_hero(), _goblin(), 300, seed=4)
+        assert stats["win_rate"] == expected["win_rate"]
+        assert stats["ess_ratio"] == pytest.approx(1.0)
+
+    def test_antithetic_raises_effective_sample_size(self):
+        stats = estimate(_hero(), _goblin(), 2000, seed=1, method="antithetic")
+        assert stats["runs"] == 2000
+        assert stats["ess_ratio"] > 1.5
+        assert abs(stats["win_rate"] - TRUE_RATE) < 4 * stats["win_rate_se"]
+
+    def test_antithetic_rounds_up_to_pairs(self):
+        assert estimate(_hero(), _goblin(), 11, method="antithetic")["runs"] == 12
+
+    def test_stratified_is_unbiased(self):
+        stats = estimate(_hero(), _goblin(), 2000, seed=2, method="stratified")
+        assert stats["runs"] == 2000
+        assert abs(stats["win_rate"] - TRUE_RATE) < 4 * stats["win_rate_se"]
+        assert stats["ess_ratio"] > 0.8
+
+    def test_collapsed_variance_keeps_odd_stratum(self):
+        assert _collapsed_variance([1, 0, 1, 1]) == pytest.approx(1 / 16)
+        # The leftover stratum joins its neighbours instead of dropping out
+        assert _collapsed_variance([1, 1, 0]) == pytest.approx(1 / 9)
+        assert _collapsed_variance([1]) == 0.0
+
+    def test_unknown_method(self):
+        with pytest.raises(ValueError):
+            estimate(_hero(), _goblin(), 10, method="quasi")
+
+    def test_effective_sample_size(self):
+        assert effective_sample_size(0.5, 0.05, 100) == pytest.approx(100)
+        assert effective_sample_size(1.0, 0.0, 100) == 100
+
+
+class TestCompare:
+
+    def test_crn_beats_independent_streams(self):
+        a = (_hero(), _goblin(), True)
+        b = (_hero(strength=7), _goblin(), True)
+        paired = compare(a, b, 1000, seed=0)
+        apart = compare(a, b, 1000, seed=0, crn=False)
+        assert paired["delta"] < 0
+        assert paired["delta_se"] < apart["delta_se"]
+        assert paired["ess_ratio"] > 1.5
+
+    def test_turn_order_shares_every_die(self):
+        # Both sides swing each round whatever the order, so per-side
+        # streams make the two configs identical battle for battle.
+        heroes = [Character("Knight", 40, 40, 7, 5)]
+        enemies = [Character(f"Goblin{i}", 25, 25, 7, 3) for i in range(2)]
+        result = compare((heroes, enemies, True), (heroes, enemies, False), 300)
+        assert result["delta"] == 0 and result["delta_se"] == 0
+        assert result["method"] == "crn"
+
+    def test_effects_fall_back_to_shared_stream(self):
+        heroes = _hero()
+        heroes[0].active_effects.add({"stat": "strength", "magnitude": 2}, 3)
+        result = compare((heroes, _goblin(), True), (_hero(), _goblin(), True), 200)
+        lo, hi = result["delta_ci"]
+        assert lo <= result["delta"] <= hi
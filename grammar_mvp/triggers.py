@@ -0,0 +1,177 @@
+"""Trigger bus — event-indexed dispatch for triggered ESENS effects.
+
+A triggered potion (``P+D8 C<D``, ``E-S10 C>A``, ``P+H5 C?30%``) does not
+apply when cast; it *subscribes* its owner to an event.  Subscriptions
+are indexed by ``(event, owner)``, so emitting an event only touches the
+effects that listen to it on that fighter — never a scan of everything
+active.
+
+Events:
+
+- ``>A``  owner attacks          - ``<D``  owner is attacked
+- ``^S``  owner's turn starts    - ``vE``  owner's turn ends
+- ``K``   owner kills someone
+
+Chance triggers (``?N%``) are rolled from a buffer of uniforms drawn in
+batches.  ``counts`` tracks dispatch cost for the current turn;
+``next_turn()`` files it into ``history`` (the last
+``HISTORY_TURNS`` turns).
+"""
+
+import random
+import re
+from collections import deque
+from dataclasses import dataclass
+
+EVENTS = (">A", "<D", "^S", "vE", "K")
+
+ROLL_BATCH = 64
+HISTORY_TURNS = 256
+
+# Trigger condition text, e.g. "HP<50%" or "S>=10"
+_CONDITION = re.compile(r"^(HP|H|STR|S|DEF|D)\s*(<=|>=|<|>|=)\s*(\d+)(%?)$")
+_CONDITION_ATTRS = {
+    "HP": "hp", "H": "hp",
+    "STR": "strength", "S": "strength",
+    "DEF": "defense", "D": "defense",
+}
+_COMPARE = {
+    "<": int.__lt__, "<=": int.__le__,
+    ">": int.__gt__, ">=": int.__ge__,
+    "=": int.__eq__,
+}
+
+
+def parse_condition(text: str | None):
+    """Condition text → ``character -> bool``, or None if unconditional.
+
+    Unrecognised conditions never hold, so the effect simply never fires.
+    """
+    if not text:
+        return None
+    m = _CONDITION.match(text.replace(" ", ""))
+    if not m:
+        return lambda character: False
+    name, op, number, pct = m.groups()
+    attr = _CONDITION_ATTRS[name]
+    compare = _COMPARE[op]
+    number = int(number)
+    if pct and attr == "hp":
+        return lambda c: compare(c.hp * 100, number * c.max_hp)
+    return lambda c: compare(getattr(c, attr), number)
+
+
+@dataclass(eq=False)
+class Subscription:
+    owner: object                # Character the trigger watches
+    event: str
+    action: object               # (character, rng, log) -> str | None
+    chance: int | None = None    # percent, None = always
+    condition: object = None     # character -> bool, None = always
+    bus: "TriggerBus | None" = None
+    active: bool = True
+
+    def cancel(self) -> bool:
+        """Disarm this subscription on its bus."""
+        return self.bus.unsubscribe(self) if self.bus else False
+
+
+class TriggerBus:
+    """Subscriptions keyed by ``(event, id(owner))``."""
+
+    def __init__(self, rng=random):
+        self.rng = rng
+        self._index: dict[tuple[str, int], list[Subscription]] = {}
+        self._rolls: list[float] = []
+        self.fired: list[str] = []   # log lines not yet drained
+        self.counts = self._zero_counts()
+        self.history: deque[dict] = deque(maxlen=HISTORY_TURNS)
+
+    @staticmethod
+    def _zero_counts():
+        return {"events": 0, "checked": 0, "rolled": 0, "fired": 0}
+
+    def __len__(self):
+        return sum(len(subs) for subs in self._index.values())
+
+    def subscribe(self, owner, event: str, action, chance=None,
+                  condition=None) -> Subscription:
+        if event not in EVENTS:
+            raise ValueError(f"Unknown trigger event: {event!r}")
+        sub = Subscription(owner, event, action, chance, condition, self)
+        self._index.setdefault((event, id(owner)), []).append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> bool:
+        """Disarm *sub*.  False if it was already gone."""
+        key = (sub.event, id(sub.owner))
+        subs = self._index.get(key)
+        if not sub.active or not subs:
+            return False
+        sub.active = False
+        subs.remove(sub)
+        if not subs:
+            del self._index[key]
+        return True
+
+    def subscriptions(self, owner) -> list[Subscription]:
+        """Every armed subscription on *owner* (for display / debugging)."""
+        return [s for (_, oid), subs in self._index.items() if oid == id(owner)
+                for s in subs]
+
+    def _roll(self) -> float:
+        if not self._rolls:
+            rand = self.rng.random
+            self._rolls = [rand() for _ in range(ROLL_BATCH)]
+        return self._rolls.pop()
+
+    def reseed(self, rng):
+        """Roll on *rng* from now on, dropping any pre-rolled batch."""
+        self.rng = rng
+        self._rolls = []
+
+    def copy_state(self, bus: "TriggerBus"):
+        """Take *bus*'s rng, pending rolls, log lines and counters.
+
+        Subscriptions are not copied; they belong to the caller.
+        """
+        self.rng = bus.rng
+        self._rolls = list(bus._rolls)
+        self.fired = list(bus.fired)
+        self.counts = dict(bus.counts)
+        self.history.extend(bus.history)
+
+    def emit(self, event: str, owner) -> int:
+        """Fire *event* for *owner*.  Returns how many effects fired."""
+        counts = self.counts
+        counts["events"] += 1
+        subs = self._index.get((event, id(owner)))
+        if not subs:
+            return 0
+        fired = 0
+        for sub in list(subs):  # an action may disarm subscriptions
+            counts["checked"] += 1
+            if sub.condition is not None and not sub.condition(owner):
+                continue
+            if sub.chance is not None:
+                counts["rolled"] += 1
+                if self._roll() * 100 >= sub.chance:
+                    continue
+            text = sub.action(owner, self.rng)
+            if text:
+                self.fired.append(text)
+            fired += 1
+        counts["fired"] += fired
+        return fired
+
+    def drain(self) -> list[str]:
+        """Log lines from fired effects since the last drain."""
+        fired, self.fired = self.fired, []
+        return fired
+
+    def next_turn(self) -> dict:
+        """Close this turn's dispatch counters and start fresh ones."""
+        counts = self.counts
+        self.history.append(counts)
+        self.counts = self._zero_counts()
+        return counts
@@ -0,0 +1,218 @@
+"""Variance reduction for Monte Carlo battles.
+
+A plain estimate of a win rate from *n* battles has standard error
+``sqrt(p(1-p)/n)``; halving it takes four times the battles.  These
+estimators reach the same error with fewer battles:
+
+- **Antithetic variates** (``method="antithetic"``): battles come in
+  pairs; the second replays the first's stream mirrored, every die
+  ``randint(a, b) → a + b - x``.  A lucky battle is paired with an
+  unlucky one, so the pair mean varies less than two independent
+  battles.
+- **Stratified seeding** (``method="stratified"``): battle ``i`` of *n*
+  draws its opening dice from stratum ``[i/n, (i+1)/n)`` of one uniform
+  variable, decoded digit by digit into as many leading dice as *n*
+  strata resolve (typically the whole first round).  Every opening is
+  represented in proportion, instead of at random.
+- **Common random numbers** (``compare``): two configurations are run
+  on the same dice and their per-battle difference is averaged.  Dice
+  are split into per-side streams, so even a change of turn order
+  (``--first both``) leaves every hero and enemy swing unchanged.
+
+Every estimate reports its standard error and *effective sample size*:
+the number of plain battles that would give the same standard error.
+``ess_ratio`` (ESS / battles run) is the speed-up.
+"""
+
+import math
+import random
+import statistics
+
+from grammar_mvp.monte_carlo import (
+    BattleArena,
+    _battle_runner,
+    aggregate_outcomes,
+)
+
+METHODS = ("plain", "antithetic", "stratified")
+
+_Z95 = statistics.NormalDist().inv_cdf(0.975)
+
+
+class AntitheticRandom:
+    """Mirror image of *rng*: every uniform draw ``u`` becomes ``1 - u``."""
+
+    __slots__ = ("rng",)
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def randint(self, a: int, b: int) -> int:
+        return a + b - self.rng.randint(a, b)
+
+    def random(self) -> float:
+        return 1.0 - self.rng.random()
+
+
+class StratifiedRandom:
+    """Leading dice decoded from a stratified uniform *u*, the rest from *rng*.
+
+    Each ``randint`` takes the next mixed-radix digit of *u*, as long as
+    the product of die sizes so far stays within *strata* (beyond that a
+    stratum no longer pins the die down); later draws come from *rng*.
+    """
+
+    __slots__ = ("u", "strata", "scale", "rng")
+
+    def __init__(self, u: float, strata: int, rng):
+        self.u = u
+        self.strata = strata
+        self.scale = 1
+        self.rng = rng
+
+    def randint(self, a: int, b: int) -> int:
+        size = b - a + 1
+        if self.u is not None and self.scale * size <= self.strata:
+            self.scale *= size
+            x = self.u * size
+            digit = min(int(x), size - 1)
+            self.u = x - digit
+            return a + digit
+        self.u = None
+        return self.rng.randint(a, b)
+
+    def random(self) -> float:
+        return self.rng.random()
+
+
+def effective_sample_size(p: float, se: float, runs: int) -> float:
+    """Plain battles whose standard error for rate *p* would equal *se*."""
+    if se == 0:
+        return math.inf if 0 < p < 1 else float(runs)
+    return p * (1 - p) / (se * se)
+
+
+def _wins(outcomes) -> list[int]:
+    return [o["result"] == "win" for o in outcomes]
+
+
+def _collapsed_variance(wins: list[int]) -> float:
+    """Variance of a one-battle-per-stratum mean, from collapsed strata.
+
+    Neighbouring strata are grouped in pairs (the last group takes three
+    when the count is odd) and each group's spread stands in for the
+    variance within its strata.
+    """
+    n = len(wins)
+    groups = [wins[i:i + 2] for i in range(0, n - 1, 2)]
+    if n % 2 and groups:
+        groups[-1].append(wins[-1])
+    return sum(len(g) * statistics.variance(g) for g in groups) / n ** 2
+
+
+def estimate(heroes, enemies, runs: int, hero_first: bool = True,
+             seed: int = 0, method: str = "plain") -> dict:
+    """``monte_carlo()`` stats from a variance-reduced estimator.
+
+    ``method="plain"`` matches ``monte_carlo(..., seed=seed)`` exactly.
+    Antithetic runs round *runs* up to an even number.  Adds:
+
+      - method:       the estimator used
+      - win_rate_se:  standard error of win_rate
+      - ess:          effective sample size (plain-battle equivalent)
+      - ess_ratio:    ess / battles run
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method: {method!r} (choose from {METHODS})")
+    run = _battle_runner(heroes, enemies)
+    rng = random.Random()
+    outcomes = []
+    if method == "antithetic":
+        mirror = AntitheticRandom(rng)
+        for k in range((runs + 1) // 2):
+            rng.seed(seed + k)
+            outcomes.append(run(hero_first, rng))
+            rng.seed(seed + k)
+            outcomes.append(run(hero_first, mirror))
+        wins = _wins(outcomes)
+        pair_means = [(wins[i] + wins[i + 1]) / 2 for i in range(0, len(wins), 2)]
+        variance = (statistics.variance(pair_means) / len(pair_means)
+                    if len(pair_means) > 1 else 0.0)
+    elif method == "stratified":
+        for i in range(runs):
+            rng.seed(seed + i)
+            u = (i + rng.random()) / runs
+            outcomes.append(run(hero_first, StratifiedRandom(u, runs, rng)))
+        variance = _collapsed_variance(_wins(outcomes))
+    else:
+        for i in range(runs):
+            rng.seed(seed + i)
+            outcomes.append(run(hero_first, rng))
+        wins = _wins(outcomes)
+        variance = None
+
+    stats = aggregate_outcomes(outcomes)
+    p = stats["win_rate"]
+    n = stats["runs"]
+    se = math.sqrt(p * (1 - p) / n if variance is None else variance)
+    ess = effective_sample_size(p, se, n)
+    stats.update(method=method, win_rate_se=se, ess=ess, ess_ratio=ess / n)
+    return stats
+
+
+def compare(config_a, config_b, runs: int, seed: int = 0,
+            crn: bool = True) -> dict:
+    """Win-rate difference between two configurations.
+
+    Each config is ``(heroes, enemies, hero_first)``.  With *crn*, battle
+    ``i`` of both configs uses the same per-side dice streams; otherwise
+    config b gets an independent stream (the reference estimator).
+
+    Returns a dict with:
+      - a, b:        ``monte_carlo()`` stats for each config
+      - delta:       win_rate(a) - win_rate(b)
+      - delta_se:    standard error of delta
+      - delta_ci:    95% normal interval for delta
+      - ess:         independent battles per config for the same delta_se
+      - ess_ratio:   ess / runs
+      - method:      "crn" or "independent"
+    """
+    (ha, ea, fa), (hb, eb, fb) = config_a, config_b
+    run_a, run_b = _battle_runner(ha, ea), _battle_runner(hb, eb)
+    # Per-side streams need the arena; the Character path shares one stream
+    split = BattleArena.supports(ha, ea) and BattleArena.supports(hb, eb)
+    hero_rng, enemy_rng = random.Random(), random.Random()
+
+    def battle(run, hero_first, stream):
+        if split:
+            hero_rng.seed(2 * stream)
+            enemy_rng.seed(2 * stream + 1)
+            return run(hero_first, hero_rng, enemy_rng)
+        hero_rng.seed(stream)
+        return run(hero_first, hero_rng)
+
+    out_a, out_b = [], []
+    for i in range(runs):
+        out_a.append(battle(run_a, fa, seed + i))
+        out_b.append(battle(run_b, fb, seed + i if crn else seed + runs + i))
+
+    a, b = aggregate_outcomes(out_a), aggregate_outcomes(out_b)
+    diffs = [x - y for x, y in zip(_wins(out_a), _wins(out_b))]
+    delta = a["win_rate"] - b["win_rate"]
+    se = math.sqrt(statistics.variance(diffs) / runs) if runs > 1 else 0.0
+    independent = (a["win_rate"] * (1 - a["win_rate"])
+                   + b["win_rate"] * (1 - b["win_rate"]))
+    if se:
+        ess = independent / (se * se)
+    else:
+        ess = math.inf if independent else float(runs)
+    return {
+        "a": a,
+        "b": b,
+        "delta": delta,
+        "delta_se": se,
+        "delta_ci": (delta - _Z95 * se, delta + _Z95 * se),
+        "ess": ess,
+        "ess_ratio": ess / runs,
+        "method": "crn" if crn else "independent",
+    }
@@ -10,17 +10,12 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from ESENS_Parser import ESENSParseError, parse_esens
 
-from grammar_mvp.battle import apply_potion, check_battle_end, resolve_turn, tick_effects
-from grammar_mvp.cards import (
-    CARD_HEIGHT,
-    CARD_WIDTH,
-    CardSprite,
-    dispatch_action,
-    load_cards,
-    load_starter_deck,
-)
+from grammar_mvp.cards import CARD_HEIGHT, CARD_WIDTH, CardSprite
+from grammar_mvp.deck import load_cards
 from grammar_mvp.display import BattleLog, create_hero_panel, create_enemy_panel, create_lock_slots
-from grammar_mvp.game_state import Character, GameState
+from grammar_mvp.engine import DEFAULT_ENEMY, DEFAULT_HERO, BattleEngine
+from grammar_mvp.game_state import GameState
+from grammar_mvp.replay import deck_crc
 
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
@@ -50,14 +45,21 @@ LOG_Y = 520
 
 # Timing
 TURN_DELAY = 5.0          # seconds between auto-played turns
-PREVIEW_TURN_COUNT = 3     # how many turns auto-play in preview phase
-POST_CAST_TURNS = 2        # auto-play turns after a cast
 
 
 class BattleView(arcade.View):
+    """One battle.  *encounter* is a ladder battle (``encounters``); the
+    default is Sir Aldric vs a Goblin.  *prevalidator*, if given, is the
+    launch-time ``prevalidate.Prevalidator`` whose results the view shows:
+    this encounter's verdict, or without one the next ladder battle's.
+    """
 
-    def __init__(self):
+    def __init__(self, encounter=None, prevalidator=None):
         super().__init__()
+        self.encounter = encounter
+        self.prevalidator = prevalidator
+        self.validated_crc: int | None = None   # deck last sent to it
+        self.engine: BattleEngine | None = None
         self.state: GameState | None = None
         self.card_db: dict = {}
 
@@ -86,12 +88,14 @@ class BattleView(arcade.View):
 
         # Turn timer (M9)
         self.turn_timer: float = 0.0
-        self.turns_remaining: int = 0
-        self.hero_attacks_next: bool = True
 
         # End-of-battle overlay text
         self.end_text: arcade.Text | None = None
 
+        # Encounter difficulty from the prevalidator (None until known)
+        self.difficulty_text: arcade.Text | None = None
+        self.difficulty: dict | None = None
+
         # GUI
         self.ui_manager = arcade.gui.UIManager()
 
@@ -102,26 +106,14 @@ class BattleView(arcade.View):
     def on_show_view(self):
         self.window.background_color = (30, 30, 40)
 
-        # Load card data
+        # Load card data; the engine draws the opening hand
         self.card_db = load_cards()
-        starter = load_starter_deck(self.card_db)
-        random.shuffle(starter)
-
-        self.state = GameState(
-            hero=Character("Sir Aldric", 30, 30, 6, 3),
-            enemy=Character("Goblin", 25, 25, 7, 3),
-            mana=10,
-            max_mana=10,
-            deck=starter,
-            hand=[],
-            lock=[None] * 5,
-            slot_count=5,
-            hand_size=5,
-            phase="preview",
-        )
-
-        # Draw initial hand from deck
-        self._draw_cards_from_deck(self.state.hand_size)
+        hero, enemy = DEFAULT_HERO, DEFAULT_ENEMY
+        if self.encounter is not None and self.encounter.enemy_count == 1:
+            hero, enemy = self.encounter.hero, self.encounter.enemy
+        self.engine = BattleEngine(random.getrandbits(64), self.card_db,
+                                   hero=hero, enemy=enemy)
+        self.state = self.engine.state
         self._sync_hand()
         self._build_deck_pile()
 
@@ -173,6 +165,7 @@ class BattleView(arcade.View):
 
         # Battle log display (M10)
         self.battle_log_display = BattleLog(LOG_X, LOG_Y)
+        self.battle_log_display.show(self.state.battle_log)
 
         # End-of-battle overlay
         self.end_text = arcade.Text(
@@ -184,10 +177,23 @@ class BattleView(arcade.View):
             anchor_y="center",
         )
 
+        # Encounter difficulty — never waits on the validation worker
+        self.difficulty_text = arcade.Text(
+            "",
+            SCREEN_WIDTH // 2, SCREEN_HEIGHT - 20,
+            color=arcade.color.GRAY,
+            font_size=12,
+            anchor_x="center",
+        )
+        self.difficulty = None
+        crc = deck_crc(self.engine.starter, ordered=False)
+        if self.prevalidator is not None and crc != self.validated_crc:
+            self.prevalidator.deck_changed(self.engine.starter)
+            self.validated_crc = crc
+        self._poll_difficulty()
+
         # Start preview phase
-        self.turns_remaining = PREVIEW_TURN_COUNT
         self.turn_timer = 0.0
-        self.hero_attacks_next = True
 
     def on_hide_view(self):
         self.ui_manager.disable()
@@ -197,71 +203,45 @@ class BattleView(arcade.View):
     # ------------------------------------------------------------------
 
     def on_update(self, delta_time):
-        state = self.state
-        phase = state.phase
-
-        # If stuck in build with nothing to play, auto-resolve
-        if phase == "build" and not state.hand and not state.deck:
-            state.phase = "resolve"
-            self.turns_remaining = 999
-            phase = "resolve"
-
-        if phase in ("preview", "build", "resolve", "post_cast"):
+        if self.difficulty is None:
+            self._poll_difficulty()
+        if self.engine.playing:
             self.turn_timer += delta_time
             if self.turn_timer >= TURN_DELAY:
                 self.turn_timer -= TURN_DELAY
                 self._play_one_turn()
 
     def _play_one_turn(self):
-        """Resolve one attack turn and check for phase transitions."""
-        state = self.state
-
-        # Pick attacker/defender
-        if self.hero_attacks_next:
-            log = resolve_turn(state.hero, state.enemy)
-        else:
-            log = resolve_turn(state.enemy, state.hero)
-        self.hero_attacks_next = not self.hero_attacks_next
-
-        state.turn += 1
-        tick_effects(state.hero)
-        tick_effects(state.enemy)
-
-        state.battle_log.append(log)
-        self.battle_log_display.push(log)
+        """Resolve one attack turn and refresh the panels and log."""
+        self.engine.play_turn()
+        self._show_log()
         self._sync_panels()
+        if self.engine.result:
+            self._enter_end_phase(self.engine.result)
 
-        # Check win/lose
-        result = check_battle_end(state)
-        if result:
-            self._enter_end_phase(result)
+    def _poll_difficulty(self):
+        """Show the validation result once the worker has it."""
+        if self.prevalidator is None or not self.prevalidator.encounters:
             return
-
-        self.turns_remaining -= 1
-
-        if state.phase == "preview" and self.turns_remaining <= 0:
-            state.phase = "build"
-
-        elif state.phase == "post_cast" and self.turns_remaining <= 0:
-            # After post-cast turns, check mana
-            if state.mana > 0:
-                state.phase = "build"
-            else:
-                state.phase = "resolve"
-                self.turns_remaining = 999  # keep going until someone dies
-
-        # If we just entered build but there's nothing to play, auto-resolve
-        if state.phase == "build" and not state.hand and not state.deck:
-            state.phase = "resolve"
-            self.turns_remaining = 999
+        if self.encounter is not None:
+            number, prefix = self.encounter.number, ""
+        else:
+            number, prefix = self.prevalidator.encounters[0].number, "Next: "
+        self.difficulty = self.prevalidator.get(number)
+        if self.difficulty is None:
+            self.difficulty_text.text = "Checking difficulty..."
+            return
+        d = self.difficulty
+        self.difficulty_text.text = (
+            f"{prefix}Battle {d['number']} {d['title']}: {d['verdict']} "
+            f"({d['win_rate']:.0%} with this deck)"
+        )
 
     def _enter_end_phase(self, result: str):
         if result == "win":
-            self.state.phase = "reward"
             self.end_text.text = "VICTORY!"
             self.end_text.color = arcade.color.GOLD
         else:
-            self.state.phase = "gameover"
             self.end_text.text = "DEFEAT"
             self.end_text.color = arcade.color.RED
 
@@ -307,6 +287,7 @@ class BattleView(arcade.View):
         self.feedback_text.draw()
         self.mana_text.draw()
         self.mana_label_text.draw()
+        self.difficulty_text.draw()
 
         # GUI (CAST button)
         self.ui_manager.draw()
@@ -325,6 +306,11 @@ class BattleView(arcade.View):
             card.label_text.y = card.center_y - 30
             card.label_text.draw()
 
+    def _show_log(self):
+        """Refresh the log display from the bounded battle log."""
+        if self.battle_log_display:
+            self.battle_log_display.show(self.state.battle_log)
+
     def _sync_panels(self):
         """Update panel HP text from current Character data."""
         if self.hero_panel:
@@ -350,7 +336,8 @@ class BattleView(arcade.View):
         cards = arcade.get_sprites_at_point((x, y), self.lock_list)
         if cards:
             card = cards[-1]
-            self._lift_from_slot(card)
+            if not self._lift_from_slot(card):
+                return
             self.held_card = card
             self.held_offset_x = card.center_x - x
             self.held_offset_y = card.center_y - y
@@ -360,9 +347,9 @@ class BattleView(arcade.View):
         cards = arcade.get_sprites_at_point((x, y), self.hand_list)
         if cards:
             card = cards[-1]
+            if self.engine.take(self.hand_list.index(card)) is None:
+                return
             self.hand_list.remove(card)
-            if card.card_data in self.state.hand:
-                self.state.hand.remove(card.card_data)
             self._recompute_hand_positions()
             self.held_card = card
             self.held_offset_x = card.center_x - x
@@ -381,12 +368,11 @@ class BattleView(arcade.View):
         self.held_card = None
 
         # Attempt to dock into a slot
-        if self.state.mana >= 1:
-            hits = arcade.check_for_collision_with_list(card, self.slot_list)
-            for slot in hits:
-                if slot.card is None:
-                    self._dock_card(card, slot)
-                    return
+        hits = arcade.check_for_collision_with_list(card, self.slot_list)
+        for slot in hits:
+            if slot.card is None and self.engine.dock(slot.slot_index):
+                self._dock_card(card, slot)
+                return
 
         # Return to hand at the closest position
         self._insert_into_hand(card)
@@ -396,32 +382,30 @@ class BattleView(arcade.View):
     # ------------------------------------------------------------------
 
     def _dock_card(self, card: CardSprite, slot):
-        """Snap *card* into *slot*, deduct mana, update parser feedback.
+        """Snap *card* into *slot* and update parser feedback.
 
-        Card must already be removed from hand (picked-up cards are
-        taken out of hand_list/state.hand on mouse press).
+        The engine has already docked the card and deducted mana.
         """
         card.position = slot.position
         self.lock_list.append(card)
         slot.card = card
         card.is_locked = True
         card.slot_index = slot.slot_index
-        self.state.lock[slot.slot_index] = card.card_data
-        self.state.mana -= 1
         self._update_feedback()
 
-    def _lift_from_slot(self, card: CardSprite):
+    def _lift_from_slot(self, card: CardSprite) -> bool:
         """Lift *card* out of its slot and refund mana. Does NOT return to hand."""
+        if self.engine.lift(card.slot_index) is None:
+            return False
         for slot in self.slot_list:
             if slot.card is card:
                 slot.card = None
-                self.state.lock[slot.slot_index] = None
                 break
         self.lock_list.remove(card)
         card.is_locked = False
         card.slot_index = -1
-        self.state.mana = min(self.state.mana + 1, self.state.max_mana)
         self._update_feedback()
+        return True
 
     def _insert_into_hand(self, card: CardSprite):
         """Insert *card* into hand at the position closest to its x-coordinate."""
@@ -441,7 +425,7 @@ class BattleView(arcade.View):
                     best_dist = dist
                     best_idx = i
 
-        self.state.hand.insert(best_idx, card.card_data)
+        self.engine.return_to_hand(best_idx)
         self._sync_hand()
 
     # ------------------------------------------------------------------
@@ -452,75 +436,21 @@ class BattleView(arcade.View):
         if self.state.phase != "build":
             return
 
-        # Nothing docked?
-        has_cards = any(slot.card for slot in self.slot_list)
-        if not has_cards:
-            self.feedback_text.text = "Nothing to cast!"
+        cast, feedback = self.engine.cast()
+        self._show_log()
+        if not cast:
+            self.feedback_text.text = feedback
             self.feedback_text.color = arcade.color.RED
             return
 
-        # Separate action cards from grammar cards
-        action_cards = []
-        grammar_tokens = []
-        for slot in self.slot_list:
-            if not slot.card:
-                continue
-            if slot.card.card_data.get("type") == "action":
-                action_cards.append(slot.card.card_data)
-            else:
-                grammar_tokens.append(slot.card.card_data["token"])
-
-        # Dispatch action cards
-        for card_data in action_cards:
-            dispatch_action(card_data, self.state)
-            msg = f"PLAYED: {card_data['label']}"
-            self.state.battle_log.append(msg)
-            self.battle_log_display.push(msg)
-
-        # Parse grammar cards as ESENS and apply potion
-        cast_text = None
-        if grammar_tokens:
-            esens_string = "".join(grammar_tokens)
-            try:
-                result = parse_esens(esens_string)
-                potion_log = apply_potion(result["dict"], self.state)
-                self.state.battle_log.append(f"CAST: {result['explanation']}")
-                self.battle_log_display.push(f"CAST: {result['explanation']}")
-                if potion_log:
-                    self.state.battle_log.append(potion_log)
-                    self.battle_log_display.push(potion_log)
-                cast_text = f"Cast: {result['explanation']}"
-            except ESENSParseError:
-                self.feedback_text.text = "Invalid potion!"
-                self.feedback_text.color = arcade.color.RED
-                return
-
-        # Clear lock slots
-        for slot in self.slot_list:
-            if slot.card:
-                self.lock_list.remove(slot.card)
-                slot.card = None
-        self.state.lock = [None] * self.state.slot_count
-
-        # Refill hand from deck
-        self._draw_cards_from_deck(self.state.hand_size - len(self.state.hand))
+        # Action cards / curses may have changed hand, slots and deck
         self._full_sync()
-
-        # Show result
-        if cast_text:
-            self.feedback_text.text = cast_text
-            self.feedback_text.color = arcade.color.YELLOW_GREEN
-        elif action_cards:
-            names = ", ".join(c["label"] for c in action_cards)
-            self.feedback_text.text = f"Played: {names}"
+        if feedback:
+            self.feedback_text.text = feedback
             self.feedback_text.color = arcade.color.YELLOW_GREEN
 
-        # Sync panels after potion effects
+        # Sync panels after potion effects; post_cast turns start now
         self._sync_panels()
-
-        # Transition to post_cast auto-play turns
-        self.state.phase = "post_cast"
-        self.turns_remaining = POST_CAST_TURNS
         self.turn_timer = 0.0
 
     # ------------------------------------------------------------------
@@ -557,21 +487,6 @@ class BattleView(arcade.View):
             card.center_y = HAND_Y + i * DECK_OFFSET
             self.deck_pile.append(card)
 
-    def _draw_cards_from_deck(self, count):
-        """Move up to *count* cards from deck to hand. Curses fire on draw."""
-        for _ in range(count):
-            if not self.state.deck:
-                break
-            card = self.state.deck.pop()
-            if card.get("type") == "curse" and card.get("on_draw"):
-                dispatch_action(card, self.state)
-                msg = f"CURSE: {card['label']}!"
-                self.state.battle_log.append(msg)
-                if self.battle_log_display:
-                    self.battle_log_display.push(msg)
-                continue  # curse fires and vanishes
-            self.state.hand.append(card)
-
     def _sync_hand(self):
         """Rebuild hand_list sprites from state.hand."""
         self.hand_list = arcade.SpriteList()